@@ -0,0 +1,53 @@
+"""
+Samples/sec of sampling in a loop compared to sampling in bulk.
+
+    python benchmarks/bench_bulk.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import freddy  # noqa: E402
+from schemas import flat_schema, multi_definition_schema  # noqa: E402
+
+try:
+    from freddy import columnar
+except ImportError:
+    columnar = None  # type: ignore
+
+BATCH = 10000
+
+
+def report(name: str, func) -> None:
+    seconds = min(timeit.repeat(func, number=1, repeat=3))
+    print(f"{name:<40} {BATCH / seconds:>12.1f} samples/sec")
+
+
+def main():
+    schemas = {
+        "flat": flat_schema(),
+        "definitions": multi_definition_schema(definitions=10),
+    }
+    for name, schema in schemas.items():
+        compiled = freddy.compile(schema)
+        report(
+            f"{name}, sample() loop", lambda: [compiled.sample() for _ in range(BATCH)]
+        )
+        report(f"{name}, sample_many()", lambda: compiled.sample_many(BATCH))
+
+    if columnar is not None:
+        schema = flat_schema(strings=False)
+        compiled = freddy.compile(schema)
+        report("numeric flat, sample_many()", lambda: compiled.sample_many(BATCH))
+        report("numeric flat, columnar", lambda: columnar.columns(schema, BATCH))
+        report(
+            "numeric flat, columnar to dicts",
+            lambda: columnar.columns(schema, BATCH).to_dicts(),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Samples/sec for a schema with many definitions.
+
+    python benchmarks/bench_definitions.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import freddy  # noqa: E402
+from freddy.freddy import generate  # noqa: E402
+from schemas import multi_definition_schema  # noqa: E402
+
+
+def report(name: str, func, number: int) -> None:
+    seconds = min(timeit.repeat(func, number=number, repeat=3))
+    print(f"{name:<40} {number / seconds:>12.1f} samples/sec")
+
+
+def main():
+    for definitions in (10, 40, 160):
+        schema = multi_definition_schema(definitions=definitions)
+        compiled = freddy.compile(schema)
+        number = max(10, 2000 // definitions)
+        report(f"generate, {definitions} definitions", lambda: generate(schema), number)
+        report(f"compiled, {definitions} definitions", compiled.sample, number)
+
+    # Output size stays the same while the schema grows
+    for definitions in (10, 40, 160):
+        schema = multi_definition_schema(definitions=definitions, root=definitions - 2)
+        report(
+            f"generate, 2 of {definitions} definitions", lambda: generate(schema), 2000
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Time to import freddy, in a fresh interpreter. Short-lived jobs pay it
+on every run.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --importtime  # slowest modules
+
+Heavy modules that should only be loaded on demand are reported if
+`import freddy` loads them.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = 20
+
+# Loaded on first use only
+LAZY = (
+    "asyncio",
+    "multiprocessing",
+    "rstr",
+    "numpy",
+    "pydantic",
+    "csv",
+    "uuid",
+    "json",
+    "datetime",
+    "freddy.compiler",
+    "freddy.sampler",
+)
+
+
+def seconds(code: str, runs: int) -> float:
+    script = (
+        "import time; start = time.perf_counter(); "
+        f"{code}; print(time.perf_counter() - start)"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return min(
+        float(subprocess.check_output([sys.executable, "-c", script], env=env))
+        for _ in range(runs)
+    )
+
+
+def loaded(modules: List[str]) -> List[str]:
+    script = f"import sys, freddy; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return (
+        subprocess.check_output([sys.executable, "-c", script], env=env)
+        .decode()
+        .split()
+    )
+
+
+def importtime(limit: int) -> None:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import freddy"],
+        env=env,
+        stderr=subprocess.PIPE,
+        check=True,
+    ).stderr.decode()
+    rows = []
+    for line in output.splitlines()[1:]:
+        # import time: <self us> | <cumulative us> | <indented module>
+        own, cumulative, name = line.split("|")
+        rows.append((int(cumulative), int(own.split(":")[1]), name.strip()))
+    print(f"{'module':<40} {'self us':>10} {'cumulative us':>14}")
+    for cumulative, own, name in sorted(rows, reverse=True)[:limit]:
+        print(f"{name:<40} {own:>10} {cumulative:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument(
+        "--importtime", action="store_true", help="list the slowest modules"
+    )
+    args = parser.parse_args()
+
+    # Warm up the bytecode cache
+    seconds("import freddy", 1)
+    freddy = seconds("import freddy", args.runs)
+    print(f"{'import freddy':<40} {freddy * 1e3:>10.1f} ms")
+    for module in ("freddy.aio", "freddy.parallel"):
+        print(
+            f"{'import ' + module:<40} {seconds(f'import {module}', args.runs) * 1e3:>10.1f} ms"
+        )
+    eager = loaded(list(LAZY))
+    if eager:
+        print(f"Loaded by import freddy: {', '.join(eager)}")
+    if args.importtime:
+        importtime(20)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark suite of the generation hot paths.
+
+Every case is sampled with the legacy interpreter (`generate`), the
+compiled schema (`sample`) and bulk sampling (`sample_many`), and reports:
+
+- samples/sec, the best of several timed rounds
+- ns/value, the time per generated json value (objects, arrays and
+  scalars), so that cases of different sizes can be compared
+- peak memory of generating a batch, traced with tracemalloc
+
+Results can be saved and compared with those of another commit:
+
+    python benchmarks/run.py --save before.json
+    git checkout my-branch
+    python benchmarks/run.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import freddy  # noqa: E402
+from freddy.freddy import _get_schema, generate  # noqa: E402
+from schemas import (  # noqa: E402
+    array_schema,
+    flat_schema,
+    multi_definition_schema,
+    pattern_schema,
+    pydantic_model,
+)
+
+# Relative slowdown reported as a regression by --compare
+THRESHOLD = 0.1
+
+BATCH = 100
+
+
+def cases() -> Dict[str, Any]:
+    result = {
+        "flat object": flat_schema(properties=50),
+        "nested refs": multi_definition_schema(definitions=30, root=0),
+        "large array": array_schema(items=2000),
+        "unique array": array_schema(items=500, unique=True),
+        "patterns and dates": pattern_schema(),
+    }
+    try:
+        result["pydantic model"] = pydantic_model()
+    except ImportError:
+        pass
+    return result
+
+
+def count_values(value: Any) -> int:
+    if isinstance(value, dict):
+        return 1 + sum(count_values(v) for v in value.values())
+    if isinstance(value, list):
+        return 1 + sum(count_values(v) for v in value)
+    return 1
+
+
+def engines(_input: Any) -> Dict[str, Callable[[], List[Any]]]:
+    """
+    Functions generating a batch of `BATCH` samples with each engine
+    """
+    schema = _get_schema(_input)
+    compiled = freddy.compile(schema)
+    return {
+        "generate": lambda: [generate(schema) for _ in range(BATCH)],
+        "sample": lambda: [compiled.sample() for _ in range(BATCH)],
+        "sample_many": lambda: compiled.sample_many(BATCH),
+    }
+
+
+def measure(func: Callable[[], List[Any]], repeat: int) -> Dict[str, float]:
+    random.seed(0)
+    values = sum(count_values(sample) for sample in func())
+
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "samples_per_sec": BATCH / seconds,
+        "ns_per_value": seconds / values * 1e9,
+        "peak_kb": peak / 1024,
+    }
+
+
+def run(selected: Optional[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for case, _input in cases().items():
+        for engine, func in engines(_input).items():
+            name = f"{case} / {engine}"
+            if selected and selected not in name:
+                continue
+            try:
+                results[name] = measure(func, repeat)
+            except Exception as ex:
+                print(f"{name:<36} failed: {ex!r}", file=sys.stderr)
+    return results
+
+
+def report(
+    results: Dict[str, Dict[str, float]],
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+) -> int:
+    """
+    Print the results, compared to the baseline if any, and return the
+    number of regressions
+    """
+    header = f"{'case':<36} {'samples/sec':>12} {'ns/value':>10} {'peak KB':>10}"
+    if baseline is not None:
+        header += f" {'baseline':>12} {'change':>8}"
+    print(header)
+
+    regressions = 0
+    for name, result in results.items():
+        line = (
+            f"{name:<36} {result['samples_per_sec']:>12.1f} "
+            f"{result['ns_per_value']:>10.0f} {result['peak_kb']:>10.1f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous is not None:
+            change = result["samples_per_sec"] / previous["samples_per_sec"] - 1
+            line += f" {previous['samples_per_sec']:>12.1f} {change:>+8.1%}"
+            if change < -THRESHOLD:
+                line += "  slower"
+                regressions += 1
+        print(line)
+    return regressions
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", "--filter", help="only run cases containing this")
+    parser.add_argument("--repeat", type=int, default=3, help="timed rounds")
+    parser.add_argument("--save", help="save the results to this json file")
+    parser.add_argument("--compare", help="compare to results saved in this file")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results = run(args.filter, args.repeat)
+    regressions = report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Synthetic schemas used by the benchmarks
+"""
+
+from typing import Any, Dict, Tuple
+
+
+def multi_definition_schema(
+    definitions: int = 40, fields: int = 8, root: int = 0
+) -> Dict[str, Any]:
+    """
+    Object schema with many definitions, shaped like the json schema of a
+    big pydantic model: each definition has a few scalar fields and a
+    reference to the next definition. Sampling starts at definition
+    number `root`, so the output size can be kept small independently of
+    the schema size.
+    """
+    schema: Dict[str, Any] = {"definitions": {}}
+    for i in range(definitions):
+        properties: Dict[str, Any] = {
+            f"field_{j}": {"type": ("string", "integer", "boolean", "number")[j % 4]}
+            for j in range(fields)
+        }
+        if i + 1 < definitions:
+            properties["child"] = {"$ref": f"#/definitions/model_{i + 1}"}
+        schema["definitions"][f"model_{i}"] = {
+            "type": "object",
+            "required": list(properties),
+            "properties": properties,
+        }
+    schema.update(
+        {
+            "type": "object",
+            "required": ["root"],
+            "properties": {"root": {"$ref": f"#/definitions/model_{root}"}},
+        }
+    )
+    return schema
+
+
+def flat_schema(properties: int = 20, strings: bool = True) -> Dict[str, Any]:
+    """
+    Wide object of scalar properties, half of them required
+    """
+    types: Tuple[Dict[str, Any], ...] = (
+        {"type": "integer", "minimum": 0, "maximum": 10000},
+        {"type": "number"},
+        {"type": "boolean"},
+        {"enum": ["red", "green", "blue"]},
+    )
+    if strings:
+        types += ({"type": "string", "maxLength": 20},)
+    return {
+        "type": "object",
+        "required": [f"field_{i}" for i in range(0, properties, 2)],
+        "properties": {f"field_{i}": types[i % len(types)] for i in range(properties)},
+    }
+
+
+def array_schema(items: int = 1000, unique: bool = False) -> Dict[str, Any]:
+    """
+    Large array of small integers, optionally unique
+    """
+    return {
+        "type": "array",
+        "minItems": items,
+        "maxItems": items,
+        "uniqueItems": unique,
+        "items": {"type": "integer", "minimum": 0, "maximum": 100 * items},
+    }
+
+
+def pattern_schema() -> Dict[str, Any]:
+    """
+    Object of pattern and date formatted strings
+    """
+    return {
+        "type": "object",
+        "required": ["id", "code", "email", "phone", "created", "day", "time"],
+        "properties": {
+            "id": {
+                "type": "string",
+                "pattern": r"^[a-f0-9]{8}(-[a-f0-9]{4}){3}-[a-f0-9]{12}$",
+            },
+            "code": {"type": "string", "pattern": r"^[A-Z]{2}-\d{3,5}$"},
+            "email": {"type": "string", "pattern": r"^\w{3,10}@(gmail|yahoo)\.com$"},
+            "phone": {"type": "string", "pattern": r"^\+\d{2} \d{3}( \d{3}){2}$"},
+            "created": {"type": "string", "format": "date-time"},
+            "day": {"type": "string", "format": "date"},
+            "time": {"type": "string", "format": "time"},
+        },
+    }
+
+
+def pydantic_model(fields: int = 40, depth: int = 3) -> Any:
+    """
+    Big pydantic model: a model with `fields` fields of scalar, optional
+    and list types, nesting a similar model down to `depth` levels
+    (requires pydantic)
+    """
+    from typing import List, Optional
+
+    import pydantic
+
+    types = (int, str, float, bool, Optional[int], List[str])
+    model = None
+    for level in range(depth):
+        definitions: Dict[str, Any] = {
+            f"field_{i}": (types[i % len(types)], ...) for i in range(fields)
+        }
+        if model is not None:
+            definitions["child"] = (model, ...)
+        model = pydantic.create_model(f"Model{level}", **definitions)  # type: ignore
+    return model
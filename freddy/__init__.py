@@ -1,11 +1,216 @@
-from typing import Any
+import importlib
+from typing import TYPE_CHECKING, Any, AsyncIterator, BinaryIO, Iterator, List, Optional
 
 from .exceptions import *  # noqa
-from .freddy import jsonschema  # noqa
-from .freddy import pydantic  # noqa
+from .factories import Pool, Registry, register_factory  # noqa
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .compiler import compile  # noqa
+    from .freddy import jsonschema, pydantic  # noqa
+    from .pools import Pools
+    from .profiler import Profiler  # noqa
+    from .sampler import Sampler
 
-def sample(_input) -> Any:
-    if isinstance(_input, dict):
-        return jsonschema(_input)
-    return pydantic(_input)
+# Submodules with heavy imports (asyncio, multiprocessing, numpy, pydantic,
+# json, datetime), loaded on first access as `freddy.<name>`
+_LAZY_MODULES = (
+    "aio",
+    "columnar",
+    "compiler",
+    "freddy",
+    "models",
+    "parallel",
+    "pools",
+    "profiler",
+    "rng",
+    "sampler",
+    "stream",
+)
+
+# Names of the package, by submodule they are loaded from on first access
+_LAZY_NAMES = {
+    "CHUNK_SIZE": "stream",
+    "Pools": "pools",
+    "Profiler": "profiler",
+    "Sampler": "sampler",
+    "compile": "compiler",
+    "jsonschema": "freddy",
+    "pydantic": "freddy",
+}
+
+# Sampler of samples without a seed, created on first use
+_sampler: Optional["Sampler"] = None
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_NAMES:
+        module = importlib.import_module(f".{_LAZY_NAMES[name]}", __name__)
+        # Kept, so that later lookups do not come here
+        value = globals()[name] = getattr(module, name)
+        return value
+    if name in _LAZY_MODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_MODULES) | set(_LAZY_NAMES))
+
+
+def _default_sampler() -> "Sampler":
+    global _sampler
+    if _sampler is None:
+        import random
+
+        from .sampler import Sampler
+
+        _sampler = Sampler(rng=random)
+    return _sampler
+
+
+def _get_sampler(seed: Optional[int]) -> "Sampler":
+    if seed is None:
+        return _default_sampler()
+    from .sampler import Sampler
+
+    return Sampler(seed)
+
+
+def clear_cache(model: Any = None) -> None:
+    """
+    Forget the cached schema of a pydantic `model`, or of all models. Needed
+    only if a model changes after it has been sampled.
+    """
+    _default_sampler().clear_cache(model)
+
+
+def set_pools(pools: Optional["Pools"]) -> None:
+    """
+    Draw patterns and dates out of `pools` of pre-generated values (see
+    `freddy.pools`) in samples without a seed, or stop if None
+    """
+    sampler = _default_sampler()
+    sampler.pools = pools
+    sampler.clear_cache()
+
+
+def sample(
+    _input, seed: Optional[int] = None, target_bytes: Optional[int] = None
+) -> Any:
+    """
+    Get a sample of a json schema or pydantic model. With `target_bytes`,
+    arrays, strings and optional properties are sized so that its JSON
+    text is about that many bytes (see `freddy.sizing`)
+    """
+    return _get_sampler(seed).sample(_input, target_bytes=target_bytes)
+
+
+def sample_model(model, construct: bool = True, seed: Optional[int] = None) -> Any:
+    """
+    Get a sample of a pydantic model with native python values, without
+    going through its json schema: a model instance built with
+    `construct()` (skipping validation), or a dict if `construct` is False
+    """
+    return _get_sampler(seed).sample_model(model, construct)
+
+
+def sample_models(
+    model, n: int, construct: bool = True, seed: Optional[int] = None
+) -> List[Any]:
+    """
+    Get `n` samples of a pydantic model with native python values (see
+    `sample_model()`)
+    """
+    return _get_sampler(seed).sample_models(model, n, construct)
+
+
+def sample_many(
+    _input,
+    n: int,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    target_bytes: Optional[int] = None,
+) -> List[Any]:
+    """
+    Get `n` samples of a json schema or pydantic model. The schema is only
+    analysed once and random values are drawn in bulk for the whole batch.
+
+    Samples are generated by a pool of `workers` processes if provided.
+    Samples generated with a `seed` are reproducible. Samples of about
+    `target_bytes` bytes of JSON text are sampled one by one.
+    """
+    return _get_sampler(seed).sample_many(
+        _input, n, workers=workers, target_bytes=target_bytes
+    )
+
+
+def iter_samples(
+    _input,
+    n: Optional[int] = None,
+    chunk_size: int = 1000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Lazy version of `sample_many()`: yields samples as they are generated,
+    `chunk_size` at a time. Never stops if `n` is not provided
+    """
+    return _get_sampler(seed).iter_samples(
+        _input, n, chunk_size=chunk_size, workers=workers
+    )
+
+
+def asample(
+    _input,
+    n: Optional[int] = None,
+    rate: Optional[float] = None,
+    buffer: int = 1000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> AsyncIterator[Any]:
+    """
+    Asynchronously yield `n` samples of a json schema or pydantic model
+    (endless if `n` is not provided), at `rate` samples per second at most
+    if provided, without blocking the event loop:
+
+        async for sample in freddy.asample(schema, rate=100):
+            ...
+
+    Samples are generated ahead of demand by a background thread, or a pool
+    of `workers` processes, keeping up to `buffer` of them ready
+    """
+    from .sampler import Sampler
+
+    # A sampler of its own, as it is used from another thread
+    return Sampler(seed).asample(_input, n, rate=rate, buffer=buffer, workers=workers)
+
+
+def dump(
+    _input,
+    stream: BinaryIO,
+    n: Optional[int] = None,
+    format: str = "ndjson",
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> None:
+    """
+    Write `n` samples of a json schema or pydantic model to a binary
+    `stream`: one sample per line with the `ndjson` format (endless if `n`
+    is not provided), a single array of samples with the `json` format, or
+    one row per sample with the `csv` format, for objects.
+
+    JSON samples are written without building them in memory, unless they
+    are generated by a pool of `workers` processes, and flushed every
+    `chunk_size` characters, `CHUNK_SIZE` by default.
+    """
+    from .stream import CHUNK_SIZE
+
+    _get_sampler(seed).dump(
+        _input,
+        stream,
+        n,
+        format=format,
+        chunk_size=CHUNK_SIZE if chunk_size is None else chunk_size,
+        workers=workers,
+    )
@@ -0,0 +1,147 @@
+"""
+Asynchronous sampling, for asyncio load generators.
+
+Samples are generated by a background thread (or by a pool of worker
+processes, driven by that thread) into a bounded queue of chunks, which
+keeps up to `buffer` samples ready ahead of demand. The thread waits
+while the queue is full, so generation never runs further ahead than
+that, and the event loop only ever waits for samples when generation is
+slower than consumption:
+
+    async for sample in freddy.asample(schema, rate=500):
+        await session.post(url, json=sample)
+
+With a `rate`, samples are yielded at that many per second at most.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from itertools import islice
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .sampler import Sampler
+
+# Time the thread waits for room in the queue before checking whether it
+# should stop
+_POLL_INTERVAL = 0.1
+
+
+class _Done:
+    """
+    Marks the end of the samples, with the error that ended them if any
+    """
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+def _put(
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+    item: Any,
+) -> bool:
+    """
+    Put `item` in the queue of the event loop, waiting while it is full.
+    Returns False if sampling stopped meanwhile
+    """
+    put = queue.put(item)
+    try:
+        future = asyncio.run_coroutine_threadsafe(put, loop)
+    except RuntimeError:
+        # Event loop closed
+        put.close()
+        return False
+    while True:
+        try:
+            future.result(timeout=_POLL_INTERVAL)
+            return True
+        except concurrent.futures.TimeoutError:
+            if stop.is_set():
+                future.cancel()
+                return False
+
+
+def _produce(
+    samples: Iterator[Any],
+    chunk_size: int,
+    queue: asyncio.Queue,
+    loop: asyncio.AbstractEventLoop,
+    stop: threading.Event,
+) -> None:
+    done = _Done()
+    try:
+        while not stop.is_set():
+            chunk = list(islice(samples, chunk_size))
+            if not chunk:
+                break
+            if not _put(queue, loop, stop, chunk):
+                return
+    except BaseException as ex:
+        done = _Done(ex)
+    finally:
+        close = getattr(samples, "close", None)
+        if close is not None:
+            # Stops worker processes
+            close()
+    _put(queue, loop, stop, done)
+
+
+async def asample(
+    sampler: "Sampler",
+    _input,
+    n: Optional[int] = None,
+    rate: Optional[float] = None,
+    buffer: int = 1000,
+    chunk_size: int = 100,
+    workers: Optional[int] = None,
+) -> AsyncIterator[Any]:
+    """
+    Asynchronously yield `n` samples (endless if not provided) of a json
+    schema or pydantic model, generated by `sampler` in a background
+    thread, or by `workers` processes. Up to `buffer` samples are kept
+    ready, in chunks of `chunk_size`. Samples are yielded at `rate` per
+    second at most, if provided
+    """
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be positive")
+    if buffer < 1 or chunk_size < 1:
+        raise ValueError("buffer and chunk_size must be positive")
+    chunk_size = min(chunk_size, buffer)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(max(1, buffer // chunk_size))
+    stop = threading.Event()
+    # Compiles the schema, raising errors here rather than in the thread
+    samples = sampler.iter_samples(_input, n, chunk_size=chunk_size, workers=workers)
+    thread = threading.Thread(
+        target=_produce,
+        args=(samples, chunk_size, queue, loop, stop),
+        name="freddy-asample",
+        daemon=True,
+    )
+    thread.start()
+    interval = 1 / rate if rate else 0.0
+    next_time = loop.time()
+    try:
+        while True:
+            chunk = await queue.get()
+            if isinstance(chunk, _Done):
+                if chunk.error is not None:
+                    raise chunk.error
+                return
+            for sample in chunk:
+                if interval:
+                    now = loop.time()
+                    # Catch up after a slow consumer, but not by more than
+                    # a second's worth of samples at once
+                    next_time = max(next_time, now - 1.0)
+                    if next_time > now:
+                        await asyncio.sleep(next_time - now)
+                    next_time += interval
+                yield sample
+    finally:
+        stop.set()
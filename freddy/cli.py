@@ -0,0 +1,153 @@
+"""
+Command line interface: generates samples of a json schema file or a
+pydantic model and streams them to stdout or a file.
+
+    freddy schema.json --count 1000000 --format ndjson --workers 4 > out.ndjson
+    freddy myapp.models:User --count 1000 --format csv --output users.csv
+    freddy schema.json --count 10000 --output /dev/null --profile
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from typing import Any, BinaryIO, List, Optional
+
+from .exceptions import InvalidSchema, UnsupportedSchema, UnsupportedType
+from .profiler import Profiler
+from .sampler import Sampler
+from .stream import FORMATS
+
+
+class CountingStream:
+    """
+    Binary stream wrapper counting the bytes written
+    """
+
+    __slots__ = ("stream", "bytes")
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.bytes = 0
+
+    def write(self, data: bytes) -> None:
+        self.bytes += len(data)
+        self.stream.write(data)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def load_input(path: str) -> Any:
+    """
+    Json schema of a file, or pydantic model of a `module:Model` path
+    """
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return json.load(f)
+    module_name, sep, name = path.partition(":")
+    if not sep:
+        raise ValueError(f"{path} is neither a file nor a module:Model path")
+    if os.getcwd() not in sys.path:
+        # Modules of the working directory are found, as with `python -m`,
+        # also when run as the installed `freddy` script
+        sys.path.insert(0, os.getcwd())
+    try:
+        module = importlib.import_module(module_name)
+        return getattr(module, name)
+    except (ImportError, AttributeError) as ex:
+        raise ValueError(f"can not load {path}: {ex}")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="freddy",
+        description="Generate random samples of a json schema or pydantic model",
+    )
+    parser.add_argument(
+        "input", help="json schema file, or pydantic model as module:Model"
+    )
+    parser.add_argument(
+        "-n", "--count", type=int, default=1, help="number of samples (default: 1)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        default="ndjson",
+        help="json array, one json sample per line, or csv for objects "
+        "(default: ndjson)",
+    )
+    parser.add_argument("-s", "--seed", type=int, help="seed, for reproducible samples")
+    parser.add_argument(
+        "-w", "--workers", type=int, help="number of processes generating samples"
+    )
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report throughput"
+    )
+    parser.add_argument(
+        "-p",
+        "--profile",
+        action="store_true",
+        help="report the time spent on each node of the schema",
+    )
+    parser.add_argument(
+        "--collapsed",
+        metavar="FILE",
+        help="write the profile as collapsed stacks, for flamegraph tools",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+    if args.count < 0:
+        parser.error("count can not be negative")
+    if args.workers is not None and args.workers < 1:
+        parser.error("workers must be at least 1")
+    try:
+        _input = load_input(args.input)
+    except ValueError as ex:
+        parser.error(str(ex))
+    profiler = Profiler() if args.profile or args.collapsed else None
+    if profiler is not None and args.workers is not None:
+        parser.error("can not profile workers")
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    stream = CountingStream(output)
+    start = time.perf_counter()
+    try:
+        Sampler(args.seed, profiler=profiler).dump(
+            _input, stream, args.count, format=args.format, workers=args.workers
+        )
+    except (InvalidSchema, UnsupportedSchema) as ex:
+        parser.exit(1, f"freddy: error: {ex.reason}\n")
+    except UnsupportedType as ex:
+        parser.exit(1, f"freddy: error: unsupported type {ex.type}\n")
+    except BrokenPipeError:
+        # Output closed early, e.g. piped into head
+        sys.stderr.close()
+        return 1
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = 1 / elapsed if elapsed else float("inf")
+        print(
+            f"freddy: {args.count} samples, {stream.bytes / 1e6:.1f} MB "
+            f"in {elapsed:.2f}s ({args.count * rate:.0f} samples/sec, "
+            f"{stream.bytes * rate / 1e6:.1f} MB/sec)",
+            file=sys.stderr,
+        )
+    if args.profile:
+        print(profiler.report(), file=sys.stderr)  # type: ignore
+    if args.collapsed:
+        with open(args.collapsed, "w") as f:
+            profiler.write_collapsed(f)  # type: ignore
+    return 0
@@ -0,0 +1,175 @@
+"""
+Vectorized generation of flat objects with numpy.
+
+Samples of an object schema whose properties are all scalar are
+generated as columns: one numpy array per property, plus a presence mask
+for every property that is not required. All values of a column are
+drawn in a single numpy call.
+"""
+
+from typing import Any, Dict, List, Union
+
+from .exceptions import UnsupportedSchema
+from .freddy import _get_schema, _validate_schema, get_max_and_min
+from .numbers import multiples
+from .types import Definitions
+from .weights import enum_weights
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    raise ImportError("numpy is required by freddy.columnar: pip install freddy[numpy]")
+
+Seed = Union[None, int, "np.random.Generator"]
+
+
+class Columns:
+    """
+    `size` samples of an object schema stored by columns. Properties that
+    are not required have a boolean mask in `masks` telling in which
+    samples they are present.
+    """
+
+    def __init__(
+        self, size: int, data: Dict[str, np.ndarray], masks: Dict[str, np.ndarray]
+    ):
+        self.size = size
+        self.data = data
+        self.masks = masks
+
+    def __len__(self) -> int:
+        return self.size
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        objects: List[Dict[str, Any]] = [{} for _ in range(self.size)]
+        for key, column in self.data.items():
+            values = column.tolist()
+            try:
+                mask = self.masks[key].tolist()
+            except KeyError:
+                for obj, value in zip(objects, values):
+                    obj[key] = value
+                continue
+            for obj, value, present in zip(objects, values, mask):
+                if present:
+                    obj[key] = value
+        return objects
+
+
+def _scalar_array(values: List[Any]) -> np.ndarray:
+    """
+    Typed array when all values are of the same basic type, so that numpy
+    does not coerce them (e.g. ints into floats). Object array otherwise.
+    """
+    types = {type(v) for v in values}
+    if len(types) == 1 and types.pop() in (bool, int, float, str):
+        return np.asarray(values)
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _column(
+    schema: Dict[str, Any],
+    size: int,
+    rng: np.random.Generator,
+    definitions: Definitions,
+) -> np.ndarray:
+    _validate_schema(schema, definitions)
+
+    if "const" in schema:
+        return _scalar_array([schema["const"]]).repeat(size)
+
+    if "enum" in schema:
+        choices = _scalar_array(schema["enum"])
+        weights = enum_weights(schema)
+        if weights is not None:
+            probabilities = np.array(weights) / sum(weights)
+            return choices[rng.choice(len(choices), size=size, p=probabilities)]
+        return choices[rng.integers(0, len(choices), size=size)]
+
+    if "$ref" in schema:
+        refname = schema["$ref"].split("#/definitions/")[-1]
+        return _column(definitions[refname], size, rng, definitions)  # type: ignore
+
+    _type = schema.get("type")
+    if _type in ("integer", "number") and "multipleOf" in schema:
+        return _multiples_column(schema, size, rng, integer=_type == "integer")
+
+    if _type == "integer":
+        maximum, minimum = get_max_and_min(schema)
+        limits = np.iinfo(np.int64)
+        if int(minimum) < limits.min or int(maximum) > limits.max:
+            raise UnsupportedSchema(
+                schema, reason="bounds do not fit in 64 bits integers"
+            )
+        return rng.integers(int(minimum), int(maximum), size=size, endpoint=True)
+
+    if _type == "number":
+        maximum, minimum = get_max_and_min(schema)
+        if not np.isfinite(maximum - minimum):
+            raise UnsupportedSchema(schema, reason="range does not fit in a float")
+        return rng.uniform(minimum, maximum, size=size)
+
+    if _type == "boolean":
+        return rng.integers(0, 2, size=size, dtype=bool)
+
+    if _type == "null":
+        return np.full(size, None, dtype=object)
+
+    raise UnsupportedSchema(
+        schema, reason=f"{_type} type is not supported by the columnar engine"
+    )
+
+
+def _multiples_column(
+    schema: Dict[str, Any], size: int, rng: "np.random.Generator", integer: bool
+) -> np.ndarray:
+    """
+    Multiples of `multipleOf` within the bounds of the schema, drawn as
+    `k * numerator / denominator` for random integers `k`
+    """
+    lattice = multiples(schema, integer)
+    first, last = lattice.first, lattice.first + lattice.count - 1
+    limit = np.iinfo(np.int64).max
+    if max(abs(first), abs(last)) * lattice.numerator > limit:
+        raise UnsupportedSchema(
+            schema, reason="multiples do not fit in 64 bits integers"
+        )
+    ks = rng.integers(first, last, size=size, endpoint=True)
+    if lattice.denominator == 1:
+        return ks * lattice.numerator
+    return ks * lattice.numerator / lattice.denominator
+
+
+def columns(_input, n: int, seed: Seed = None) -> Columns:
+    """
+    Generate `n` samples of a flat object schema (or pydantic model) as
+    columns. `seed` is either a seed or a numpy random `Generator`.
+    """
+    schema = _get_schema(_input)
+    _validate_schema(schema)
+    if schema.get("type") != "object":
+        raise UnsupportedSchema(
+            schema, reason="columnar engine only supports object schemas"
+        )
+
+    rng = np.random.default_rng(seed)
+    definitions = schema.get("definitions")
+    required_keys = schema.get("required", [])
+    data: Dict[str, np.ndarray] = {}
+    masks: Dict[str, np.ndarray] = {}
+    for key, key_schema in schema.get("properties", {}).items():
+        data[key] = _column(key_schema, n, rng, definitions)
+        if key not in required_keys:
+            # Flip a coin for every optional value
+            masks[key] = rng.integers(0, 2, size=n, dtype=bool)
+    return Columns(n, data, masks)
+
+
+def sample_many(_input, n: int, seed: Seed = None) -> List[Dict[str, Any]]:
+    """
+    Same as `freddy.sample_many()` for flat object schemas, but generating
+    the values with numpy
+    """
+    return columns(_input, n, seed=seed).to_dicts()
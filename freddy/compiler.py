@@ -0,0 +1,1330 @@
+import math
+import random
+import re
+from itertools import accumulate
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .exceptions import InvalidSchema, UnsupportedSchema, UnsupportedType
+from .factories import Factory, Registry, escape, registry
+from .freddy import (
+    _validate_schema,
+    check_unique_items,
+    generate_unique,
+    get_max_and_min,
+    value_space,
+)
+from .numbers import _FLOAT_RANGE_MAX, Lattice, multiples
+from .patterns import compile_pattern
+from .pools import Pools, ValuePool
+from .profiler import Profiler
+from .stream import CHUNK_SIZE, Write, dump
+from .stream import encode as _encode
+from .stream import write_samples
+from .strings import DEFAULT_ALPHABET, Alphabet, schema_alphabet
+from .temporal import FORMATS as TEMPORAL_FORMATS
+from .temporal import Temporal, schema_temporal
+from .types import Definitions, RandomSource
+from .weights import AliasTable, branch_weights, enum_weights
+
+# Nested nodes of a value, and the function building the value out of
+# their samples
+Expansion = Tuple[Sequence["Node"], Callable[[List[Any]], Any]]
+
+
+def _first(values: List[Any]) -> Any:
+    return values[0]
+
+
+class Node:
+    """
+    A schema node compiled into a ready-to-use generator.
+
+    Everything that can be derived from the schema is resolved when the
+    node is built, so `sample()` only draws random values.
+
+    `sample_many()` returns `n` samples at once. Nodes override it to draw
+    all their random values in bulk.
+
+    `emit()` writes a sample as JSON text, piece by piece, without building
+    it first. It draws the same random values as `sample()`.
+
+    Nodes holding other nodes also describe them for `DepthLimitedNode`:
+    `children()` are all the nested nodes, `required_children()` those
+    that every value needs (or, for `choice` nodes, that a value needs one
+    of), `level` is 1 for nodes nesting values (objects and arrays), and
+    `expand()` draws the nested nodes of a value and how to build it.
+    """
+
+    __slots__ = ()
+
+    level = 0
+    choice = False
+
+    def children(self) -> Sequence["Node"]:
+        return ()
+
+    def required_children(self) -> Sequence["Node"]:
+        return self.children()
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        """
+        Nested nodes to sample and the function building the value out of
+        their samples, or None for leaves. Optional properties and items
+        beyond `minItems` are `scale` times as likely as usual
+        """
+        return None
+
+    def sample(self) -> Any:
+        raise NotImplementedError()
+
+    def sample_many(self, n: int) -> List[Any]:
+        sample = self.sample
+        return [sample() for _ in range(n)]
+
+    def emit(self, write: Write) -> None:
+        write(_encode(self.sample()))
+
+
+_BOOLEANS = (True, False)
+
+
+def _split(flat: List[Any], lengths: List[int]) -> List[Any]:
+    """
+    Cut a flat list of values into consecutive chunks of the given lengths
+    """
+    starts = accumulate(lengths, initial=0)
+    return [flat[start:end] for start, end in zip(starts, accumulate(lengths))]
+
+
+class ConstNode(Node):
+    __slots__ = ("value", "_text")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self._text = _encode(value)
+
+    def sample(self) -> Any:
+        return self.value
+
+    def sample_many(self, n: int) -> List[Any]:
+        return [self.value] * n
+
+    def emit(self, write: Write) -> None:
+        write(self._text)
+
+
+class NullNode(Node):
+    __slots__ = ()
+
+    def sample(self) -> None:
+        return None
+
+    def sample_many(self, n: int) -> List[None]:
+        return [None] * n
+
+    def emit(self, write: Write) -> None:
+        write("null")
+
+
+class BooleanNode(Node):
+    __slots__ = ("_getrandbits", "_choices")
+
+    def __init__(self, rng: RandomSource):
+        self._getrandbits = rng.getrandbits
+        self._choices = rng.choices
+
+    def sample(self) -> bool:
+        return self._getrandbits(1) == 1
+
+    def sample_many(self, n: int) -> List[bool]:
+        return self._choices(_BOOLEANS, k=n)
+
+    def emit(self, write: Write) -> None:
+        write("true" if self._getrandbits(1) else "false")
+
+
+class EnumNode(Node):
+    __slots__ = ("choices", "size", "_texts", "_random", "_choices")
+
+    def __init__(self, rng: RandomSource, choices: List[Any]):
+        self.choices = tuple(choices)
+        self.size = len(self.choices)
+        # Encoded on first emit(), as choices may not be json values
+        self._texts: Optional[Tuple[str, ...]] = None
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> Any:
+        return self.choices[int(self._random() * self.size)]
+
+    def sample_many(self, n: int) -> List[Any]:
+        return self._choices(self.choices, k=n)
+
+    def emit(self, write: Write) -> None:
+        if self._texts is None:
+            self._texts = tuple(_encode(choice) for choice in self.choices)
+        write(self._texts[int(self._random() * self.size)])
+
+
+class OfNode(Node):
+    __slots__ = ("nodes", "size", "_random", "_choices")
+
+    choice = True
+
+    def __init__(self, rng: RandomSource, nodes: List[Node]):
+        self.nodes = tuple(nodes)
+        self.size = len(self.nodes)
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> Any:
+        return self.nodes[int(self._random() * self.size)].sample()
+
+    def children(self) -> Sequence[Node]:
+        return self.nodes
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        return (self.nodes[int(self._random() * self.size)],), _first
+
+    def emit(self, write: Write) -> None:
+        self.nodes[int(self._random() * self.size)].emit(write)
+
+    def sample_many(self, n: int) -> List[Any]:
+        # Pick all branches first, then sample each branch in bulk
+        branches = self._choices(range(len(self.nodes)), k=n)
+        columns = [
+            iter(node.sample_many(branches.count(i)))
+            for i, node in enumerate(self.nodes)
+        ]
+        return [next(columns[branch]) for branch in branches]
+
+
+class WeightedEnumNode(EnumNode):
+    __slots__ = ("table",)
+
+    def __init__(self, rng: RandomSource, choices: List[Any], weights: List[float]):
+        super().__init__(rng, choices)
+        self.table = AliasTable(rng, weights)
+
+    def sample(self) -> Any:
+        return self.choices[self.table.draw()]
+
+    def sample_many(self, n: int) -> List[Any]:
+        return self._choices(self.choices, cum_weights=self.table.cum_weights, k=n)
+
+    def emit(self, write: Write) -> None:
+        if self._texts is None:
+            self._texts = tuple(_encode(choice) for choice in self.choices)
+        write(self._texts[self.table.draw()])
+
+
+class WeightedOfNode(OfNode):
+    __slots__ = ("table",)
+
+    def __init__(self, rng: RandomSource, nodes: List[Node], weights: List[float]):
+        super().__init__(rng, nodes)
+        self.table = AliasTable(rng, weights)
+
+    def sample(self) -> Any:
+        return self.nodes[self.table.draw()].sample()
+
+    def children(self) -> Sequence[Node]:
+        # Branches that can be drawn: those with a weight
+        cum_weights = [0.0] + self.table.cum_weights
+        return [
+            node
+            for node, low, high in zip(self.nodes, cum_weights, cum_weights[1:])
+            if high > low
+        ]
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        return (self.nodes[self.table.draw()],), _first
+
+    def sample_many(self, n: int) -> List[Any]:
+        branches = self._choices(
+            range(self.size), cum_weights=self.table.cum_weights, k=n
+        )
+        columns = [
+            iter(node.sample_many(branches.count(i)))
+            for i, node in enumerate(self.nodes)
+        ]
+        return [next(columns[branch]) for branch in branches]
+
+    def emit(self, write: Write) -> None:
+        self.nodes[self.table.draw()].emit(write)
+
+
+class IntegerNode(Node):
+    __slots__ = ("minimum", "maximum", "span", "_random", "_choices")
+
+    def __init__(self, rng: RandomSource, minimum: int, maximum: int):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.span = maximum - minimum + 1
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> int:
+        return self.minimum + int(self._random() * self.span)
+
+    def sample_many(self, n: int) -> List[int]:
+        return self._choices(range(self.minimum, self.maximum + 1), k=n)
+
+    def emit(self, write: Write) -> None:
+        write(str(self.minimum + int(self._random() * self.span)))
+
+
+class WideIntegerNode(Node):
+    """
+    Integers in a range too wide to be drawn from a random float
+    """
+
+    __slots__ = ("minimum", "maximum", "_randint")
+
+    def __init__(self, rng: RandomSource, minimum: int, maximum: int):
+        self.minimum = minimum
+        self.maximum = maximum
+        self._randint = rng.randint
+
+    def sample(self) -> int:
+        return self._randint(self.minimum, self.maximum)
+
+
+class NumberNode(Node):
+    __slots__ = ("minimum", "maximum", "_uniform", "_random")
+
+    def __init__(self, rng: RandomSource, minimum: float, maximum: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self._uniform = rng.uniform
+        self._random = rng.random
+
+    def sample(self) -> float:
+        return self._uniform(self.minimum, self.maximum)
+
+    def sample_many(self, n: int) -> List[float]:
+        minimum, span, _random = self.minimum, self.maximum - self.minimum, self._random
+        return [minimum + span * _random() for _ in range(n)]
+
+    def emit(self, write: Write) -> None:
+        write(repr(self._uniform(self.minimum, self.maximum)))
+
+
+class MultipleOfNode(Node):
+    """
+    Multiples of `multipleOf` within the bounds of a schema
+    """
+
+    __slots__ = ("lattice", "rng")
+
+    def __init__(self, rng: RandomSource, lattice: Lattice):
+        self.lattice = lattice
+        self.rng = rng
+
+    def sample(self) -> Union[int, float]:
+        return self.lattice.generate(self.rng)
+
+    def sample_many(self, n: int) -> List[Union[int, float]]:
+        return self.lattice.generate_many(self.rng, n)
+
+
+class StringNode(Node):
+    __slots__ = (
+        "min_length",
+        "max_length",
+        "alphabet",
+        "bounded",
+        "rng",
+        "_random",
+        "_choices",
+    )
+
+    def __init__(
+        self,
+        rng: RandomSource,
+        min_length: int,
+        max_length: int,
+        alphabet: Alphabet,
+        bounded: bool = True,
+    ):
+        self.min_length = min_length
+        self.max_length = max_length
+        self.alphabet = alphabet
+        # Whether `max_length` is set by the schema, rather than a default
+        self.bounded = bounded
+        self.rng = rng
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> str:
+        span = self.max_length - self.min_length + 1
+        length = self.min_length + int(self._random() * span)
+        return self.alphabet.generate(self.rng, length)
+
+    def sample_many(self, n: int) -> List[str]:
+        # Draw the characters of all strings at once and cut them
+        lengths = self._choices(range(self.min_length, self.max_length + 1), k=n)
+        chars = self.alphabet.generate(self.rng, sum(lengths))
+        return _split(chars, lengths)  # type: ignore
+
+    def emit(self, write: Write) -> None:
+        if not self.alphabet.plain:
+            return super().emit(write)
+        write('"' + self.sample() + '"')
+
+
+class PatternNode(Node):
+    __slots__ = ("pattern", "rng", "_generate")
+
+    def __init__(self, rng: RandomSource, pattern: str):
+        self.pattern = pattern
+        self.rng = rng
+        self._generate = compile_pattern(pattern).generate
+
+    def sample(self) -> str:
+        return self._generate(self.rng)
+
+
+class DateTimeNode(Node):
+    __slots__ = ("temporal", "rng")
+
+    def __init__(self, rng: RandomSource, temporal: Temporal):
+        self.temporal = temporal
+        self.rng = rng
+
+    def sample(self) -> str:
+        return self.temporal.generate(self.rng)
+
+    def sample_many(self, n: int) -> List[str]:
+        return self.temporal.generate_many(self.rng, n)
+
+    def sample_value(self) -> Any:
+        """
+        Random datetime, date or time object, depending on the format
+        """
+        return self.temporal.value(self.rng)
+
+    def emit(self, write: Write) -> None:
+        # ISO strings need no escaping
+        write('"' + self.temporal.generate(self.rng) + '"')
+
+
+class FactoryNode(Node):
+    """
+    Values of a custom factory (see `freddy.factories`)
+    """
+
+    __slots__ = ("factory", "rng", "_many")
+
+    def __init__(self, rng: RandomSource, factory: Factory):
+        self.factory = factory
+        self.rng = rng
+        self._many = getattr(factory, "many", None)
+
+    def sample(self) -> Any:
+        return self.factory(self.rng)
+
+    def sample_many(self, n: int) -> List[Any]:
+        if self._many is not None:
+            return self._many(self.rng, n)
+        factory, rng = self.factory, self.rng
+        return [factory(rng) for _ in range(n)]
+
+
+class PoolNode(Node):
+    """
+    Values drawn out of a pool of pre-generated values (see
+    `freddy.pools`)
+    """
+
+    __slots__ = ("pool", "_random", "_choices")
+
+    def __init__(self, rng: RandomSource, pool: ValuePool):
+        self.pool = pool
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> Any:
+        values = self.pool.values
+        if values is None:
+            if not self.pool.lazy:
+                return self.pool.node.sample()
+            values = self.pool.fill()
+        return values[int(self._random() * len(values))]
+
+    def sample_many(self, n: int) -> List[Any]:
+        values = self.pool.values
+        if values is None:
+            if not self.pool.lazy:
+                return self.pool.node.sample_many(n)
+            values = self.pool.fill()
+        return self._choices(values, k=n)
+
+    def emit(self, write: Write) -> None:
+        if self.pool.values is None:
+            if not self.pool.lazy:
+                return self.pool.node.emit(write)
+            self.pool.fill()
+        texts = self.pool.texts
+        write(texts[int(self._random() * len(texts))])  # type: ignore
+
+
+class ArrayNode(Node):
+    __slots__ = (
+        "schema",
+        "items",
+        "min_items",
+        "max_items",
+        "unique_items",
+        "space",
+        "rng",
+        "_random",
+        "_choices",
+    )
+
+    level = 1
+
+    def __init__(
+        self,
+        rng: RandomSource,
+        schema: Dict[str, Any],
+        items: Node,
+        min_items: int,
+        max_items: int,
+        unique_items: bool,
+        space: Optional[Sequence[Any]] = None,
+    ):
+        self.schema = schema
+        self.items = items
+        self.min_items = min_items
+        self.max_items = max_items
+        self.unique_items = unique_items
+        # Distinct values of the items, if known, to draw unique items from
+        self.space = space
+        self.rng = rng
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> List[Any]:
+        span = self.max_items - self.min_items + 1
+        length = self.min_items + int(self._random() * span)
+        item_sample = self.items.sample
+        if not self.unique_items:
+            return [item_sample() for _ in range(length)]
+        return generate_unique(self.schema, item_sample, length, self.space, self.rng)
+
+    def children(self) -> Sequence[Node]:
+        return (self.items,)
+
+    def required_children(self) -> Sequence[Node]:
+        return (self.items,) if self.min_items else ()
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        if self.unique_items:
+            # Items must be compared with each other
+            return None
+        span = (self.max_items - self.min_items) * scale + 1
+        return [self.items] * (self.min_items + int(self._random() * span)), list
+
+    def sample_many(self, n: int) -> List[List[Any]]:
+        if self.unique_items:
+            return super().sample_many(n)
+        # Sample the items of all arrays at once and cut them
+        lengths = self._choices(range(self.min_items, self.max_items + 1), k=n)
+        return _split(self.items.sample_many(sum(lengths)), lengths)
+
+    def emit(self, write: Write) -> None:
+        if self.unique_items:
+            # Items must be compared with each other
+            return super().emit(write)
+        span = self.max_items - self.min_items + 1
+        length = self.min_items + int(self._random() * span)
+        if not length:
+            write("[]")
+            return
+        item_emit = self.items.emit
+        write("[")
+        item_emit(write)
+        for _ in range(length - 1):
+            write(",")
+            item_emit(write)
+        write("]")
+
+
+class ObjectNode(Node):
+    __slots__ = ("properties", "_fields", "_random", "_getrandbits", "_choices")
+
+    level = 1
+
+    def __init__(self, rng: RandomSource, properties: List[Tuple[str, Node, bool]]):
+        self.properties = tuple(properties)
+        # Encoded `"key":` prefixes of the properties, for emit()
+        self._fields = tuple(
+            (_encode(key) + ":", node, required) for key, node, required in properties
+        )
+        self._random = rng.random
+        self._getrandbits = rng.getrandbits
+        self._choices = rng.choices
+
+    def children(self) -> Sequence[Node]:
+        return [node for _, node, _ in self.properties]
+
+    def required_children(self) -> Sequence[Node]:
+        return [node for _, node, required in self.properties if required]
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        _random = self._random
+        # Optional properties are included half of the times at full scale
+        threshold = scale / 2
+        keys, nodes = [], []
+        for key, node, required in self.properties:
+            if required or _random() < threshold:
+                keys.append(key)
+                nodes.append(node)
+        return nodes, lambda values: dict(zip(keys, values))
+
+    def build(self, values: Dict[str, Any]) -> Any:
+        """
+        Value of the object of the given property values, built by someone
+        else than `sample()`
+        """
+        return values
+
+    def sample(self) -> Dict[str, Any]:
+        # Include all required keys and flip a coin for all others
+        getrandbits = self._getrandbits
+        return {
+            key: node.sample()
+            for key, node, required in self.properties
+            if required or getrandbits(1)
+        }
+
+    def sample_many(self, n: int) -> List[Dict[str, Any]]:
+        # Fill the objects one property at a time, sampling the values of
+        # each property for all objects at once
+        objects: List[Dict[str, Any]] = [{} for _ in range(n)]
+        for key, node, required in self.properties:
+            if required:
+                for obj, value in zip(objects, node.sample_many(n)):
+                    obj[key] = value
+                continue
+            present = self._choices(_BOOLEANS, k=n)
+            values = iter(node.sample_many(present.count(True)))
+            for obj, is_present in zip(objects, present):
+                if is_present:
+                    obj[key] = next(values)
+        return objects
+
+    def emit(self, write: Write) -> None:
+        getrandbits = self._getrandbits
+        separator = "{"
+        for prefix, node, required in self._fields:
+            if required or getrandbits(1):
+                write(separator + prefix)
+                node.emit(write)
+                separator = ","
+        write("{}" if separator == "{" else "}")
+
+
+class RefNode(Node):
+    """
+    Placeholder for a definition that references itself (directly or
+    through other definitions). Its target is filled in once the
+    definition has been compiled.
+    """
+
+    __slots__ = ("target",)
+
+    def __init__(self):
+        self.target: Optional[Node] = None
+
+    def sample(self) -> Any:
+        return self.target.sample()  # type: ignore
+
+    def sample_many(self, n: int) -> List[Any]:
+        if not n:
+            # Recursion ends when no more values are needed
+            return []
+        return self.target.sample_many(n)  # type: ignore
+
+    def emit(self, write: Write) -> None:
+        self.target.emit(write)  # type: ignore
+
+    def children(self) -> Sequence[Node]:
+        return (self.target,)  # type: ignore
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        return (self.target,), _first  # type: ignore
+
+
+class ProfiledNode(Node):
+    """
+    Records the values of a node, and the time spent generating them, into
+    a profiler (see `freddy.profiler`)
+    """
+
+    __slots__ = ("node", "path", "profiler", "stats")
+
+    def __init__(self, node: Node, path: str, profiler: Profiler):
+        self.node = node
+        self.path = path
+        self.profiler = profiler
+        self.stats = profiler.stats_for(path)
+
+    def children(self) -> Sequence[Node]:
+        return (self.node,)
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        # Leaves are recorded, nodes nesting others are passed through
+        if not self.node.children():
+            return None
+        return (self.node,), _first
+
+    def sample(self) -> Any:
+        profiler = self.profiler
+        start = profiler.enter(self.path)
+        try:
+            value = self.node.sample()
+        except BaseException:
+            profiler.exit(self.stats, start, 0)
+            raise
+        profiler.exit(self.stats, start, 1, [value])
+        return value
+
+    def sample_many(self, n: int) -> List[Any]:
+        profiler = self.profiler
+        start = profiler.enter(self.path)
+        try:
+            values = self.node.sample_many(n)
+        except BaseException:
+            profiler.exit(self.stats, start, 0)
+            raise
+        profiler.exit(self.stats, start, n, values)
+        return values
+
+    def emit(self, write: Write) -> None:
+        size = 0
+
+        def counting_write(text: str) -> None:
+            nonlocal size
+            size += len(text.encode())
+            write(text)
+
+        profiler = self.profiler
+        start = profiler.enter(self.path)
+        try:
+            self.node.emit(counting_write)
+        finally:
+            profiler.exit(self.stats, start, 1, size=size)
+
+
+DEFAULT_MAX_DEPTH = 32
+
+# Objects and arrays of recursive schemas built for a sample, at most
+DEFAULT_MAX_VALUES = 1000
+
+
+def _walk(root: Node) -> Iterator[Node]:
+    """
+    Every node of the tree of `root`, once
+    """
+    seen = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen.add(id(node))
+            yield node
+            stack.extend(node.children())
+
+
+def _heights(root: Node) -> Dict[int, float]:
+    """
+    Least number of nested objects and arrays of the values of each node
+    of the tree of `root`, by node id: infinite for nodes that can only
+    recurse forever
+    """
+    # Deepest nodes first, so that heights settle in few rounds
+    nodes = list(_walk(root))[::-1]
+    heights = dict.fromkeys(map(id, nodes), math.inf)
+    changed = True
+    while changed:
+        changed = False
+        for node in nodes:
+            if node.choice:
+                height = min(
+                    (heights[id(child)] for child in node.children()), default=math.inf
+                )
+            else:
+                height = node.level + max(
+                    (heights[id(child)] for child in node.required_children()),
+                    default=0,
+                )
+            if height < heights[id(node)]:
+                heights[id(node)] = height
+                changed = True
+    return heights
+
+
+def _has_factory(root: Node) -> bool:
+    """
+    Whether values of the tree of `root` come from factories, rather than
+    from their schema alone
+    """
+    return any(isinstance(node, FactoryNode) for node in _walk(root))
+
+
+def _recursive(root: Node) -> Set[int]:
+    """
+    Ids of the nodes of the tree of `root` leading to a placeholder of a
+    recursive reference
+    """
+    nodes = list(_walk(root))[::-1]
+    recursive = {id(node) for node in nodes if isinstance(node, RefNode)}
+    changed = True
+    while changed:
+        changed = False
+        for node in nodes:
+            if id(node) not in recursive and any(
+                id(child) in recursive for child in node.children()
+            ):
+                recursive.add(id(node))
+                changed = True
+    return recursive
+
+
+def _tallest(root: Node) -> Dict[int, int]:
+    """
+    Most nested objects and arrays of the values of each node of the tree
+    of `root` that does not lead to a recursive reference, by node id
+    """
+    recursive = _recursive(root)
+    nodes = [node for node in list(_walk(root))[::-1] if id(node) not in recursive]
+    tallest = dict.fromkeys(map(id, nodes), 0)
+    changed = True
+    while changed:
+        changed = False
+        for node in nodes:
+            height = node.level + max(
+                (tallest[id(child)] for child in node.children()), default=0
+            )
+            if height > tallest[id(node)]:
+                tallest[id(node)] = height
+                changed = True
+    return tallest
+
+
+class DepthLimitedNode(Node):
+    """
+    Samples the tree of `node` with an explicit stack instead of recursive
+    calls, so that values of recursive schemas stay bounded: values nested
+    in more than `max_depth` objects and arrays take the shortest way out
+    (required properties only, `minItems` items, the branches that end the
+    soonest), and optional properties and items beyond `minItems` are
+    `decay` times as likely at each level.
+
+    Depth alone does not bound the size of values whose arrays hold several
+    recursive items, so a sample also builds `max_values` objects and
+    arrays of recursive schemas at most (`DEFAULT_MAX_VALUES`, or
+    `max_depth` if greater, by default): optional values of these get
+    rarer as they are built, and once there are `max_values` of them the
+    rest take the shortest way out.
+    """
+
+    __slots__ = (
+        "node",
+        "max_depth",
+        "decay",
+        "max_values",
+        "finite",
+        "_scales",
+        "_exits",
+        "_tallest",
+        "_recursive",
+    )
+
+    def __init__(
+        self,
+        node: Node,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        decay: float = 1.0,
+        max_values: Optional[int] = None,
+    ):
+        if max_depth < 0:
+            raise ValueError("max_depth can not be negative")
+        if not 0 <= decay <= 1:
+            raise ValueError("decay must be between 0 and 1")
+        if max_values is None:
+            max_values = max(DEFAULT_MAX_VALUES, max_depth)
+        elif max_values < 1:
+            raise ValueError("max_values must be positive")
+        self.node = node
+        self.max_depth = max_depth
+        self.decay = decay
+        self.max_values = max_values
+        self._scales = [decay**depth for depth in range(max_depth)]
+        heights = _heights(node)
+        # Nodes that can not nest values too deep are sampled as usual, if
+        # optional values do not decay
+        self._tallest = _tallest(node)
+        if decay != 1:
+            self._tallest = {
+                key: height for key, height in self._tallest.items() if not height
+            }
+        self._recursive = _recursive(node)
+        # Whether values can be finite at all
+        self.finite = heights[id(node)] < math.inf
+        # Branch ending the soonest of each choice
+        self._exits = {
+            id(choice): min(choice.children(), key=lambda child: heights[id(child)])
+            for choice in _walk(node)
+            if choice.choice and choice.children()
+        }
+
+    def sample(self) -> Any:
+        node, depth = self.node, 0
+        max_depth, scales, exits = self.max_depth, self._scales, self._exits
+        tallest, recursive, inf = self._tallest, self._recursive, math.inf
+        # Objects and arrays of recursive nodes left to build
+        left = max_values = self.max_values
+        # Values being built: how to build them, their nested nodes, the
+        # values of those sampled so far and their depth
+        stack: List[Tuple[Callable, Sequence[Node], List[Any], int]] = []
+        while True:
+            # Down to a leaf, or a value without nested values
+            while True:
+                if depth + tallest.get(id(node), inf) <= max_depth:
+                    value = node.sample()
+                    break
+                counted = id(node) in recursive
+                if depth < max_depth and (left > 0 or not counted):
+                    scale = scales[depth]
+                    if counted:
+                        scale *= left / max_values
+                    expansion = node.expand(scale)
+                elif node.choice:
+                    node = exits[id(node)]
+                    continue
+                else:
+                    expansion = node.expand(0.0)
+                if expansion is None:
+                    value = node.sample()
+                    break
+                nodes, build = expansion
+                if build is _first:
+                    # Passed through: no value to build
+                    node = nodes[0]
+                    continue
+                if counted:
+                    left -= 1
+                if not nodes:
+                    value = build([])
+                    break
+                depth += node.level
+                stack.append((build, nodes, [], depth))
+                node = nodes[0]
+            # Up to the first value with nested nodes left to sample
+            while stack:
+                build, nodes, values, depth = stack[-1]
+                values.append(value)
+                if len(values) < len(nodes):
+                    node = nodes[len(values)]
+                    break
+                stack.pop()
+                value = build(values)
+            else:
+                return value
+
+    def children(self) -> Sequence[Node]:
+        return (self.node,)
+
+
+class Compiler:
+    """
+    Walks a schema once, validating every node and resolving all
+    references, and builds the equivalent tree of nodes.
+    """
+
+    def __init__(
+        self,
+        definitions: Definitions = None,
+        rng: RandomSource = random,
+        alphabet: str = DEFAULT_ALPHABET,
+        factories: Optional[Registry] = None,
+        pools: Optional[Pools] = None,
+        profiler: Optional[Profiler] = None,
+        max_depth: Optional[int] = None,
+        decay: float = 1.0,
+    ):
+        self.definitions = definitions
+        self.rng = rng
+        self.alphabet = alphabet
+        self.factories = registry if factories is None else factories
+        self.pools = pools
+        self.profiler = profiler
+        self.max_depth = max_depth
+        self.decay = decay
+        # Whether a schema references itself, directly or not
+        self.recursive = False
+        # JSON pointer of the schema being compiled, to find the factories
+        # registered by path
+        self.path = ""
+        self._compiled: Dict[str, Node] = {}
+        self._pending: Dict[str, RefNode] = {}
+        self._handlers = {
+            "null": self.compile_null,
+            "boolean": self.compile_boolean,
+            "string": self.compile_string,
+            "integer": self.compile_integer,
+            "number": self.compile_number,
+            "array": self.compile_array,
+            "object": self.compile_object,
+        }
+
+    def compile(self, schema: Dict[str, Any]) -> Node:
+        return self.profiled(self.compile_schema(schema))
+
+    def compile_schema(self, schema: Dict[str, Any]) -> Node:
+        _validate_schema(schema, self.definitions)
+
+        factory = self.factories.by_path(self.path)
+        if factory is not None:
+            return FactoryNode(self.rng, factory)
+
+        if "const" in schema:
+            return ConstNode(schema["const"])
+
+        if "enum" in schema:
+            weights = enum_weights(schema)
+            if weights is not None:
+                return WeightedEnumNode(self.rng, schema["enum"], weights)
+            return EnumNode(self.rng, schema["enum"])
+
+        if "oneOf" in schema or "anyOf" in schema:
+            branches = schema.get("oneOf", schema.get("anyOf"))
+            key = "oneOf" if "oneOf" in schema else "anyOf"
+            nodes = [
+                self.compile_child(branch, key, str(index))
+                for index, branch in enumerate(branches)
+            ]
+            weights = branch_weights(schema, branches)
+            if weights is not None:
+                return WeightedOfNode(self.rng, nodes, weights)
+            return OfNode(self.rng, nodes)
+
+        if "$ref" in schema:
+            return self.compile_ref(schema["$ref"])
+
+        factory = self.factories.by_schema(schema)
+        if factory is not None:
+            return FactoryNode(self.rng, factory)
+
+        _type = schema["type"]
+        try:
+            handler = self._handlers[_type]
+        except (KeyError, TypeError):
+            raise UnsupportedType(_type)
+        return handler(schema)
+
+    def profiled(self, node: Node) -> Node:
+        """
+        Record the values of `node` under the current path, if profiling
+        """
+        if self.profiler is None:
+            return node
+        path = "#" + self.path
+        if isinstance(node, ProfiledNode) and node.path == path:
+            return node
+        return ProfiledNode(node, path, self.profiler)
+
+    def bounded(self, root: Node, schema: Any) -> Node:
+        """
+        Node sampling the tree of `root`: with an explicit stack and a
+        bounded depth (see `DepthLimitedNode`) for recursive schemas or if
+        `max_depth` is set, else `root` itself
+        """
+        if not self.recursive and self.max_depth is None:
+            return root
+        max_depth = DEFAULT_MAX_DEPTH if self.max_depth is None else self.max_depth
+        node = DepthLimitedNode(root, max_depth, self.decay)
+        if not node.finite:
+            raise InvalidSchema(schema, reason="schema only has infinite values")
+        return node
+
+    def compile_child(self, schema: Dict[str, Any], *keys: str) -> Node:
+        """
+        Compile a schema nested in the current one under `keys`
+        """
+        parent = self.path
+        self.path = parent + "".join("/" + escape(key) for key in keys)
+        try:
+            return self.compile(schema)
+        finally:
+            self.path = parent
+
+    def compile_ref(self, ref: str) -> Node:
+        refname = ref.split("#/definitions/")[-1]
+        try:
+            return self._compiled[refname]
+        except KeyError:
+            pass
+        try:
+            # Definition is being compiled further up: it is recursive
+            placeholder = self._pending[refname]
+            self.recursive = True
+            return placeholder
+        except KeyError:
+            pass
+
+        placeholder = self._pending[refname] = RefNode()
+        # Definitions are compiled once, at their own path
+        parent, self.path = self.path, ""
+        try:
+            node = self.compile_child(
+                self.definitions[refname], "definitions", refname  # type: ignore
+            )
+        finally:
+            self.path = parent
+        placeholder.target = node
+        del self._pending[refname]
+        self._compiled[refname] = node
+        return node
+
+    def compile_null(self, schema: Dict[str, Any]) -> Node:
+        return NullNode()
+
+    def compile_boolean(self, schema: Dict[str, Any]) -> Node:
+        return BooleanNode(self.rng)
+
+    def compile_string(self, schema: Dict[str, Any], string_max: int = 10) -> Node:
+        pattern = schema.get("pattern")
+        if pattern is not None:
+            try:
+                node: Node = PatternNode(self.rng, pattern)
+            except re.error as ex:
+                raise InvalidSchema(schema, reason=f"invalid pattern: {ex}")
+            return self.pooled(("pattern", pattern), node)
+
+        if schema.get("format") in TEMPORAL_FORMATS:
+            temporal = schema_temporal(schema)
+            return self.pooled(temporal, DateTimeNode(self.rng, temporal))
+
+        min_length = schema.get("minLength", 0)
+        max_length = schema.get("maxLength", max(string_max, min_length))
+        if min_length > max_length:
+            raise InvalidSchema(schema, reason="minLength is greater than maxLength")
+        return StringNode(
+            self.rng,
+            min_length,
+            max_length,
+            schema_alphabet(schema, self.alphabet),
+            bounded="maxLength" in schema,
+        )
+
+    def pooled(self, key: Hashable, node: Node) -> Node:
+        """
+        Draw the values of an expensive leaf `node` out of a pool, if pools
+        are enabled
+        """
+        if self.pools is None:
+            return node
+        return PoolNode(self.rng, self.pools.get(key, node))
+
+    def compile_integer(self, schema: Dict[str, Any]) -> Node:
+        if "multipleOf" in schema:
+            return MultipleOfNode(self.rng, multiples(schema, integer=True))
+        maximum, minimum = get_max_and_min(schema)
+        minimum, maximum = int(minimum), int(maximum)
+        if minimum > maximum:
+            raise InvalidSchema(schema, reason="minimum is greater than maximum")
+        if maximum - minimum >= _FLOAT_RANGE_MAX:
+            return WideIntegerNode(self.rng, minimum, maximum)
+        return IntegerNode(self.rng, minimum, maximum)
+
+    def compile_number(self, schema: Dict[str, Any]) -> Node:
+        if "multipleOf" in schema:
+            return MultipleOfNode(self.rng, multiples(schema, integer=False))
+        maximum, minimum = get_max_and_min(schema)
+        return NumberNode(self.rng, minimum, maximum)
+
+    def compile_array(self, schema: Dict[str, Any], array_max: int = 10) -> Node:
+        min_items = schema.get("minItems", 0)
+        max_items = schema.get("maxItems", array_max + min_items)
+        # Assume items are string if schema not provided
+        items_schema = schema.get("items", {"type": "string"})
+        items = self.compile_child(items_schema, "items")
+        if min_items > max_items:
+            raise InvalidSchema(schema, reason="minItems is greater than maxItems")
+        unique_items = schema.get("uniqueItems", False)
+        space = None
+        if unique_items:
+            if not _has_factory(items):
+                space = value_space(items_schema, self.definitions)
+            max_items = check_unique_items(schema, space, min_items, max_items)
+        return ArrayNode(
+            self.rng, schema, items, min_items, max_items, unique_items, space
+        )
+
+    def compile_object(self, schema: Dict[str, Any]) -> Node:
+        required_keys = schema.get("required", [])
+        return ObjectNode(
+            self.rng,
+            [
+                (
+                    key,
+                    self.compile_child(key_schema, "properties", key),
+                    key in required_keys,
+                )
+                for key, key_schema in schema.get("properties", {}).items()
+            ],
+        )
+
+
+class CompiledSchema:
+    """
+    Schema that has been validated and resolved once, ready to be
+    sampled as many times as needed.
+
+    All random values are drawn from `rng`, which is either a
+    `random.Random` instance or the `random` module itself. Strings are
+    made of characters of `alphabet`, unless their schema sets its own
+    `x-freddy-alphabet`. Custom factories are looked up in `factories`, or
+    the default registry (see `freddy.factories`). Patterns and dates are
+    drawn out of `pools` of pre-generated values if provided (see
+    `freddy.pools`). Generation is recorded by `profiler` if provided (see
+    `freddy.profiler`).
+
+    Recursive schemas, or all schemas if `max_depth` is set, are sampled
+    with a bounded depth: deeper values take the shortest way out, and
+    optional values get `decay` times as likely at each level (see
+    `DepthLimitedNode`).
+    """
+
+    __slots__ = ("schema", "rng", "root", "node", "_sized")
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        rng: RandomSource = random,
+        alphabet: str = DEFAULT_ALPHABET,
+        factories: Optional[Registry] = None,
+        pools: Optional[Pools] = None,
+        profiler: Optional[Profiler] = None,
+        max_depth: Optional[int] = None,
+        decay: float = 1.0,
+    ):
+        self.schema = schema
+        self.rng = rng
+        compiler = Compiler(
+            schema.get("definitions"),
+            rng=rng,
+            alphabet=alphabet,
+            factories=factories,
+            pools=pools,
+            profiler=profiler,
+            max_depth=max_depth,
+            decay=decay,
+        )
+        self.root = compiler.compile(schema)
+        # Node sampled: the root, or the depth limited engine over it
+        self.node = compiler.bounded(self.root, schema)
+        self._sized: Any = None
+
+    def sample(self) -> Any:
+        return self.node.sample()
+
+    def sample_many(self, n: int) -> List[Any]:
+        return self.node.sample_many(n)
+
+    def sample_sized(self, target_bytes: int) -> Any:
+        """
+        Sample of about `target_bytes` bytes of JSON text (see
+        `freddy.sizing`)
+        """
+        if self._sized is None:
+            from .sizing import SizedSampler
+
+            node = self.node
+            if isinstance(node, DepthLimitedNode):
+                max_depth = node.max_depth
+            else:
+                max_depth = DEFAULT_MAX_DEPTH
+            self._sized = SizedSampler(self.root, self.rng, max_depth)
+        return self._sized.sample(target_bytes)
+
+    def iter_samples(
+        self, n: Optional[int] = None, chunk_size: int = 1000
+    ) -> Iterator[Any]:
+        """
+        Lazily yield `n` samples (or endless samples if `n` is None),
+        generated in bulk `chunk_size` samples at a time
+        """
+        while n is None or n > 0:
+            size = chunk_size if n is None else min(chunk_size, n)
+            yield from self.node.sample_many(size)
+            if n is not None:
+                n -= size
+
+    def dump(
+        self,
+        stream: BinaryIO,
+        n: Optional[int] = None,
+        format: str = "ndjson",
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """
+        Write `n` samples to a binary `stream`. JSON samples are written
+        without building them in memory (see `freddy.stream.dump()`)
+        """
+        if format == "csv":
+            samples = self.iter_samples(n)
+            fields = self.fields()
+            write_samples(samples, stream, format, fields, chunk_size=chunk_size)
+        else:
+            dump(self.node, stream, n, format=format, chunk_size=chunk_size)
+
+    def fields(self) -> List[str]:
+        """
+        Properties of the samples, which must be objects
+        """
+        root = self.root
+        if isinstance(root, ProfiledNode):
+            root = root.node
+        if not isinstance(root, ObjectNode):
+            raise UnsupportedSchema(self.schema, reason="samples are not objects")
+        return [key for key, _, _ in root.properties]
+
+
+def compile(
+    schema: Dict[str, Any],
+    rng: RandomSource = random,
+    alphabet: str = DEFAULT_ALPHABET,
+    factories: Optional[Registry] = None,
+    pools: Optional[Pools] = None,
+    profiler: Optional[Profiler] = None,
+    max_depth: Optional[int] = None,
+    decay: float = 1.0,
+) -> CompiledSchema:
+    return CompiledSchema(
+        schema,
+        rng=rng,
+        alphabet=alphabet,
+        factories=factories,
+        pools=pools,
+        profiler=profiler,
+        max_depth=max_depth,
+        decay=decay,
+    )
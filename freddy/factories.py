@@ -0,0 +1,206 @@
+"""
+Custom factories of values, registered by schema type, string format or
+schema path.
+
+A factory is any callable that takes the random source and returns a
+value. Factories are looked up once, when a schema is compiled, so
+sampling calls them directly:
+
+    registry.register(lambda rng: rng.choice(EMAILS), format="email")
+    registry.register(lambda rng: rng.randint(1, 5), path="/properties/rating")
+
+Paths are JSON pointers into the schema, e.g. `/properties/user/items` or
+`/definitions/Address/properties/street`: properties of definitions are
+reached through the definition, wherever it is referenced from. A factory
+for a path replaces the whole schema at that path. Factories for formats
+and types only replace schemas without `const`, `enum`, `oneOf`, `anyOf`
+or `$ref`, formats first, and without string constraints (`pattern`,
+`minLength` and `maxLength`), which they are not told about.
+
+Factories with a `many(rng, n)` method, like `Pool`, generate batches of
+values at once. Built-in factories generate `email`, `hostname`, `ipv4`,
+`ipv6`, `uri` and `uuid` strings.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .strings import DEFAULT_ALPHABET, get_alphabet
+from .types import RandomSource
+
+Factory = Callable[[RandomSource], Any]
+
+# Keywords that factories by type or format can not be relied on to honour
+STRING_CONSTRAINTS = ("pattern", "minLength", "maxLength")
+
+
+class Pool:
+    """
+    Factory drawing values from a precomputed sequence, e.g. a million
+    realistic emails
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Sequence[Any]):
+        if not values:
+            raise ValueError("pool can not be empty")
+        self.values = values
+
+    def __call__(self, rng: RandomSource) -> Any:
+        values = self.values
+        return values[int(rng.random() * len(values))]
+
+    def many(self, rng: RandomSource, n: int) -> List[Any]:
+        return rng.choices(self.values, k=n)
+
+
+class Registry:
+    """
+    Factories by schema type, string format and schema path
+    """
+
+    def __init__(self, parent: Optional["Registry"] = None):
+        self.types: Dict[str, Factory] = {}
+        self.formats: Dict[str, Factory] = {}
+        self.paths: Dict[str, Factory] = {}
+        if parent is not None:
+            self.types.update(parent.types)
+            self.formats.update(parent.formats)
+            self.paths.update(parent.paths)
+
+    def register(
+        self,
+        factory: Factory,
+        *,
+        type: Optional[str] = None,
+        format: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> Factory:
+        """
+        Use `factory` for the schemas of a `type`, a `format` or at a
+        `path`
+        """
+        keys = [key for key in (type, format, path) if key is not None]
+        if len(keys) != 1:
+            raise ValueError("factories are registered by one of type, format or path")
+        if not callable(factory):
+            raise TypeError(f"factory {factory!r} is not callable")
+        if type is not None:
+            self.types[type] = factory
+        elif format is not None:
+            self.formats[format] = factory
+        else:
+            self.paths[path] = factory  # type: ignore
+        return factory
+
+    def unregister(
+        self,
+        *,
+        type: Optional[str] = None,
+        format: Optional[str] = None,
+        path: Optional[str] = None,
+    ) -> None:
+        if type is not None:
+            self.types.pop(type, None)
+        if format is not None:
+            self.formats.pop(format, None)
+        if path is not None:
+            self.paths.pop(path, None)
+
+    def copy(self) -> "Registry":
+        return Registry(self)
+
+    def by_path(self, path: str) -> Optional[Factory]:
+        return self.paths.get(path) if self.paths else None
+
+    def by_schema(self, schema: Dict[str, Any]) -> Optional[Factory]:
+        """
+        Factory for the format or else the type of a schema, if it has no
+        string constraints
+        """
+        if any(key in schema for key in STRING_CONSTRAINTS):
+            return None
+        _format = schema.get("format")
+        if _format is not None:
+            factory = self.formats.get(_format)
+            if factory is not None:
+                return factory
+        _type = schema.get("type")
+        if isinstance(_type, str):
+            return self.types.get(_type)
+        return None
+
+
+def escape(key: str) -> str:
+    """
+    Escape a property name as a JSON pointer token
+    """
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+_TLDS = ("com", "org", "net", "io", "dev")
+
+
+def _word(rng: RandomSource) -> str:
+    return get_alphabet(DEFAULT_ALPHABET).generate(rng, 3 + int(rng.random() * 8))
+
+
+def hostname(rng: RandomSource) -> str:
+    return _word(rng) + "." + _TLDS[int(rng.random() * len(_TLDS))]
+
+
+def email(rng: RandomSource) -> str:
+    return _word(rng) + "@" + hostname(rng)
+
+
+def uri(rng: RandomSource) -> str:
+    return "https://" + hostname(rng) + "/" + _word(rng)
+
+
+def ipv4(rng: RandomSource) -> str:
+    return "%d.%d.%d.%d" % tuple(rng.getrandbits(32).to_bytes(4, "big"))
+
+
+def ipv6(rng: RandomSource) -> str:
+    bits = rng.getrandbits(128)
+    return ":".join("%x" % (bits >> shift & 0xFFFF) for shift in range(112, -1, -16))
+
+
+def uuid4(rng: RandomSource) -> str:
+    # Version 4 and RFC 4122 variant bits, as set by uuid.UUID(version=4)
+    bits = (
+        rng.getrandbits(128) & ~(0xF000 << 64) & ~(0xC000 << 48)
+        | 4 << 76
+        | 0x8000 << 48
+    )
+    text = "%032x" % bits
+    return f"{text[:8]}-{text[8:12]}-{text[12:16]}-{text[16:20]}-{text[20:]}"
+
+
+# Default registry, used by compiled schemas and samplers unless they are
+# given their own
+registry = Registry()
+for _format, _factory in (
+    ("email", email),
+    ("hostname", hostname),
+    ("ipv4", ipv4),
+    ("ipv6", ipv6),
+    ("uri", uri),
+    ("uuid", uuid4),
+):
+    registry.register(_factory, format=_format)
+
+
+def register_factory(
+    factory: Factory,
+    *,
+    type: Optional[str] = None,
+    format: Optional[str] = None,
+    path: Optional[str] = None,
+) -> Factory:
+    """
+    Register a factory in the default registry (see `Registry.register()`).
+    Schemas that have already been compiled keep their factories: call
+    `freddy.clear_cache()` for cached pydantic models
+    """
+    return registry.register(factory, type=type, format=format, path=path)
@@ -1,21 +1,69 @@
-import copy
-import datetime
+import itertools
 import random
-import string
-from typing import Any, Callable, Dict, List, Tuple, Union
-
-import rstr
+import weakref
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from .exceptions import InvalidSchema, UnsupportedSchema, UnsupportedType
-from .types import Definitions
+from .factories import registry
+from .numbers import integer_range, multiples, number_range
+from .patterns import compile_pattern
+from .strings import schema_alphabet
+from .temporal import FORMATS as TEMPORAL_FORMATS
+from .temporal import schema_temporal
+from .types import Definitions, RandomSource
+from .weights import branch_weights, enum_weights
+
 
+def jsonschema(schema: Dict[str, Any], rng: RandomSource = random) -> Any:
+    return generate(schema, rng=rng)
 
-def jsonschema(schema: Dict[str, Any]) -> Any:
-    return generate(schema)
 
+def pydantic(model, rng: RandomSource = random) -> Any:
+    return generate(_get_schema(model), rng=rng)
 
-def pydantic(model) -> Any:
-    return generate(model.schema())
+
+# Json schemas of pydantic models, built once per model. Models are weakly
+# referenced, so that dynamically created models can still be collected
+_model_schemas: "weakref.WeakKeyDictionary[Any, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_schema(_input) -> Dict[str, Any]:
+    """
+    Json schema of the input, which is either a json schema already or a
+    pydantic model
+    """
+    if isinstance(_input, dict):
+        return _input
+    try:
+        return _model_schemas[_input]
+    except KeyError:
+        schema = _model_schemas[_input] = _input.schema()
+        return schema
+    except TypeError:
+        # Can not be weakly referenced
+        return _input.schema()
+
+
+def clear_schema_cache(model: Any = None) -> None:
+    """
+    Forget the cached json schema of `model`, or of all models
+    """
+    if model is None:
+        _model_schemas.clear()
+    else:
+        _model_schemas.pop(model, None)
 
 
 _unsupported_jsonschema_keys = (
@@ -24,7 +72,6 @@ _unsupported_jsonschema_keys = (
     "if",
     "then",
     "else",
-    "multipleOf",
     "patternProperties",
     "dependencies",
     "maxProperties",
@@ -65,13 +112,13 @@ def _validate_schema(schema: Dict[str, Any], definitions: Definitions = None):
         raise UnsupportedSchema(schema, reason="multiple types not supported yet")
 
 
-def generate(schema: Dict[str, Any], _definitions: Definitions = None) -> Any:
-    # Save copy of input schema if it's first time
+def generate(
+    schema: Dict[str, Any], _definitions: Definitions = None, rng: RandomSource = random
+) -> Any:
+    # Definitions are only ever read, so they are shared by reference
+    # with every nested call instead of being copied
     if _definitions is None:
-        try:
-            _definitions = copy.deepcopy(schema["definitions"])
-        except KeyError:
-            _definitions = None
+        _definitions = schema.get("definitions")
 
     _validate_schema(schema, _definitions)
 
@@ -79,115 +126,94 @@ def generate(schema: Dict[str, Any], _definitions: Definitions = None) -> Any:
         return schema["const"]
 
     if "enum" in schema:
-        return generate_enum(schema["enum"])
-
-    if "oneOf" in schema:
-        return generate_of(schema["oneOf"], _definitions)
+        return generate_enum(schema["enum"], rng=rng, weights=enum_weights(schema))
 
-    if "anyOf" in schema:
-        return generate_of(schema["anyOf"], _definitions)
+    if "oneOf" in schema or "anyOf" in schema:
+        branches = schema.get("oneOf", schema.get("anyOf"))
+        weights = branch_weights(schema, branches)
+        return generate_of(branches, _definitions, rng=rng, weights=weights)
 
     if "$ref" in schema:
         refname = schema["$ref"].split("#/definitions/")[-1]
         refschema = _definitions[refname]  # type: ignore
-        handler = get_definition_generator(refschema)
-        return handler(_definitions)
-
-    handlers = {
-        "null": lambda s: None,
-        "boolean": generate_boolean,
-        "string": generate_string,
-        "integer": generate_integer,
-        "number": generate_number,
-        "array": generate_array,
-        "object": generate_object,
-    }
+        return generate(refschema, _definitions=_definitions, rng=rng)
+
+    # Factories registered by path are only found by compiled schemas
+    factory = registry.by_schema(schema)
+    if factory is not None:
+        return factory(rng)
 
     _type = schema["type"]
     try:
-        handler = handlers[_type]  # type: ignore
-    except KeyError:
+        handler = _handlers[_type]  # type: ignore
+    except (KeyError, TypeError):
         raise UnsupportedType(_type)
 
     if _type in ("array", "object"):
-        return handler(schema, _definitions)
+        return handler(schema, _definitions, rng=rng)
     else:
         # Basic type
-        return handler(schema)
+        return handler(schema, rng=rng)
 
 
-def generate_string(schema: Dict[str, Any], string_max: int = 10) -> str:
+def generate_string(
+    schema: Dict[str, Any], string_max: int = 10, rng: RandomSource = random
+) -> str:
     pattern = schema.get("pattern")
     if pattern is not None:
-        return rstr.xeger(pattern)
-
-    supported_formats = ("date-time", "date", "time")
-    _format = schema.get("format")
-    if _format and _format in supported_formats:
-        if _format in ("date-time", "date", "time"):
-            start_datetime = datetime.datetime(
-                1900, 1, 1, random.randint(0, 24), random.randint(0, 60)
-            )
-            end_datetime = datetime.datetime(2050, 1, 1)
-            time_between_dates = end_datetime - start_datetime
-            days_between_dates = time_between_dates.days
-            random_number_of_days = random.randrange(days_between_dates)
-            random_datetime = start_datetime + datetime.timedelta(
-                days=random_number_of_days
-            )
-            if _format == "date-time":
-                return random_datetime.isoformat()
-            elif _format == "date":
-                return random_datetime.date().isoformat()
-            else:  # time
-                return random_datetime.time().isoformat()
+        return compile_pattern(pattern).generate(rng)
+
+    if schema.get("format") in TEMPORAL_FORMATS:
+        return schema_temporal(schema).generate(rng)
 
     minlength = schema.get("minLength", 0)
     maxlength = schema.get("maxLength", string_max)
-    length = random.randint(minlength, maxlength)
-    letters = string.ascii_lowercase
-    return "".join(random.choice(letters) for i in range(length))
+    length = rng.randint(minlength, maxlength)
+    return schema_alphabet(schema).generate(rng, length)
 
 
-def generate_integer(schema: Dict[str, Any]) -> int:
+def generate_integer(schema: Dict[str, Any], rng: RandomSource = random) -> int:
+    if "multipleOf" in schema:
+        return multiples(schema, integer=True).generate(rng)
     maximum, minimum = get_max_and_min(schema)
-    return random.randint(int(minimum), int(maximum))
+    return rng.randint(int(minimum), int(maximum))
 
 
 def get_max_and_min(
-    schema: Dict[str, Any]
+    schema: Dict[str, Any],
 ) -> Tuple[Union[int, float], Union[int, float]]:
-    minimum = schema.get("minimum", 0)
-    maximum = schema.get("maximum", 1000)
-    # Support exclusive ranges
-    try:
-        if schema["exclusiveMinimum"] is not None:
-            minimum = schema["exclusiveMinimum"] + 1
-    except KeyError:
-        pass
-    try:
-        if schema["exclusiveMaximum"] is not None:
-            maximum = schema["exclusiveMaximum"] - 1
-    except KeyError:
-        pass
+    # Exclusive bounds move to the next integer, or the next float
+    if schema.get("type") == "number":
+        minimum, maximum = number_range(schema)
+    else:
+        minimum, maximum = integer_range(schema)
     return maximum, minimum
 
 
-def generate_number(schema: Dict[str, Any]) -> Union[int, float]:
-    multiple = schema.get("multipleOf")
-    if multiple:
-        return multiple * random.randint(0, 100)
-    else:
-        maximum, minimum = get_max_and_min(schema)
-        return random.uniform(minimum, maximum)
+def generate_number(
+    schema: Dict[str, Any], rng: RandomSource = random
+) -> Union[int, float]:
+    if "multipleOf" in schema:
+        return multiples(schema, integer=False).generate(rng)
+    maximum, minimum = get_max_and_min(schema)
+    return rng.uniform(minimum, maximum)
 
 
-def generate_enum(choices: List[Any]) -> Any:
-    return random.choice(choices)
+def generate_enum(
+    choices: List[Any],
+    rng: RandomSource = random,
+    weights: Optional[List[float]] = None,
+) -> Any:
+    if weights is not None:
+        return rng.choices(choices, weights)[0]
+    return rng.choice(choices)
 
 
 def generate_array(
-    schema: Dict[str, Any], definitions: Definitions = None, array_max=10
+    schema: Dict[str, Any],
+    definitions: Definitions = None,
+    array_max=10,
+    rng: RandomSource = random,
 ) -> List[Any]:
     minitems = schema.get("minItems", 0)
     maxitems = schema.get("maxItems", array_max + minitems)
@@ -202,19 +228,210 @@ def generate_array(
     except KeyError:
         unique_items = False
 
-    result_len = random.randint(minitems, maxitems)
-    result: List[Any] = []
-    while len(result) < result_len:
-        item = generate(items_schema, _definitions=definitions)
-        if unique_items and item in result:
-            # skip duplicate
+    if not unique_items:
+        result_len = rng.randint(minitems, maxitems)
+        return [
+            generate(items_schema, _definitions=definitions, rng=rng)
+            for _ in range(result_len)
+        ]
+
+    space = value_space(items_schema, definitions)
+    maxitems = check_unique_items(schema, space, minitems, maxitems)
+    result_len = rng.randint(minitems, maxitems)
+    return generate_unique(
+        schema,
+        lambda: generate(items_schema, _definitions=definitions, rng=rng),
+        result_len,
+        space,
+        rng=rng,
+    )
+
+
+# Finite sets of values bigger than this are not enumerated
+VALUE_SPACE_LIMIT = 1000
+
+# Duplicates drawn in a row before giving up on generating unique items
+MAX_DUPLICATES = 1000
+
+
+def canonical_form(value: Any) -> Any:
+    """
+    Hashable form of a json value, equal for equal json values. Unlike in
+    python, true and 1 are different values in json.
+    """
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, dict):
+        return ("object", frozenset((k, canonical_form(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ("array", tuple(canonical_form(v) for v in value))
+    return value
+
+
+def _unique_values(values: Iterable[Any]) -> List[Any]:
+    seen = set()
+    result = []
+    for value in values:
+        key = canonical_form(value)
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+
+def value_space(
+    schema: Dict[str, Any],
+    definitions: Definitions = None,
+    limit: int = VALUE_SPACE_LIMIT,
+    _refs: Tuple[str, ...] = (),
+) -> Optional[Sequence[Any]]:
+    """
+    All the distinct values a schema can generate, if there are few enough
+    of them to be enumerated, else None. Integer ranges are returned as
+    `range`, whatever their size.
+    """
+    if "const" in schema:
+        return [schema["const"]]
+
+    if "enum" in schema:
+        weights = enum_weights(schema)
+        if weights is not None:
+            # Values that are never drawn are not part of the space
+            values = [v for v, w in zip(schema["enum"], weights) if w]
+            return _unique_values(values)
+        return _unique_values(schema["enum"])
+
+    if "oneOf" in schema or "anyOf" in schema:
+        values = []
+        branches = schema.get("oneOf", schema.get("anyOf"))
+        weights = branch_weights(schema, branches) or [1] * len(branches)
+        for subschema, weight in zip(branches, weights):
+            if not weight:
+                continue
+            subspace = value_space(subschema, definitions, limit, _refs)
+            if subspace is None or len(values) + len(subspace) > limit:
+                return None
+            values.extend(subspace)
+        return _unique_values(values)
+
+    ref = schema.get("$ref")
+    if ref:
+        refname = ref.split("#/definitions/")[-1]
+        if refname in _refs or not definitions or refname not in definitions:
+            # Recursive definitions have no end of values
+            return None
+        return value_space(definitions[refname], definitions, limit, _refs + (refname,))
+
+    _type = schema.get("type")
+    if _type == "null":
+        return [None]
+
+    if _type == "boolean":
+        return [True, False]
+
+    if _type == "integer":
+        if "multipleOf" in schema:
+            lattice = multiples(schema, integer=True)
+            first, step = lattice.first * lattice.numerator, lattice.numerator
+            return range(first, first + lattice.count * step, step)
+        maximum, minimum = get_max_and_min(schema)
+        return range(int(minimum), int(maximum) + 1)
+
+    if _type == "string" and "pattern" not in schema and "format" not in schema:
+        min_length = schema.get("minLength", 0)
+        max_length = schema.get("maxLength", max(10, min_length))
+        chars = schema_alphabet(schema).chars
+        count = 0
+        for length in range(min_length, max_length + 1):
+            # Counted up to the limit only, long strings have huge counts
+            count += len(chars) ** length
+            if count > limit:
+                return None
+        return _unique_values(
+            "".join(letters)
+            for length in range(min_length, max_length + 1)
+            for letters in itertools.product(chars, repeat=length)
+        )
+
+    if _type == "array" and schema.get("maxItems") == 0:
+        return [[]]
+
+    if _type == "object":
+        # Every combination of the values of the properties, which may be
+        # missing unless required
+        objects: List[Dict[str, Any]] = [{}]
+        required = schema.get("required", [])
+        for key, subschema in schema.get("properties", {}).items():
+            subspace = value_space(subschema, definitions, limit, _refs)
+            if subspace is None or len(objects) * (len(subspace) + 1) > limit:
+                return None
+            objects = [
+                dict(obj, **{key: value}) for obj in objects for value in subspace
+            ] + ([] if key in required else objects)
+        return objects
+
+    # Numbers, patterns, dates, arrays...
+    return None
+
+
+def check_unique_items(
+    schema: Dict[str, Any],
+    space: Optional[Sequence[Any]],
+    min_items: int,
+    max_items: int,
+) -> int:
+    """
+    Raise an error if an array schema needs more unique items than its
+    items can take distinct values, and return the maximum number of items
+    that can be generated
+    """
+    if space is None:
+        return max_items
+    if len(space) < min_items:
+        raise InvalidSchema(
+            schema,
+            reason=f"minItems is {min_items} but items only have {len(space)} "
+            "distinct values",
+        )
+    return min(max_items, len(space))
+
+
+def generate_unique(
+    schema: Dict[str, Any],
+    generate_item: Callable[[], Any],
+    length: int,
+    space: Optional[Sequence[Any]],
+    rng: RandomSource = random,
+) -> List[Any]:
+    """
+    Generate `length` distinct items: drawn without replacement from the
+    value space of the items if it is known, else generated until enough
+    distinct items are found
+    """
+    if space is not None:
+        return rng.sample(space, length)
+
+    seen = set()
+    result = []
+    duplicates = 0
+    while len(result) < length:
+        item = generate_item()
+        key = canonical_form(item)
+        if key in seen:
+            duplicates += 1
+            if duplicates > MAX_DUPLICATES:
+                raise InvalidSchema(
+                    schema, reason=f"could not generate {length} unique items"
+                )
             continue
+        seen.add(key)
         result.append(item)
+        duplicates = 0
     return result
 
 
 def generate_object(
-    schema: Dict[str, Any], definitions: Definitions = None
+    schema: Dict[str, Any], definitions: Definitions = None, rng: RandomSource = random
 ) -> Dict[str, Any]:
     try:
         required_keys = schema["required"]
@@ -223,22 +440,42 @@ def generate_object(
 
     # Include all required keys and flip a coin for all others
     return {
-        key: generate(key_schema, _definitions=definitions)
+        key: generate(key_schema, _definitions=definitions, rng=rng)
         for key, key_schema in schema.get("properties", {}).items()
-        if (required_keys and key in required_keys) or random.choice([True, False])
+        if (required_keys and key in required_keys) or rng.choice([True, False])
     }
 
 
-def generate_boolean(schema: Dict[str, Any]) -> bool:
-    return random.choice([True, False])
+def generate_boolean(schema: Dict[str, Any], rng: RandomSource = random) -> bool:
+    return rng.choice([True, False])
 
 
-def generate_of(schemas: List[Dict[str, Any]], definitions: Definitions = None) -> Any:
-    return generate(random.choice(schemas), _definitions=definitions)
+def generate_of(
+    schemas: List[Dict[str, Any]],
+    definitions: Definitions = None,
+    rng: RandomSource = random,
+    weights: Optional[List[float]] = None,
+) -> Any:
+    if weights is not None:
+        schema = rng.choices(schemas, weights)[0]
+    else:
+        schema = rng.choice(schemas)
+    return generate(schema, _definitions=definitions, rng=rng)
 
 
 def get_definition_generator(schema: Dict[str, Any]) -> Callable:
-    def new_func(definitions: Definitions = None):
-        return generate(schema, _definitions=definitions)
+    def new_func(definitions: Definitions = None, rng: RandomSource = random):
+        return generate(schema, _definitions=definitions, rng=rng)
 
     return new_func
+
+
+_handlers: Dict[str, Callable] = {
+    "null": lambda s, rng: None,
+    "boolean": generate_boolean,
+    "string": generate_string,
+    "integer": generate_integer,
+    "number": generate_number,
+    "array": generate_array,
+    "object": generate_object,
+}
@@ -0,0 +1,577 @@
+"""
+Native sampling of pydantic models (requires pydantic < 2).
+
+Models are compiled by walking their `__fields__` instead of their json
+schema, so samples keep their python types: datetimes, enums, sets,
+tuples, UUIDs, decimals and nested models. Samples are either model
+instances built with `construct()`, which skips validation, or plain
+dicts of native values.
+
+Constraints of the fields (`conint`, `constr`, `Field(..., ge=1)`...) are
+translated into the equivalent json schema keywords and compiled by the
+regular compiler. Decimals are rounded to their `decimal_places` within
+their `max_digits`. Urls and emails are drawn from the `uri` and `email`
+format factories, as strings, and other string types of pydantic with
+validators of their own are not supported.
+"""
+
+import datetime
+import decimal
+import enum
+import random
+import typing
+import uuid
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .compiler import (
+    ArrayNode,
+    BooleanNode,
+    CompiledSchema,
+    Compiler,
+    DateTimeNode,
+    EnumNode,
+    Expansion,
+    Node,
+    NullNode,
+    ObjectNode,
+    OfNode,
+    RefNode,
+    _has_factory,
+    _split,
+)
+from .exceptions import UnsupportedType
+from .factories import Registry, escape
+from .freddy import check_unique_items, value_space
+from .pools import Pools
+from .profiler import Profiler
+from .strings import DEFAULT_ALPHABET
+from .temporal import schema_temporal
+from .types import RandomSource
+
+try:
+    import pydantic
+    from pydantic.fields import (
+        SHAPE_DICT,
+        SHAPE_FROZENSET,
+        SHAPE_LIST,
+        SHAPE_SEQUENCE,
+        SHAPE_SET,
+        SHAPE_SINGLETON,
+        SHAPE_TUPLE,
+        SHAPE_TUPLE_ELLIPSIS,
+        ModelField,
+    )
+except ImportError:  # pragma: no cover
+    raise ImportError("freddy.models requires pydantic<2: pip install 'pydantic<2'")
+
+_TEMPORAL_FORMATS = {
+    datetime.datetime: "date-time",
+    datetime.date: "date",
+    datetime.time: "time",
+}
+
+
+class MapNode(Node):
+    """
+    Converts the samples of another node, e.g. lists into sets
+    """
+
+    __slots__ = ("node", "function")
+
+    def __init__(self, node: Node, function: Callable[[Any], Any]):
+        self.node = node
+        self.function = function
+
+    def sample(self) -> Any:
+        return self.function(self.node.sample())
+
+    def sample_many(self, n: int) -> List[Any]:
+        return list(map(self.function, self.node.sample_many(n)))
+
+    def children(self) -> Sequence[Node]:
+        return (self.node,)
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        function = self.function
+        return (self.node,), lambda values: function(values[0])
+
+
+class TupleNode(Node):
+    __slots__ = ("nodes",)
+
+    level = 1
+
+    def __init__(self, nodes: List[Node]):
+        self.nodes = tuple(nodes)
+
+    def sample(self) -> tuple:
+        return tuple(node.sample() for node in self.nodes)
+
+    def sample_many(self, n: int) -> List[tuple]:
+        return list(zip(*(node.sample_many(n) for node in self.nodes)))
+
+    def children(self) -> Sequence[Node]:
+        return self.nodes
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        return self.nodes, tuple
+
+
+class DictNode(Node):
+    __slots__ = ("keys", "values", "min_items", "max_items", "_random", "_choices")
+
+    level = 1
+
+    def __init__(
+        self,
+        rng: RandomSource,
+        keys: Node,
+        values: Node,
+        min_items: int,
+        max_items: int,
+    ):
+        self.keys = keys
+        self.values = values
+        self.min_items = min_items
+        self.max_items = max_items
+        self._random = rng.random
+        self._choices = rng.choices
+
+    def sample(self) -> Dict[Any, Any]:
+        span = self.max_items - self.min_items + 1
+        length = self.min_items + int(self._random() * span)
+        return {self.keys.sample(): self.values.sample() for _ in range(length)}
+
+    def sample_many(self, n: int) -> List[Dict[Any, Any]]:
+        lengths = self._choices(range(self.min_items, self.max_items + 1), k=n)
+        total = sum(lengths)
+        pairs = list(zip(self.keys.sample_many(total), self.values.sample_many(total)))
+        return [dict(items) for items in _split(pairs, lengths)]
+
+    def children(self) -> Sequence[Node]:
+        return (self.keys, self.values)
+
+    def required_children(self) -> Sequence[Node]:
+        return (self.keys, self.values) if self.min_items else ()
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        span = (self.max_items - self.min_items) * scale + 1
+        length = self.min_items + int(self._random() * span)
+        return [self.keys, self.values] * length, _pairs_to_dict
+
+
+def _pairs_to_dict(values: List[Any]) -> Dict[Any, Any]:
+    return dict(zip(values[::2], values[1::2]))
+
+
+class NativeDateTimeNode(DateTimeNode):
+    __slots__ = ()
+
+    def sample(self) -> Any:
+        return self.sample_value()
+
+    def sample_many(self, n: int) -> List[Any]:
+        value, rng = self.temporal.value, self.rng
+        return [value(rng) for _ in range(n)]
+
+
+class UUIDNode(Node):
+    __slots__ = ("_getrandbits",)
+
+    def __init__(self, rng: RandomSource):
+        self._getrandbits = rng.getrandbits
+
+    def sample(self) -> uuid.UUID:
+        return uuid.UUID(int=self._getrandbits(128), version=4)
+
+
+class ModelNode(ObjectNode):
+    """
+    Samples a model as an instance built with `construct()`, or as a dict
+    of its field values. The model is weakly referenced, so that compiled
+    models cached by model do not keep it alive
+    """
+
+    __slots__ = ("_model", "construct")
+
+    def __init__(
+        self,
+        rng: RandomSource,
+        model: Any,
+        fields: List[Any],
+        construct: bool = True,
+    ):
+        super().__init__(rng, fields)
+        self._model = weakref.ref(model)
+        self.construct = construct
+
+    @property
+    def model(self) -> Any:
+        return self._model()
+
+    def build(self, values: Dict[str, Any]) -> Any:
+        return self._model().construct(**values) if self.construct else values
+
+    def sample(self) -> Any:
+        return self.build(super().sample())
+
+    def sample_many(self, n: int) -> List[Any]:
+        objects = super().sample_many(n)
+        if not self.construct:
+            return objects
+        construct = self._model().construct
+        return [construct(**values) for values in objects]
+
+    def expand(self, scale: float) -> Optional[Expansion]:
+        nodes, build = super().expand(scale)  # type: ignore
+        if not self.construct:
+            return nodes, build
+        construct = self._model().construct
+        return nodes, lambda values: construct(**build(values))
+
+
+def _bounds_schema(_type: Any, json_type: str) -> Dict[str, Any]:
+    """
+    Json schema of a constrained number type
+    """
+    schema: Dict[str, Any] = {"type": json_type}
+    for attribute, key in (
+        ("ge", "minimum"),
+        ("le", "maximum"),
+        ("gt", "exclusiveMinimum"),
+        ("lt", "exclusiveMaximum"),
+        ("multiple_of", "multipleOf"),
+    ):
+        value = getattr(_type, attribute, None)
+        if value is not None:
+            schema[key] = value
+    return schema
+
+
+def _string_schema(_type: Any) -> Dict[str, Any]:
+    schema: Dict[str, Any] = {"type": "string"}
+    if getattr(_type, "min_length", None) is not None:
+        schema["minLength"] = _type.min_length
+    if getattr(_type, "max_length", None) is not None:
+        schema["maxLength"] = _type.max_length
+    regex = getattr(_type, "regex", None)
+    if regex is not None:
+        schema["pattern"] = getattr(regex, "pattern", regex)
+    return schema
+
+
+class ModelCompiler(Compiler):
+    """
+    Walks the fields of pydantic models and builds the equivalent tree of
+    nodes, sampling native python values
+    """
+
+    def __init__(
+        self,
+        rng: RandomSource = random,
+        alphabet: str = DEFAULT_ALPHABET,
+        construct: bool = True,
+        factories: Optional[Registry] = None,
+        pools: Optional[Pools] = None,
+        profiler: Optional[Profiler] = None,
+        max_depth: Optional[int] = None,
+        decay: float = 1.0,
+    ):
+        super().__init__(
+            None,
+            rng=rng,
+            alphabet=alphabet,
+            factories=factories,
+            pools=pools,
+            profiler=profiler,
+            max_depth=max_depth,
+            decay=decay,
+        )
+        self.construct = construct
+        self._models: Dict[Any, Node] = {}
+        self._pending_models: Dict[Any, RefNode] = {}
+
+    def compile_model(self, model: Any) -> Node:
+        try:
+            return self._models[model]
+        except KeyError:
+            pass
+        try:
+            # Model is being compiled further up: it is recursive
+            placeholder = self._pending_models[model]
+            self.recursive = True
+            return placeholder
+        except KeyError:
+            pass
+
+        parent = self.path
+        if self._pending_models:
+            # Nested models are laid out as definitions, as in json schemas
+            self.path = "/definitions/" + escape(model.__name__)
+        placeholder = self._pending_models[model] = RefNode()
+        try:
+            node = self.profiled(
+                ModelNode(
+                    self.rng,
+                    model,
+                    [
+                        (name, self.compile_property(name, field), field.required)
+                        for name, field in model.__fields__.items()
+                    ],
+                    construct=self.construct,
+                )
+            )
+        finally:
+            self.path = parent
+        placeholder.target = node
+        del self._pending_models[model]
+        self._models[model] = node
+        return node
+
+    def compile_property(self, name: str, field: ModelField) -> Node:
+        parent = self.path
+        self.path = parent + "/properties/" + escape(name)
+        try:
+            return self.profiled(self.compile_field(field))
+        finally:
+            self.path = parent
+
+    def compile_field(self, field: ModelField) -> Node:
+        node = self.compile_shape(field)
+        if field.allow_none and not isinstance(node, NullNode):
+            node = OfNode(self.rng, [node, NullNode()])
+        return node
+
+    def compile_shape(self, field: ModelField) -> Node:
+        shape = field.shape
+        if shape == SHAPE_SINGLETON:
+            if field.sub_fields and not _is_literal(field.type_):
+                # Union
+                return OfNode(
+                    self.rng, [self.compile_field(f) for f in field.sub_fields]
+                )
+            return self.compile_type(field.type_)
+
+        if shape == SHAPE_TUPLE:
+            return TupleNode([self.compile_field(f) for f in field.sub_fields])
+
+        if shape in (SHAPE_LIST, SHAPE_SEQUENCE, SHAPE_TUPLE_ELLIPSIS):
+            node = self.compile_items(field, unique=False)
+            return MapNode(node, tuple) if shape == SHAPE_TUPLE_ELLIPSIS else node
+
+        if shape in (SHAPE_SET, SHAPE_FROZENSET):
+            node = self.compile_items(field, unique=True)
+            return MapNode(node, set if shape == SHAPE_SET else frozenset)
+
+        if shape == SHAPE_DICT:
+            return DictNode(
+                self.rng,
+                self.compile_field(field.key_field),
+                self.compile_field(field.sub_fields[0]),
+                0,
+                10,
+            )
+
+        raise UnsupportedType(field.outer_type_)
+
+    def compile_items(self, field: ModelField, unique: bool) -> Node:
+        items = self.compile_field(field.sub_fields[0])
+        # Constraints of conlist() and conset()
+        min_items = getattr(field.outer_type_, "min_items", None) or 0
+        max_items = getattr(field.outer_type_, "max_items", None)
+        if max_items is None:
+            max_items = 10 + min_items
+        schema = {"type": "array", "minItems": min_items, "maxItems": max_items}
+        space = None
+        if unique:
+            items_schema = _space_schema(field.sub_fields[0])
+            if items_schema is not None and not _has_factory(items):
+                space = value_space(items_schema)
+            max_items = check_unique_items(schema, space, min_items, max_items)
+        return ArrayNode(self.rng, schema, items, min_items, max_items, unique, space)
+
+    def compile_type(self, _type: Any) -> Node:
+        if _is_literal(_type):
+            return EnumNode(self.rng, list(typing.get_args(_type)))
+        if _type is Any or _type is type(None):
+            return NullNode()
+        if not isinstance(_type, type):
+            raise UnsupportedType(_type)
+
+        if issubclass(_type, pydantic.BaseModel):
+            return self.compile_model(_type)
+        if issubclass(_type, enum.Enum):
+            return EnumNode(self.rng, list(_type))
+        if issubclass(_type, bool):
+            return BooleanNode(self.rng)
+        if issubclass(_type, int):
+            return self.compile(_bounds_schema(_type, "integer"))
+        if issubclass(_type, decimal.Decimal):
+            return self.compile_decimal(_type)
+        if issubclass(_type, float):
+            return self.compile(_bounds_schema(_type, "number"))
+        if issubclass(_type, str):
+            return self.compile_str(_type)
+        if issubclass(_type, bytes):
+            return MapNode(self.compile(_string_schema(_type)), str.encode)
+        if issubclass(_type, uuid.UUID):
+            return UUIDNode(self.rng)
+        for temporal_type, _format in _TEMPORAL_FORMATS.items():
+            if issubclass(_type, temporal_type):
+                temporal = schema_temporal({"format": _format})
+                return NativeDateTimeNode(self.rng, temporal)
+        raise UnsupportedType(_type)
+
+    def compile_decimal(self, _type: Any) -> Node:
+        schema = _bounds_schema(_type, "number")
+        places = getattr(_type, "decimal_places", None)
+        max_digits = getattr(_type, "max_digits", None)
+        if max_digits is not None:
+            if places is None:
+                places = 0
+            # Greatest decimal of `max_digits` digits, `places` of them after
+            # the point
+            bound = decimal.Decimal(10) ** (max_digits - places)
+            bound -= decimal.Decimal(10) ** -places
+            schema["maximum"] = min(schema.get("maximum", bound), bound)
+            schema["minimum"] = max(schema.get("minimum", -bound), -bound)
+        if places is None:
+            return MapNode(self.compile(schema), _to_decimal)
+        quantum = decimal.Decimal(10) ** -places
+        if "multipleOf" not in schema:
+            schema["multipleOf"] = quantum
+        return MapNode(
+            self.compile(schema), lambda value: _to_decimal(value).quantize(quantum)
+        )
+
+    def compile_str(self, _type: Any) -> Node:
+        if issubclass(_type, pydantic.AnyUrl):
+            schemes = _type.allowed_schemes
+            if _type.user_required or not (schemes is None or "https" in schemes):
+                raise UnsupportedType(_type)
+            return self.compile_format(_type, "uri")
+        if issubclass(_type, pydantic.EmailStr):
+            return self.compile_format(_type, "email")
+        if issubclass(_type, pydantic.ConstrainedStr) or not hasattr(
+            _type, "__get_validators__"
+        ):
+            return self.compile(_string_schema(_type))
+        # Validated by pydantic in ways unknown to json schemas
+        raise UnsupportedType(_type)
+
+    def compile_format(self, _type: Any, _format: str) -> Node:
+        if self.factories.by_path(self.path) is None and (
+            _format not in self.factories.formats
+        ):
+            raise UnsupportedType(_type)
+        return self.compile({"type": "string", "format": _format})
+
+
+def _to_decimal(value: float) -> decimal.Decimal:
+    # Decimal of the shortest repr, e.g. 0.1 instead of 0.1000000000000000055...
+    return decimal.Decimal(repr(value))
+
+
+def _is_literal(_type: Any) -> bool:
+    return typing.get_origin(_type) is typing.Literal
+
+
+def _space_schema(field: ModelField) -> Optional[Dict[str, Any]]:
+    """
+    Json schema with the same distinct values as a field, for the fields
+    whose values can be enumerated (see `freddy.freddy.value_space()`)
+    """
+    if field.shape != SHAPE_SINGLETON:
+        return None
+    _type = field.type_
+    if field.sub_fields and not _is_literal(_type):
+        # Union
+        branches = [_space_schema(f) for f in field.sub_fields]
+        if any(branch is None for branch in branches):
+            return None
+        schema: Dict[str, Any] = {"anyOf": branches}
+    elif _is_literal(_type):
+        schema = {"enum": list(typing.get_args(_type))}
+    elif not isinstance(_type, type):
+        return None
+    elif issubclass(_type, enum.Enum):
+        schema = {"enum": list(_type)}
+    elif issubclass(_type, bool):
+        schema = {"type": "boolean"}
+    elif issubclass(_type, int):
+        schema = _bounds_schema(_type, "integer")
+    else:
+        return None
+    if field.allow_none:
+        schema = {"anyOf": [schema, {"type": "null"}]}
+    return schema
+
+
+class CompiledModel(CompiledSchema):
+    """
+    Pydantic model compiled once, ready to be sampled as many times as
+    needed as model instances (with `construct=True`) or dicts of native
+    values
+    """
+
+    __slots__ = ("_model", "construct")
+
+    def __init__(
+        self,
+        model: Any,
+        rng: RandomSource = random,
+        alphabet: str = DEFAULT_ALPHABET,
+        construct: bool = True,
+        factories: Optional[Registry] = None,
+        pools: Optional[Pools] = None,
+        profiler: Optional[Profiler] = None,
+        max_depth: Optional[int] = None,
+        decay: float = 1.0,
+    ):
+        # Weakly referenced, as compiled models are cached by model
+        self._model = weakref.ref(model)
+        self.construct = construct
+        self.schema = None  # type: ignore
+        self.rng = rng
+        compiler = ModelCompiler(
+            rng=rng,
+            alphabet=alphabet,
+            construct=construct,
+            factories=factories,
+            pools=pools,
+            profiler=profiler,
+            max_depth=max_depth,
+            decay=decay,
+        )
+        self.root = compiler.compile_model(model)
+        self.node = compiler.bounded(self.root, model)
+        self._sized = None
+
+    @property
+    def model(self) -> Any:
+        return self._model()
+
+
+def compile_model(
+    model: Any,
+    rng: RandomSource = random,
+    alphabet: str = DEFAULT_ALPHABET,
+    construct: bool = True,
+    factories: Optional[Registry] = None,
+    pools: Optional[Pools] = None,
+    profiler: Optional[Profiler] = None,
+    max_depth: Optional[int] = None,
+    decay: float = 1.0,
+) -> CompiledModel:
+    return CompiledModel(
+        model,
+        rng=rng,
+        alphabet=alphabet,
+        construct=construct,
+        factories=factories,
+        pools=pools,
+        profiler=profiler,
+        max_depth=max_depth,
+        decay=decay,
+    )
@@ -0,0 +1,204 @@
+"""
+Ranges of integers and numbers, and lattices of their multiples.
+
+Bounds default to 0 and 1000. When only one bound is given and it is
+past the default of the other one, the other one is moved to 1000 from
+it, e.g. to -1005 for a maximum of -5. Exclusive bounds,
+given as numbers or as booleans next to `minimum` and `maximum`, are
+moved inwards: to the next integer for integers, and to the next float
+for numbers.
+
+Values of `multipleOf` schemas are drawn as `k * multipleOf`, for a
+random `k` between the least and greatest ones within the bounds, which
+are worked out exactly from the decimal values of the schema: no value
+is drawn and rejected, however sparse the multiples are. Values are
+exact decimal multiples, e.g. 0.3 for a `multipleOf` of 0.1, even if no
+float passes the check of validators comparing floats, like jsonschema.
+"""
+
+import math
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from .exceptions import InvalidSchema
+from .types import RandomSource
+
+if TYPE_CHECKING:  # pragma: no cover
+    from fractions import Fraction
+
+DEFAULT_MINIMUM = 0
+DEFAULT_MAXIMUM = 1000
+
+# Least number of multiples between default bounds
+DEFAULT_MULTIPLES = 100
+
+# Random integers in a range, and multiples, are drawn from a single random
+# float, as random.choices() does: several times cheaper than randint() and
+# uniform enough for ranges up to this size
+_FLOAT_RANGE_MAX = 2**32
+
+Number = Union[int, float]
+
+
+def _bound(
+    schema: Dict[str, Any], key: str, exclusive_key: str, lower: bool
+) -> Tuple[Optional[Number], bool]:
+    """
+    Bound of a schema, and whether it is exclusive
+    """
+    value = schema.get(key)
+    exclusive = schema.get(exclusive_key)
+    if isinstance(exclusive, bool):
+        # Draft 4: a flag on the bound
+        return value, exclusive and value is not None
+    if exclusive is None:
+        return value, False
+    if value is None or (exclusive >= value if lower else exclusive <= value):
+        return exclusive, True
+    return value, False
+
+
+def _exact(value: Number) -> "Fraction":
+    from fractions import Fraction
+
+    # Floats stand for the decimal number they are written as
+    return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+
+
+def _next_float(value: float, up: bool) -> float:
+    """
+    Float next to `value`, upwards or downwards
+    """
+    if value == 0:
+        return 5e-324 if up else -5e-324
+    (bits,) = struct.unpack("<q", struct.pack("<d", value))
+    bits += 1 if (value > 0) == up else -1
+    (result,) = struct.unpack("<d", struct.pack("<q", bits))
+    return result
+
+
+def _defaults(
+    minimum: Optional[Number], maximum: Optional[Number]
+) -> Tuple[Number, Number]:
+    """
+    Bounds, with missing ones set to their defaults, or moved to the
+    default width from the bound that is given if it is past them
+    """
+    width = DEFAULT_MAXIMUM - DEFAULT_MINIMUM
+    if minimum is None:
+        minimum = DEFAULT_MINIMUM
+        if maximum is not None and maximum < minimum:
+            minimum = maximum - width
+    if maximum is None:
+        maximum = DEFAULT_MAXIMUM
+        if minimum > maximum:
+            maximum = minimum + width
+    return minimum, maximum
+
+
+def integer_range(schema: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Least and greatest integers of a schema
+    """
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+    lower, exclusive = _bound(schema, "minimum", "exclusiveMinimum", True)
+    if lower is not None:
+        minimum = math.floor(lower) + 1 if exclusive else math.ceil(lower)
+    upper, exclusive = _bound(schema, "maximum", "exclusiveMaximum", False)
+    if upper is not None:
+        maximum = math.ceil(upper) - 1 if exclusive else math.floor(upper)
+    low, high = _defaults(minimum, maximum)
+    return int(low), int(high)
+
+
+def number_range(schema: Dict[str, Any]) -> Tuple[float, float]:
+    """
+    Least and greatest floats of a schema
+    """
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    lower, exclusive = _bound(schema, "minimum", "exclusiveMinimum", True)
+    if lower is not None:
+        minimum = _next_float(float(lower), True) if exclusive else float(lower)
+    upper, exclusive = _bound(schema, "maximum", "exclusiveMaximum", False)
+    if upper is not None:
+        maximum = _next_float(float(upper), False) if exclusive else float(upper)
+    low, high = _defaults(minimum, maximum)
+    return float(low), float(high)
+
+
+class Lattice:
+    """
+    Multiples `k * numerator / denominator` of a schema, for `count`
+    consecutive values of `k` from `first`
+    """
+
+    __slots__ = ("first", "count", "numerator", "denominator")
+
+    def __init__(self, first: int, count: int, numerator: int, denominator: int):
+        self.first = first
+        self.count = count
+        self.numerator = numerator
+        self.denominator = denominator
+
+    def value(self, k: int) -> Number:
+        if self.denominator == 1:
+            return k * self.numerator
+        # Correctly rounded: the float closest to the exact multiple
+        return k * self.numerator / self.denominator
+
+    def generate(self, rng: RandomSource) -> Number:
+        if self.count > _FLOAT_RANGE_MAX:
+            return self.value(rng.randrange(self.first, self.first + self.count))
+        return self.value(self.first + int(rng.random() * self.count))
+
+    def generate_many(self, rng: RandomSource, n: int) -> List[Number]:
+        if self.count > _FLOAT_RANGE_MAX:
+            return [self.generate(rng) for _ in range(n)]
+        ks = rng.choices(range(self.first, self.first + self.count), k=n)
+        numerator, denominator = self.numerator, self.denominator
+        if denominator == 1:
+            return [k * numerator for k in ks]
+        return [k * numerator / denominator for k in ks]
+
+
+def multiples(schema: Dict[str, Any], integer: bool) -> Lattice:
+    """
+    Lattice of the multiples of a `multipleOf` schema within its bounds,
+    integers only if `integer`. Missing bounds are widened from their
+    defaults to take in at least `DEFAULT_MULTIPLES` multiples
+    """
+    # Imported on first use, few schemas have multiples
+    from fractions import Fraction
+
+    multiple = _exact(schema["multipleOf"])
+    if multiple <= 0:
+        raise InvalidSchema(schema, reason="multipleOf must be greater than 0")
+    if integer:
+        # Integer multiples of p/q are the multiples of p
+        multiple = Fraction(multiple.numerator)
+    span = DEFAULT_MULTIPLES * multiple
+
+    lower, lower_exclusive = _bound(schema, "minimum", "exclusiveMinimum", True)
+    upper, upper_exclusive = _bound(schema, "maximum", "exclusiveMaximum", False)
+    low = None if lower is None else _exact(lower)
+    high = None if upper is None else _exact(upper)
+    if low is None:
+        low = Fraction(DEFAULT_MINIMUM)
+        if high is not None:
+            low = min(low, high - span)
+    if high is None:
+        high = max(Fraction(DEFAULT_MAXIMUM), low + span)
+
+    first = math.ceil(low / multiple)
+    if lower_exclusive and first * multiple == low:
+        first += 1
+    last = math.floor(high / multiple)
+    if upper_exclusive and last * multiple == high:
+        last -= 1
+    if first > last:
+        raise InvalidSchema(
+            schema, reason="no multiple of multipleOf between minimum and maximum"
+        )
+    return Lattice(first, last - first + 1, multiple.numerator, multiple.denominator)
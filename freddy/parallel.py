@@ -0,0 +1,136 @@
+"""
+Sampling over a pool of processes.
+
+The schema is sent to every worker once, when the pool starts, and
+compiled there with the options of the sampler: alphabet, factories,
+pools and depth limits. Factories must be picklable, e.g. functions
+defined at module level, and every worker fills its own pools.
+
+Samples are then generated in chunks, each one from its own seed
+derived from the main seed and the chunk number, so the output only
+depends on the seed, the number of samples and the chunk size. With
+pools, it also depends on which worker runs which chunk.
+Chunks are streamed back in order, with a bounded number of them in
+flight at any time.
+"""
+
+import hashlib
+import multiprocessing
+import pickle
+import random
+from collections import deque
+from itertools import count, islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .compiler import CompiledSchema, compile
+from .factories import Registry
+from .pools import Pools
+from .strings import DEFAULT_ALPHABET
+
+_rng = random.Random()
+_compiled: Optional[CompiledSchema] = None
+
+
+def _init_worker(schema: Dict[str, Any], options: Dict[str, Any]) -> None:
+    global _compiled
+    pools = options.pop("pools")
+    if pools is not None:
+        # Pools of the same size, filled from the worker's random source
+        options["pools"] = Pools(*pools)
+    _compiled = compile(schema, rng=_rng, **options)
+
+
+def _sample_chunk(task: Tuple[int, int]) -> List[Any]:
+    size, seed = task
+    _rng.seed(seed)
+    return _compiled.sample_many(size)  # type: ignore
+
+
+def chunk_seed(seed: int, index: int) -> int:
+    """
+    Seed of the chunk number `index` for the given main seed
+    """
+    digest = hashlib.sha256(f"{seed}:{index}".encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def _chunk_sizes(n: Optional[int], chunk_size: int) -> Iterator[int]:
+    if n is None:
+        while True:
+            yield chunk_size
+    full, rest = divmod(n, chunk_size)
+    yield from (chunk_size for _ in range(full))
+    if rest:
+        yield rest
+
+
+def _iter_chunks(
+    schema: Dict[str, Any],
+    n: Optional[int],
+    workers: int,
+    seed: int,
+    chunk_size: int,
+    options: Dict[str, Any],
+) -> Iterator[Any]:
+    tasks = (
+        (size, chunk_seed(seed, index))
+        for index, size in zip(count(), _chunk_sizes(n, chunk_size))
+    )
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=(schema, options)
+    ) as pool:
+        # Keep every worker busy, but do not let finished chunks pile up
+        # in memory faster than they are consumed
+        pending: Deque = deque(
+            pool.apply_async(_sample_chunk, (task,))
+            for task in islice(tasks, workers * 2)
+        )
+        while pending:
+            chunk = pending.popleft().get()
+            for task in islice(tasks, 1):
+                pending.append(pool.apply_async(_sample_chunk, (task,)))
+            yield from chunk
+
+
+def iter_samples(
+    schema: Dict[str, Any],
+    n: Optional[int] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    chunk_size: int = 1000,
+    alphabet: str = DEFAULT_ALPHABET,
+    factories: Optional[Registry] = None,
+    pools: Optional[Pools] = None,
+    max_depth: Optional[int] = None,
+    decay: float = 1.0,
+) -> Iterator[Any]:
+    """
+    Lazily yield `n` samples (endless if not provided) generated by
+    `workers` processes, one per cpu by default. Schemas are compiled
+    with `alphabet`, `factories`, `max_depth` and `decay` as by
+    `freddy.compile()`, and pools of the size and fill of `pools`
+    """
+    options = {
+        "alphabet": alphabet,
+        "factories": factories,
+        "pools": None if pools is None else (pools.size, pools.fill),
+        "max_depth": max_depth,
+        "decay": decay,
+    }
+    # Fail early on invalid schemas instead of in every worker
+    compile(
+        schema,
+        alphabet=alphabet,
+        factories=factories,
+        max_depth=max_depth,
+        decay=decay,
+    )
+    if factories is not None:
+        try:
+            pickle.dumps(factories)
+        except Exception as ex:
+            raise ValueError(f"factories can not be sent to workers: {ex}")
+    if seed is None:
+        seed = random.getrandbits(64)
+    workers = workers or multiprocessing.cpu_count()
+    return _iter_chunks(schema, n, workers, seed, chunk_size, options)
@@ -0,0 +1,277 @@
+"""
+Generation of strings matching a regular expression.
+
+Each pattern is parsed once into a generation plan, which is cached.
+Patterns made only of literals and character classes, optionally
+repeated (e.g. `^[A-Z]{2}-\\d{3,5}$`), get a flat plan that draws all the
+characters of a repetition at once. Other patterns get a tree of
+generator functions, and the few regex features that are not supported
+by plans are left to rstr.
+"""
+
+import functools
+import string
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .strings import get_alphabet
+from .types import RandomSource
+
+try:
+    import re._parser as sre_parse  # type: ignore
+except ImportError:  # Python < 3.11
+    import sre_parse  # type: ignore
+
+# Upper bound of repetitions for `*`, `+` and `{n,}`, same as rstr
+STAR_PLUS_LIMIT = 100
+
+PATTERN_CACHE_SIZE = 1024
+
+_PRINTABLE = frozenset(string.printable)
+_WORD = string.ascii_letters + string.digits + "_"
+
+# Same alphabets as rstr, sorted so that seeded generation is reproducible
+_CATEGORIES = {
+    "CATEGORY_DIGIT": string.digits,
+    "CATEGORY_NOT_DIGIT": string.ascii_letters + string.punctuation,
+    "CATEGORY_SPACE": string.whitespace,
+    "CATEGORY_NOT_SPACE": string.printable.strip(),
+    "CATEGORY_WORD": _WORD,
+    "CATEGORY_NOT_WORD": "".join(sorted(_PRINTABLE.difference(_WORD))),
+}
+
+Groups = Dict[int, str]
+Generator = Callable[[RandomSource, Groups], str]
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _opname(code: Any) -> str:
+    return getattr(code, "name", str(code)).upper()
+
+
+def _alphabet(state: Tuple[Any, Any]) -> Optional[str]:
+    """
+    Characters a state can match, if it matches exactly one character
+    """
+    opcode, value = state
+    name = _opname(opcode)
+    if name == "LITERAL":
+        return chr(value)
+    if name == "NOT_LITERAL":
+        return "".join(sorted(_PRINTABLE.difference(chr(value))))
+    if name == "ANY":
+        return "".join(sorted(_PRINTABLE.difference("\n")))
+    if name != "IN":
+        return None
+
+    chars = set()
+    negate = False
+    for opcode, value in value:
+        name = _opname(opcode)
+        if name == "NEGATE":
+            negate = True
+        elif name == "LITERAL":
+            chars.add(chr(value))
+        elif name == "RANGE":
+            chars.update(chr(i) for i in range(value[0], value[1] + 1))
+        elif name == "CATEGORY":
+            try:
+                chars.update(_CATEGORIES[_opname(value)])
+            except KeyError:
+                raise _Unsupported(_opname(value))
+        else:
+            raise _Unsupported(name)
+    if negate:
+        chars = _PRINTABLE.difference(chars)
+    return "".join(sorted(chars))
+
+
+def _repeat_bounds(value: Tuple[int, int, Any]) -> Tuple[int, int]:
+    minimum, maximum, _ = value
+    return minimum, min(maximum, max(minimum, STAR_PLUS_LIMIT))
+
+
+class PatternGenerator:
+    """
+    Generates strings matching `pattern` with any random source
+    """
+
+    __slots__ = ("pattern",)
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+
+    def generate(self, rng: RandomSource) -> str:
+        # Imported on first use, few patterns need it
+        import rstr
+
+        return rstr.Rstr(rng).xeger(self.pattern)
+
+
+class SimplePatternGenerator(PatternGenerator):
+    """
+    Plan for patterns that are a flat sequence of literals and
+    (repeated) character classes. Each piece is a literal, or an alphabet
+    with the minimum number of characters and the size of the range of
+    lengths to draw from it.
+    """
+
+    __slots__ = ("pieces",)
+
+    def __init__(self, pattern: str, pieces: List[Tuple[str, Optional[str], int, int]]):
+        super().__init__(pattern)
+        self.pieces = tuple(pieces)
+
+    def generate(self, rng: RandomSource) -> str:
+        _random = rng.random
+        parts = []
+        for literal, alphabet, minimum, span in self.pieces:
+            if alphabet is None:
+                parts.append(literal)
+            else:
+                count = minimum + int(_random() * span)
+                parts.append(get_alphabet(alphabet).generate(rng, count))
+        return "".join(parts)
+
+
+class TreePatternGenerator(PatternGenerator):
+    """
+    Plan for any other supported pattern, as a tree of generator functions
+    """
+
+    __slots__ = ("_generate",)
+
+    def __init__(self, pattern: str, generate: Generator):
+        super().__init__(pattern)
+        self._generate = generate
+
+    def generate(self, rng: RandomSource) -> str:
+        return self._generate(rng, {})
+
+
+def _simple_pieces(states: Any) -> Optional[List[Tuple[str, Optional[str], int, int]]]:
+    pieces: List[Tuple[str, Optional[str], int, int]] = []
+
+    def add_literal(literal: str) -> None:
+        if pieces and pieces[-1][1] is None:
+            literal = pieces.pop()[0] + literal
+        pieces.append((literal, None, 0, 0))
+
+    def add(alphabet: str, minimum: int, maximum: int) -> None:
+        if len(alphabet) == 1 and minimum == maximum:
+            add_literal(alphabet * minimum)
+        else:
+            pieces.append(("", alphabet, minimum, maximum - minimum + 1))
+
+    for state in states:
+        opcode, value = state
+        name = _opname(opcode)
+        if name == "AT":
+            continue
+        if name == "SUBPATTERN":
+            inner = _simple_pieces(value[-1])
+            if inner is None:
+                return None
+            for piece in inner:
+                if piece[1] is None:
+                    add_literal(piece[0])
+                else:
+                    pieces.append(piece)
+            continue
+        if name in ("MAX_REPEAT", "MIN_REPEAT"):
+            repeated = value[2]
+            if len(repeated) != 1:
+                return None
+            alphabet = _alphabet(repeated[0])
+            if alphabet is None:
+                return None
+            add(alphabet, *_repeat_bounds(value))
+            continue
+        alphabet = _alphabet(state)
+        if alphabet is None:
+            return None
+        add(alphabet, 1, 1)
+    return pieces
+
+
+def _compile_sequence(states: Any) -> Generator:
+    generators = [_compile_state(state) for state in states]
+    if len(generators) == 1:
+        return generators[0]
+
+    def generate(rng: RandomSource, groups: Groups) -> str:
+        return "".join([g(rng, groups) for g in generators])
+
+    return generate
+
+
+def _compile_state(state: Tuple[Any, Any]) -> Generator:
+    opcode, value = state
+    name = _opname(opcode)
+
+    alphabet = _alphabet(state)
+    if alphabet is not None:
+        if len(alphabet) == 1:
+            return lambda rng, groups: alphabet  # type: ignore
+        size = len(alphabet)
+        return lambda rng, groups: alphabet[int(rng.random() * size)]  # type: ignore
+
+    if name in ("AT", "ASSERT_NOT"):
+        return lambda rng, groups: ""
+
+    if name == "ASSERT":
+        return _compile_sequence(value[1])
+
+    if name == "BRANCH":
+        branches = [_compile_sequence(branch) for branch in value[1]]
+        count = len(branches)
+        return lambda rng, groups: branches[int(rng.random() * count)](rng, groups)
+
+    if name == "SUBPATTERN":
+        group = value[0]
+        inner = _compile_sequence(value[-1])
+        if not group:
+            return inner
+
+        def generate_group(rng: RandomSource, groups: Groups) -> str:
+            result = groups[group] = inner(rng, groups)
+            return result
+
+        return generate_group
+
+    if name == "GROUPREF":
+        return lambda rng, groups: groups[value]
+
+    if name in ("MAX_REPEAT", "MIN_REPEAT"):
+        minimum, maximum = _repeat_bounds(value)
+        span = maximum - minimum + 1
+        if len(value[2]) == 1:
+            repeated_alphabet = _alphabet(value[2][0])
+            if repeated_alphabet is not None:
+                return lambda rng, groups: "".join(
+                    rng.choices(repeated_alphabet, k=minimum + int(rng.random() * span))
+                )
+        inner = _compile_sequence(value[2])
+        return lambda rng, groups: "".join(
+            [inner(rng, groups) for _ in range(minimum + int(rng.random() * span))]
+        )
+
+    raise _Unsupported(name)
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern: str) -> PatternGenerator:
+    """
+    Generation plan of a regular expression, parsed once and cached.
+    Raises `re.error` if the pattern is not a valid regular expression.
+    """
+    states = sre_parse.parse(pattern)
+    try:
+        pieces = _simple_pieces(states)
+        if pieces is not None:
+            return SimplePatternGenerator(pattern, pieces)
+        return TreePatternGenerator(pattern, _compile_sequence(states))
+    except _Unsupported:
+        return PatternGenerator(pattern)
@@ -0,0 +1,88 @@
+"""
+Pools of pre-generated values for the expensive leaves of schemas.
+
+Generating a string out of a `pattern` or a formatted date costs many
+times more than drawing a number. With pools, each of these leaves
+generates `size` values once, and samples then draw out of them: values
+repeat, but throughput no longer depends on how expensive they are.
+
+Pools are filled:
+
+- `lazy`: on the first sample of the leaf (default)
+- `eager`: when the schema is compiled
+- `background`: by a thread started when the schema is compiled. Values
+  are generated as usual until it is done, so samples are not reproducible
+
+Pools are keyed by pattern or date range, and shared by all the schemas
+compiled with the same `Pools`, e.g. by a sampler. Arrays with
+`uniqueItems` can not have more distinct items than their pool.
+"""
+
+from typing import Any, Dict, Hashable, List, Optional
+
+from .stream import encode
+
+FILLS = ("lazy", "eager", "background")
+
+
+class ValuePool:
+    """
+    Values of a leaf node, along with their JSON text
+    """
+
+    __slots__ = ("node", "size", "lazy", "values", "texts")
+
+    def __init__(self, node: Any, size: int, lazy: bool = True):
+        self.node = node
+        self.size = size
+        # Filled on first use, rather than by someone else
+        self.lazy = lazy
+        self.values: Optional[List[Any]] = None
+        self.texts: Optional[List[str]] = None
+
+    def fill(self) -> List[Any]:
+        values = self.node.sample_many(self.size)
+        # Texts first: values being set means the pool is ready
+        self.texts = [encode(value) for value in values]
+        self.values = values
+        return values
+
+
+class Pools:
+    """
+    Pools of `size` values for each expensive leaf, filled as set by
+    `fill`
+    """
+
+    def __init__(self, size: int = 1000, fill: str = "lazy"):
+        if size < 1:
+            raise ValueError("pools must have at least one value")
+        if fill not in FILLS:
+            raise ValueError(f"fill must be one of {', '.join(FILLS)}")
+        self.size = size
+        self.fill = fill
+        self._pools: Dict[Hashable, ValuePool] = {}
+
+    def get(self, key: Hashable, node: Any) -> ValuePool:
+        """
+        Pool of the leaf identified by `key`, made of the values of `node`
+        if it does not exist yet
+        """
+        try:
+            return self._pools[key]
+        except KeyError:
+            pass
+        pool = self._pools[key] = ValuePool(node, self.size, self.fill == "lazy")
+        if self.fill == "eager":
+            pool.fill()
+        elif self.fill == "background":
+            import threading
+
+            threading.Thread(target=pool.fill, daemon=True).start()
+        return pool
+
+    def clear(self) -> None:
+        self._pools.clear()
+
+    def __len__(self) -> int:
+        return len(self._pools)
@@ -0,0 +1,127 @@
+"""
+Profiling of the generation of samples, per node of the schema.
+
+Schemas compiled with a `Profiler` record, for each JSON pointer of the
+schema, how many values were generated, the time spent generating them
+(total, and self: without the nested schemas), and the size of their JSON
+text. References are recorded both where they are used and at their
+definition:
+
+    profiler = Profiler()
+    freddy.compile(schema, profiler=profiler).sample_many(1000)
+    print(profiler.report())
+
+`write_collapsed()` writes the self time of each stack of pointers in
+the collapsed format of flamegraph tools. Schemas compiled without a
+profiler are not instrumented at all.
+
+Sizes of sampled values are measured by encoding them at every level,
+which slows profiled sampling down a lot, but is left out of the times.
+Sizes of dumped values are counted as they are written.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+# Sizes of native values (datetimes, sets...) are approximated by their str()
+_encode = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), default=str
+).encode
+
+
+class Stats:
+    __slots__ = ("count", "total", "own", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.own = 0.0
+        self.bytes = 0
+
+
+class Profiler:
+    def __init__(self):
+        self.stats: Dict[str, Stats] = {}
+        # Self time of each stack of pointers
+        self.stacks: Dict[Tuple[str, ...], float] = {}
+        self._stack: Tuple[str, ...] = ()
+        # Time spent in the nested nodes of each node of the stack, and
+        # time spent recording them, which is left out of the totals
+        self._nested: List[float] = []
+        self._overhead: List[float] = []
+
+    def stats_for(self, path: str) -> Stats:
+        try:
+            return self.stats[path]
+        except KeyError:
+            stats = self.stats[path] = Stats()
+            return stats
+
+    def enter(self, path: str) -> float:
+        self._stack += (path,)
+        self._nested.append(0.0)
+        self._overhead.append(0.0)
+        return time.perf_counter()
+
+    def exit(
+        self,
+        stats: Stats,
+        start: float,
+        count: int,
+        values: Optional[List[Any]] = None,
+        size: int = 0,
+    ) -> None:
+        """
+        Record `count` values generated since `start`, of `size` bytes or
+        else the size of `values`
+        """
+        end = time.perf_counter()
+        overhead = self._overhead.pop()
+        elapsed = end - start - overhead
+        own = elapsed - self._nested.pop()
+        if values is not None:
+            size = sum(len(_encode(value).encode()) for value in values)
+        stats.count += count
+        stats.total += elapsed
+        stats.own += own
+        stats.bytes += size
+        stack = self._stack
+        self.stacks[stack] = self.stacks.get(stack, 0.0) + own
+        self._stack = stack[:-1]
+        if self._nested:
+            self._nested[-1] += elapsed
+            self._overhead[-1] += overhead + time.perf_counter() - end
+
+    def clear(self) -> None:
+        self.stats.clear()
+        self.stacks.clear()
+
+    def report(self, limit: Optional[int] = 20) -> str:
+        """
+        Table of the `limit` pointers with the most self time
+        """
+        rows = sorted(self.stats.items(), key=lambda item: -item[1].own)[:limit]
+        width = max([len(path) for path, _ in rows] + [len("pointer")])
+        total = sum(stats.own for stats in self.stats.values()) or 1.0
+        lines = [
+            f"{'pointer':<{width}} {'count':>10} {'total ms':>10} "
+            f"{'self ms':>10} {'self %':>7} {'bytes':>12}"
+        ]
+        for path, stats in rows:
+            lines.append(
+                f"{path:<{width}} {stats.count:>10} {stats.total * 1e3:>10.2f} "
+                f"{stats.own * 1e3:>10.2f} {stats.own / total:>7.1%} "
+                f"{stats.bytes:>12}"
+            )
+        return "\n".join(lines)
+
+    def write_collapsed(self, stream: TextIO) -> None:
+        """
+        Write the self time of each stack, in microseconds, as collapsed
+        stacks: `frame;frame;frame value` lines
+        """
+        for stack, own in self.stacks.items():
+            # Semicolons separate frames
+            frames = ";".join(path.replace(";", ",") for path in stack)
+            stream.write(f"{frames} {round(own * 1e6)}\n")
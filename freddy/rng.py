@@ -0,0 +1,76 @@
+"""
+Alternative random sources for `freddy.Sampler`
+"""
+
+import random
+from typing import Any, Iterator, List, Optional, Sequence
+
+
+class NumpyRandom(random.Random):
+    """
+    `random.Random` drawing its randomness from a numpy `Generator`
+    (requires numpy).
+
+    Floats and random bits are drawn from numpy in blocks of `block_size`
+    values. `choices()` picks all its values with a single numpy call,
+    which speeds up the bulk sampling of `sample_many()`. Single values are
+    cheaper to draw with a plain `random.Random`.
+    """
+
+    def __init__(self, seed: Any = None, block_size: int = 4096):
+        self.block_size = block_size
+        super().__init__(seed)
+
+    def seed(self, a: Any = None, version: int = 2) -> None:  # type: ignore
+        import numpy
+
+        self.generator = numpy.random.default_rng(a)
+        self._floats: Iterator[float] = iter(())
+        self._words: Iterator[int] = iter(())
+
+    def random(self) -> float:
+        try:
+            return next(self._floats)
+        except StopIteration:
+            self._floats = iter(self.generator.random(self.block_size).tolist())
+            return next(self._floats)
+
+    def getrandbits(self, k: int) -> int:
+        if k > 64:
+            nbytes = (k + 7) // 8
+            value = int.from_bytes(self.generator.bytes(nbytes), "little")
+            return value >> (nbytes * 8 - k)
+        if k <= 0:
+            return 0
+        try:
+            word = next(self._words)
+        except StopIteration:
+            words = self.generator.integers(
+                0, 2**64, size=self.block_size, dtype="uint64"
+            )
+            self._words = iter(words.tolist())
+            word = next(self._words)
+        return word >> (64 - k)
+
+    def choices(  # type: ignore
+        self,
+        population: Sequence[Any],
+        weights: Optional[Sequence[float]] = None,
+        *,
+        cum_weights: Optional[Sequence[float]] = None,
+        k: int = 1,
+    ) -> List[Any]:
+        if weights is not None or cum_weights is not None:
+            return super().choices(population, weights, cum_weights=cum_weights, k=k)
+        indexes = self.generator.integers(0, len(population), size=k).tolist()
+        return [population[i] for i in indexes]
+
+    def getstate(self) -> Any:
+        floats, words = list(self._floats), list(self._words)
+        self._floats, self._words = iter(floats), iter(words)
+        return (self.generator.bit_generator.state, floats, words)
+
+    def setstate(self, state: Any) -> None:
+        bit_generator_state, floats, words = state
+        self.generator.bit_generator.state = bit_generator_state
+        self._floats, self._words = iter(floats), iter(words)
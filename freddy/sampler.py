@@ -0,0 +1,270 @@
+import json
+import random
+import weakref
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterator, List, Optional
+
+from .compiler import CompiledSchema
+from .factories import Registry
+from .freddy import _get_schema, clear_schema_cache
+from .pools import Pools
+from .profiler import Profiler
+from .stream import CHUNK_SIZE, write_samples
+from .strings import DEFAULT_ALPHABET
+from .types import RandomSource
+
+# Compiled json schemas kept by a sampler, all dropped when there are more
+SCHEMA_CACHE_SIZE = 256
+
+
+class Sampler:
+    """
+    Generates samples of json schemas and pydantic models, drawing all
+    random values from its own random source: a `random.Random` created
+    from `seed`, or the `rng` provided, which can be any `random.Random`
+    (e.g. `freddy.rng.NumpyRandom`) or the `random` module itself.
+
+    Samplers with the same seed generate the same samples. A sampler can
+    be shared by several threads, but samples are then not reproducible:
+    give each thread its own sampler with `spawn()`.
+
+    Strings are made of characters of `alphabet`, unless their schema sets
+    its own `x-freddy-alphabet`. Custom factories are looked up in
+    `factories`, or the default registry (see `freddy.factories`). Pools of
+    workers are sent the same options, but can not be profiled.
+
+    Patterns and dates are drawn out of `pools` of pre-generated values if
+    provided, shared by all the schemas of the sampler (see
+    `freddy.pools`).
+
+    Generation is recorded by `profiler` if provided (see
+    `freddy.profiler`). Profilers record a single thread, so samplers
+    spawned from this one are not profiled.
+
+    Recursive schemas, or all schemas if `max_depth` is set, are sampled
+    with a bounded depth, optional values getting `decay` times as likely
+    at each level (see `freddy.compiler.DepthLimitedNode`).
+
+    Pydantic models are compiled once and cached: call `clear_cache()` if a
+    model changes (e.g. after `update_forward_refs()`). Json schemas are
+    cached by their content, so they can be changed in place.
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        rng: Optional[RandomSource] = None,
+        alphabet: str = DEFAULT_ALPHABET,
+        factories: Optional[Registry] = None,
+        pools: Optional[Pools] = None,
+        profiler: Optional[Profiler] = None,
+        max_depth: Optional[int] = None,
+        decay: float = 1.0,
+    ):
+        if rng is None:
+            rng = random.Random(seed)
+        elif seed is not None:
+            rng.seed(seed)
+        self.rng = rng
+        self.alphabet = alphabet
+        self.factories = factories
+        self.pools = pools
+        self.profiler = profiler
+        self.max_depth = max_depth
+        self.decay = decay
+        self._compiled: "weakref.WeakKeyDictionary[Any, CompiledSchema]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # Compiled json schemas, by canonical json text
+        self._schemas: Dict[str, CompiledSchema] = {}
+        # Natively compiled models, by value of `construct`
+        self._models: "weakref.WeakKeyDictionary[Any, Dict[bool, CompiledSchema]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def spawn(self) -> "Sampler":
+        """
+        New independent sampler, seeded from this one
+        """
+        seed = self.rng.getrandbits(64)
+        rng = type(self.rng)(seed) if isinstance(self.rng, random.Random) else None
+        # Pools of the same size, filled from the new random source
+        pools = None if self.pools is None else Pools(self.pools.size, self.pools.fill)
+        return Sampler(
+            seed if rng is None else None,
+            rng=rng,
+            alphabet=self.alphabet,
+            factories=self.factories,
+            pools=pools,
+            max_depth=self.max_depth,
+            decay=self.decay,
+        )
+
+    def _compile_schema(self, schema: Dict[str, Any]) -> CompiledSchema:
+        return CompiledSchema(
+            schema,
+            rng=self.rng,
+            alphabet=self.alphabet,
+            factories=self.factories,
+            pools=self.pools,
+            profiler=self.profiler,
+            max_depth=self.max_depth,
+            decay=self.decay,
+        )
+
+    def compile(self, _input) -> CompiledSchema:
+        if isinstance(_input, dict):
+            try:
+                key = json.dumps(_input, sort_keys=True)
+            except (TypeError, ValueError):
+                # Not json: not cached
+                return self._compile_schema(_input)
+            compiled = self._schemas.get(key)
+            if compiled is None:
+                compiled = self._compile_schema(_input)
+                if len(self._schemas) >= SCHEMA_CACHE_SIZE:
+                    self._schemas.clear()
+                self._schemas[key] = compiled
+            return compiled
+        try:
+            return self._compiled[_input]
+        except KeyError:
+            pass
+        except TypeError:
+            # Can not be weakly referenced: not cached
+            return self._compile_schema(_get_schema(_input))
+        compiled = self._compiled[_input] = self._compile_schema(_get_schema(_input))
+        return compiled
+
+    def clear_cache(self, model: Any = None) -> None:
+        """
+        Forget the cached schema of `model`, or of all models and json
+        schemas
+        """
+        if model is None:
+            self._compiled.clear()
+            self._models.clear()
+            self._schemas.clear()
+        else:
+            self._compiled.pop(model, None)
+            self._models.pop(model, None)
+        clear_schema_cache(model)
+
+    def compile_model(self, model: Any, construct: bool = True) -> CompiledSchema:
+        """
+        Compile a pydantic model from its fields rather than its json
+        schema (see `freddy.models`), so that its samples have native
+        python values: model instances built with `construct()`, or dicts
+        if `construct` is False
+        """
+        from .models import CompiledModel
+
+        compiled = self._models.setdefault(model, {})
+        try:
+            return compiled[construct]
+        except KeyError:
+            result = compiled[construct] = CompiledModel(
+                model,
+                rng=self.rng,
+                alphabet=self.alphabet,
+                construct=construct,
+                factories=self.factories,
+                pools=self.pools,
+                profiler=self.profiler,
+                max_depth=self.max_depth,
+                decay=self.decay,
+            )
+            return result
+
+    def sample_model(self, model: Any, construct: bool = True) -> Any:
+        return self.compile_model(model, construct).sample()
+
+    def sample_models(self, model: Any, n: int, construct: bool = True) -> List[Any]:
+        return self.compile_model(model, construct).sample_many(n)
+
+    def sample(self, _input, target_bytes: Optional[int] = None) -> Any:
+        if target_bytes is not None:
+            return self.compile(_input).sample_sized(target_bytes)
+        return self.compile(_input).sample()
+
+    def sample_many(
+        self,
+        _input,
+        n: int,
+        workers: Optional[int] = None,
+        target_bytes: Optional[int] = None,
+    ) -> List[Any]:
+        if target_bytes is not None:
+            if workers is not None:
+                raise ValueError("target_bytes is not supported with workers")
+            compiled = self.compile(_input)
+            return [compiled.sample_sized(target_bytes) for _ in range(n)]
+        return list(self.iter_samples(_input, n, workers=workers))
+
+    def iter_samples(
+        self,
+        _input,
+        n: Optional[int] = None,
+        chunk_size: int = 1000,
+        workers: Optional[int] = None,
+    ) -> Iterator[Any]:
+        if workers is not None:
+            from . import parallel
+
+            if self.profiler is not None:
+                raise ValueError("profiler is not supported with workers")
+            return parallel.iter_samples(
+                _get_schema(_input),
+                n,
+                workers=workers,
+                seed=self.rng.getrandbits(64),
+                chunk_size=chunk_size,
+                alphabet=self.alphabet,
+                factories=self.factories,
+                pools=self.pools,
+                max_depth=self.max_depth,
+                decay=self.decay,
+            )
+        return self.compile(_input).iter_samples(n, chunk_size=chunk_size)
+
+    def asample(
+        self,
+        _input,
+        n: Optional[int] = None,
+        rate: Optional[float] = None,
+        buffer: int = 1000,
+        chunk_size: int = 100,
+        workers: Optional[int] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Asynchronously yield `n` samples, generated in a background thread
+        (see `freddy.aio`). The sampler must not be used by anyone else
+        meanwhile
+        """
+        from . import aio
+
+        return aio.asample(
+            self,
+            _input,
+            n,
+            rate=rate,
+            buffer=buffer,
+            chunk_size=chunk_size,
+            workers=workers,
+        )
+
+    def dump(
+        self,
+        _input,
+        stream: BinaryIO,
+        n: Optional[int] = None,
+        format: str = "ndjson",
+        chunk_size: int = CHUNK_SIZE,
+        workers: Optional[int] = None,
+    ) -> None:
+        compiled = self.compile(_input)
+        if workers is None:
+            return compiled.dump(stream, n, format=format, chunk_size=chunk_size)
+        # Samples are built by the workers, then written here
+        fields = compiled.fields() if format == "csv" else None
+        samples = self.iter_samples(_input, n, workers=workers)
+        write_samples(samples, stream, format, fields, chunk_size=chunk_size)
@@ -0,0 +1,448 @@
+"""
+Sampling of values of a target size, e.g. payloads of 1 KB or 10 MB.
+
+The smallest, expected and largest size of the JSON text of the values
+of every node of a compiled schema are estimated once. A value of about
+`target_bytes` is then sampled by handing byte budgets down the tree,
+with no retries:
+
+- arrays get as many items as fit, each item a share of the budget
+- strings get as many characters as fit
+- objects include optional properties while they fit, and share the
+  rest of the budget among the properties that can grow
+- `oneOf`/`anyOf` draw among the branches that can fit the budget
+
+Budgets are recomputed after each item or property out of what is left,
+so that errors do not add up. Arrays and strings without `maxItems` or
+`maxLength` grow as much as needed, other bounds of the schema are kept:
+values of schemas that can not grow that much are as large as they can
+be. Values nested more than `max_depth` levels deep are as small as
+possible, which bounds recursive schemas.
+
+Sizes are those of the compact JSON text written by `freddy.dump()`.
+"""
+
+import functools
+import json
+import math
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from .compiler import (
+    ArrayNode,
+    BooleanNode,
+    ConstNode,
+    DepthLimitedNode,
+    EnumNode,
+    Node,
+    NullNode,
+    ObjectNode,
+    OfNode,
+    ProfiledNode,
+    RefNode,
+    StringNode,
+    WeightedOfNode,
+    _recursive,
+    _walk,
+)
+from .freddy import generate_unique
+from .types import RandomSource
+
+# Smallest, expected and largest size of the values of a node
+Size = Tuple[float, float, float]
+
+# Values sampled to estimate the sizes of leaves that can not be worked out
+_ESTIMATE_SAMPLES = 16
+
+# Items of arrays are sampled in bulk, in chunks of this ratio of the
+# items that fit in what is left of the budget, down to this many
+_BULK_RATIO = 0.9
+_BULK_MIN = 8
+
+
+def _default(value: Any) -> Any:
+    # Model instances of natively compiled models count as their fields
+    as_dict = getattr(value, "dict", None)
+    return as_dict() if callable(as_dict) else str(value)
+
+
+_encode = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), default=_default
+).encode
+
+
+def _size(value: Any) -> int:
+    return len(_encode(value).encode())
+
+
+@functools.lru_cache(maxsize=None)
+def _char_sizes(chars: str) -> Tuple[float, float, float]:
+    sizes = [_size(char) - 2 for char in chars]
+    return min(sizes), sum(sizes) / len(sizes), max(sizes)
+
+
+def _times(count: float, size: float) -> float:
+    # No items take no room, however large they could be
+    return count * size if count else 0.0
+
+
+def _commas(count: float) -> float:
+    return max(count - 1, 0)
+
+
+def _max_items(node: ArrayNode) -> float:
+    maximum = node.schema["maxItems"] if "maxItems" in node.schema else math.inf
+    if node.space is not None:
+        # Unique items drawn out of their value space can not be more than it
+        return min(maximum, len(node.space))
+    return maximum
+
+
+def _weights(node: OfNode) -> List[float]:
+    """
+    Weights of the branches of `node` that can be drawn, as its children
+    """
+    if not isinstance(node, WeightedOfNode):
+        return [1.0] * len(node.children())
+    cum_weights = [0.0] + node.table.cum_weights
+    return [high - low for low, high in zip(cum_weights, cum_weights[1:]) if high > low]
+
+
+class SizedSampler:
+    """
+    Samples values of the tree of `root` of about a target number of
+    bytes, drawing random values from `rng`
+    """
+
+    def __init__(self, root: Node, rng: RandomSource, max_depth: int):
+        self.root = root
+        self.max_depth = max_depth
+        self._random = rng.random
+        self._estimators: Dict[type, Callable[[Any], Size]] = {
+            ConstNode: self.estimate_const,
+            NullNode: lambda node: (4, 4, 4),
+            BooleanNode: lambda node: (4, 4.5, 5),
+            EnumNode: self.estimate_enum,
+            StringNode: self.estimate_string,
+            ArrayNode: self.estimate_array,
+            ObjectNode: self.estimate_object,
+            OfNode: self.estimate_of,
+            RefNode: self.estimate_nested,
+            ProfiledNode: self.estimate_nested,
+            DepthLimitedNode: self.estimate_nested,
+        }
+        self._samplers: Dict[type, Callable[[Any, float, int], Tuple[Any, float]]] = {
+            StringNode: self.sample_string,
+            ArrayNode: self.sample_array,
+            ObjectNode: self.sample_object,
+            OfNode: self.sample_of,
+            RefNode: self.sample_nested,
+            ProfiledNode: self.sample_nested,
+            DepthLimitedNode: self.sample_nested,
+        }
+        self.sizes: Dict[int, Size] = {}
+        # Values of recursive nodes can grow without bounds, and are not
+        # sampled in bulk
+        self.recursive = _recursive(root)
+        self.estimate()
+
+    def sample(self, target_bytes: int) -> Any:
+        if target_bytes < 0:
+            raise ValueError("target_bytes can not be negative")
+        value, _ = self.sample_node(self.root, target_bytes, 0)
+        return value
+
+    def _lookup(self, table: Dict[type, Any], node: Node) -> Any:
+        for kind in type(node).__mro__:
+            if kind in table:
+                return table[kind]
+        return None
+
+    # Estimation
+
+    def estimate(self) -> None:
+        """
+        Estimate the sizes of every node. Smallest sizes are the least
+        fixpoint of the tree, which also settles them for recursive
+        schemas. Expected and largest sizes of the other nodes are then
+        worked out from those of their nested nodes
+        """
+        nodes, sizes = [], self.sizes
+        for node in _walk(self.root):
+            if self._lookup(self._estimators, node) is None:
+                sizes[id(node)] = self.estimate_leaf(node)
+            else:
+                sizes[id(node)] = (math.inf,) * 3
+                nodes.append(node)
+        # Deepest nodes first, so that sizes settle in few rounds
+        nodes.reverse()
+        changed = True
+        while changed:
+            changed = False
+            for node in nodes:
+                low = self.estimate_node(node)[0]
+                if low < sizes[id(node)][0]:
+                    sizes[id(node)] = (low,) * 3
+                    changed = True
+        # Values of recursive nodes can be as large as needed, but have no
+        # meaningful expected size: they are taken to be as small as they
+        # can, and fill whatever budget they are given
+        nested = []
+        for node in nodes:
+            if id(node) in self.recursive:
+                low = sizes[id(node)][0]
+                sizes[id(node)] = (low, low, math.inf)
+            else:
+                nested.append(node)
+        changed = True
+        while changed:
+            changed = False
+            for node in nested:
+                size = self.estimate_node(node)
+                if size != sizes[id(node)]:
+                    sizes[id(node)] = size
+                    changed = True
+
+    def estimate_node(self, node: Node) -> Size:
+        return self._lookup(self._estimators, node)(node)
+
+    def estimate_leaf(self, node: Node) -> Size:
+        """
+        Sizes of a few values of a leaf that can not grow: numbers,
+        patterns, dates, values of factories...
+        """
+        sizes = [_size(value) for value in node.sample_many(_ESTIMATE_SAMPLES)]
+        return min(sizes), sum(sizes) / len(sizes), max(sizes)
+
+    def estimate_const(self, node: ConstNode) -> Size:
+        size = _size(node.value)
+        return size, size, size
+
+    def estimate_enum(self, node: EnumNode) -> Size:
+        sizes = [_size(choice) for choice in node.choices]
+        return min(sizes), sum(sizes) / len(sizes), max(sizes)
+
+    def estimate_string(self, node: StringNode) -> Size:
+        low, mean, high = _char_sizes(node.alphabet.chars)
+        maximum = node.max_length if node.bounded else math.inf
+        return (
+            2 + _times(node.min_length, low),
+            2 + (node.min_length + node.max_length) / 2 * mean,
+            2 + _times(maximum, high),
+        )
+
+    def estimate_array(self, node: ArrayNode) -> Size:
+        low, mean, high = self.sizes[id(node.items)]
+        average = (node.min_items + node.max_items) / 2
+        maximum = _max_items(node)
+        return (
+            2 + _times(node.min_items, low) + _commas(node.min_items),
+            2 + _times(average, mean) + _commas(average),
+            2 + _times(maximum, high) + _commas(maximum),
+        )
+
+    def estimate_object(self, node: ObjectNode) -> Size:
+        low = mean = high = 2.0
+        required = optional = properties = 0
+        for key, child, is_required in node.properties:
+            prefix = _size(key) + 1
+            size = self.sizes[id(child)]
+            high += prefix + size[2]
+            if is_required:
+                low += prefix + size[0]
+                mean += prefix + size[1]
+                required += 1
+            else:
+                # Included half of the times
+                mean += (prefix + size[1]) / 2
+                optional += 1
+            properties += 1
+        return (
+            low + _commas(required),
+            mean + _commas(required + optional / 2),
+            high + _commas(properties),
+        )
+
+    def estimate_of(self, node: OfNode) -> Size:
+        sizes = [self.sizes[id(child)] for child in node.children()]
+        if not sizes:
+            return (math.inf,) * 3
+        weights = _weights(node)
+        return (
+            min(size[0] for size in sizes),
+            sum(w * size[1] for w, size in zip(weights, sizes)) / sum(weights),
+            max(size[2] for size in sizes),
+        )
+
+    def estimate_nested(self, node: Node) -> Size:
+        (child,) = node.children()
+        return self.sizes[id(child)]
+
+    # Sampling
+
+    def sample_node(self, node: Node, budget: float, depth: int) -> Tuple[Any, float]:
+        """
+        Value of `node` of about `budget` bytes, and its actual size
+        """
+        sampler = self._lookup(self._samplers, node)
+        if sampler is None:
+            value = node.sample()
+            return value, _size(value)
+        if depth >= self.max_depth:
+            # As small as possible from here on
+            budget = 0
+        return sampler(node, budget, depth)
+
+    def sample_nested(self, node: Node, budget: float, depth: int) -> Tuple[Any, float]:
+        (child,) = node.children()
+        return self.sample_node(child, budget, depth)
+
+    def sample_string(
+        self, node: StringNode, budget: float, depth: int
+    ) -> Tuple[Any, float]:
+        _, mean, _ = _char_sizes(node.alphabet.chars)
+        length = max(int(round((budget - 2) / mean)), node.min_length)
+        if node.bounded:
+            length = min(length, node.max_length)
+        value = node.alphabet.generate(node.rng, length)
+        if node.alphabet.plain:
+            return value, 2 + len(value.encode())
+        return value, _size(value)
+
+    def sample_array(
+        self, node: ArrayNode, budget: float, depth: int
+    ) -> Tuple[Any, float]:
+        items, depth = node.items, depth + 1
+        low, mean, _ = self.sizes[id(items)]
+        maximum = _max_items(node)
+        # Number of items of the expected size that fit
+        fitting = (budget - 1) / (mean + 1)
+        if id(items) in self.recursive:
+            # As many items as usual, sharing the budget, so that values
+            # nest rather than spread
+            least = node.min_items or min(int(budget >= low + 2), node.max_items)
+            span = node.max_items - least + 1
+            planned = least + int(self._random() * span)
+        else:
+            planned = min(max(int(round(fitting)), node.min_items), maximum)
+        if node.unique_items:
+            share = (budget - 1) / planned - 1 if planned else 0
+            values = generate_unique(
+                node.schema,
+                lambda: self.sample_node(items, share, depth)[0],
+                int(planned),
+                node.space,
+                node.rng,
+            )
+            return values, _size(values)
+
+        values: List[Any] = []
+        remaining = budget - 2
+        if node.min_items <= fitting <= maximum and id(items) not in self.recursive:
+            # Items of their expected size fill the budget: most of them
+            # are sampled in bulk, as usual, the rest one by one below
+            while True:
+                count = int(remaining / (mean + 1) * _BULK_RATIO)
+                if count < _BULK_MIN:
+                    break
+                chunk = items.sample_many(count)
+                remaining -= _size(chunk) - 2 + (1 if values else 0)
+                values.extend(chunk)
+        while len(values) < maximum:
+            count = len(values)
+            separator = 1 if count else 0
+            # Stop once closer to the target than with another item
+            if (
+                count >= node.min_items
+                and remaining - separator < (mean + separator) / 2
+            ):
+                break
+            left = max(planned - count, 1)
+            share = (remaining - separator - (left - 1)) / left
+            value, size = self.sample_node(items, max(share, low), depth)
+            values.append(value)
+            remaining -= separator + size
+        return values, budget - remaining
+
+    def sample_object(
+        self, node: ObjectNode, budget: float, depth: int
+    ) -> Tuple[Any, float]:
+        sizes, _random = self.sizes, self._random
+        depth += 1
+        # Required properties, then optional ones in random order while
+        # their expected size fits
+        included = [required for _, _, required in node.properties]
+        used = 2 + sum(
+            _size(key) + 1 + sizes[id(child)][1] + 1
+            for key, child, required in node.properties
+            if required
+        )
+        optional = [index for index, included in enumerate(included) if not included]
+        for index in sorted(optional, key=lambda _: _random()):
+            key, child, _ = node.properties[index]
+            size = _size(key) + 1 + sizes[id(child)][1] + 1
+            if used + size <= budget + 1:
+                included[index] = True
+                used += size
+        properties = [
+            (key, child, _size(key) + 1)
+            for (key, child, _), is_included in zip(node.properties, included)
+            if is_included
+        ]
+
+        # Budget of the values, without braces, keys and commas
+        remaining = budget - 2 - sum(prefix for _, _, prefix in properties)
+        remaining -= _commas(len(properties))
+        total = budget - remaining
+        value = {}
+        for index, (key, child, _) in enumerate(properties):
+            rest = [sizes[id(other)] for _, other, _ in properties[index:]]
+            share = self.share(remaining, rest)
+            value[key], size = self.sample_node(child, share, depth)
+            remaining -= size
+            total += size
+        return node.build(value), total
+
+    def share(self, budget: float, sizes: Sequence[Size]) -> float:
+        """
+        Share of `budget` of the first of values of the given sizes, among
+        them
+        """
+        low, mean, high = sizes[0]
+        means = sum(size[1] for size in sizes)
+        if budget >= means:
+            # Room to spare goes to the values that can grow without
+            # bounds, or else to those that can grow, as much as they can
+            spare = budget - means
+            unbounded = sum(1 for size in sizes if size[2] == math.inf)
+            if unbounded:
+                return mean + spare / unbounded if high == math.inf else mean
+            room = sum(size[2] - size[1] for size in sizes)
+            if not room:
+                return mean
+            return mean + min(spare / room, 1) * (high - mean)
+        lows = sum(size[0] for size in sizes)
+        if means <= lows:
+            return low
+        # Values shrink towards their smallest size alike
+        return low + (budget - lows) * (mean - low) / (means - lows)
+
+    def sample_of(self, node: OfNode, budget: float, depth: int) -> Tuple[Any, float]:
+        sizes = self.sizes
+        branches = node.children()
+        fitting = [
+            (branch, weight)
+            for branch, weight in zip(branches, _weights(node))
+            if sizes[id(branch)][0] <= budget <= sizes[id(branch)][2]
+        ]
+        if fitting:
+            # Drawn by weight among those that fit
+            point = self._random() * sum(weight for _, weight in fitting)
+            for branch, weight in fitting:
+                point -= weight
+                if point < 0:
+                    break
+        elif all(budget < sizes[id(branch)][0] for branch in branches):
+            branch = min(branches, key=lambda branch: sizes[id(branch)][0])
+        else:
+            branch = max(branches, key=lambda branch: sizes[id(branch)][2])
+        return self.sample_node(branch, budget, depth)
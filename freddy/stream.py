@@ -0,0 +1,137 @@
+"""
+Streaming of samples as text into a binary stream (a file, a pipe, a
+socket...).
+
+With the JSON formats samples are never built in memory: compiled nodes
+write their JSON text piece by piece into a buffer, which is encoded and
+flushed to the stream every `chunk_size` characters. Memory stays bounded
+however large the samples or their arrays are.
+"""
+
+import json
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterable, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .compiler import Node
+
+# json: a single array of samples. ndjson: one sample per line. csv: one
+# row per sample, for objects
+FORMATS = ("json", "ndjson", "csv")
+
+CHUNK_SIZE = 64 * 1024
+
+Write = Callable[[str], Any]
+
+# Compact JSON, so that each sample fits on a single line
+encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+class StreamWriter:
+    """
+    Buffers text and writes it to `stream` as utf-8, in chunks of at least
+    `chunk_size` characters
+    """
+
+    __slots__ = ("stream", "chunk_size", "parts", "size")
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.parts: List[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.parts:
+            self.stream.write("".join(self.parts).encode())
+            self.parts = []
+            self.size = 0
+
+
+def _check_arguments(format: str, n: Optional[int]) -> None:
+    if format not in FORMATS:
+        raise ValueError(f"unknown format {format!r}, expected one of {FORMATS}")
+    if format == "json" and n is None:
+        raise ValueError("the number of samples is required with the json format")
+
+
+def _csv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return encode(value)
+
+
+def dump(
+    root: "Node",
+    stream: BinaryIO,
+    n: Optional[int] = None,
+    format: str = "ndjson",
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Write `n` samples of `root` to `stream` with the `json` or `ndjson`
+    format (endless if `n` is None), without building them
+    """
+    _check_arguments(format, n)
+    if format == "csv":
+        raise ValueError("samples must be built to be written as csv")
+
+    writer = StreamWriter(stream, chunk_size)
+    write, emit = writer.write, root.emit
+    if format == "json":
+        write("[")
+        for index in range(n):  # type: ignore
+            if index:
+                write(",")
+            emit(write)
+        write("]\n")
+    else:
+        count = 0
+        while n is None or count < n:
+            emit(write)
+            write("\n")
+            count += 1
+    writer.flush()
+    stream.flush()
+
+
+def write_samples(
+    samples: Iterable[Any],
+    stream: BinaryIO,
+    format: str = "ndjson",
+    fields: Optional[List[str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> None:
+    """
+    Write samples that are already built to `stream`. The `csv` format
+    requires the `fields` of the objects, which are written as a header
+    """
+    _check_arguments(format, 0)
+    writer = StreamWriter(stream, chunk_size)
+    write = writer.write
+    if format == "csv":
+        if fields is None:
+            raise ValueError("fields are required with the csv format")
+        import csv
+
+        rows = csv.writer(writer, lineterminator="\n")
+        rows.writerow(fields)
+        for sample in samples:
+            rows.writerow([_csv_value(sample.get(field)) for field in fields])
+    elif format == "json":
+        write("[")
+        for index, sample in enumerate(samples):
+            write("," + encode(sample) if index else encode(sample))
+        write("]\n")
+    else:
+        for sample in samples:
+            write(encode(sample) + "\n")
+    writer.flush()
+    stream.flush()
@@ -0,0 +1,66 @@
+"""
+Generation of random strings out of an alphabet.
+
+Rather than drawing characters one by one, random bytes are drawn in
+bulk and mapped into the alphabet with `bytes.translate()`. Bytes that
+would make some characters more likely than others are dropped, so all
+characters are equally likely.
+"""
+
+import functools
+import string
+from typing import Any
+
+from .types import RandomSource
+
+DEFAULT_ALPHABET = string.ascii_lowercase
+
+
+class Alphabet:
+    __slots__ = ("chars", "size", "plain", "_table", "_delete", "_ratio")
+
+    def __init__(self, chars: str):
+        if not chars:
+            raise ValueError("alphabet can not be empty")
+        self.chars = chars
+        self.size = len(chars)
+        # Strings of plain alphabets need no escaping in JSON
+        self.plain = not any(c in '"\\' or c < " " for c in chars)
+        self._table = None
+        if self.size <= 256 and max(map(ord, chars)) < 256:
+            # Byte b maps to chars[b % size], unless b is one of the last
+            # bytes that do not fill a full round of the alphabet
+            usable = 256 - 256 % self.size
+            self._table = bytes(
+                ord(chars[b % self.size]) if b < usable else 0 for b in range(256)
+            )
+            self._delete = bytes(range(usable, 256))
+            self._ratio = 256 / usable
+
+    def generate(self, rng: RandomSource, length: int) -> str:
+        if self._table is None:
+            # Alphabets that do not fit in bytes
+            return "".join(rng.choices(self.chars, k=length))
+
+        getrandbits, table, delete = rng.getrandbits, self._table, self._delete
+        result = b""
+        while len(result) < length:
+            # Draw enough bytes to get all the missing characters once the
+            # unusable bytes are dropped, most of the times
+            missing = int((length - len(result)) * self._ratio) + 8
+            raw = getrandbits(missing * 8).to_bytes(missing, "little")
+            result += raw.translate(table, delete)
+        return result[:length].decode("latin-1")
+
+
+@functools.lru_cache(maxsize=None)
+def get_alphabet(chars: str = DEFAULT_ALPHABET) -> Alphabet:
+    return Alphabet(chars)
+
+
+def schema_alphabet(schema: Any, default: str = DEFAULT_ALPHABET) -> Alphabet:
+    """
+    Alphabet of a string schema, which can be set with the
+    `x-freddy-alphabet` extension key
+    """
+    return get_alphabet(schema.get("x-freddy-alphabet", default))
@@ -0,0 +1,162 @@
+"""
+Generation of `date-time`, `date` and `time` formatted strings.
+
+A random value is an integer offset, in seconds or days, from the start
+of the range of the schema. Offsets are formatted through lazily filled
+tables of date and time-of-day strings, so that each sample only joins
+two cached strings.
+
+The range can be set with the `formatMinimum` and `formatMaximum` keys,
+both included, as ISO strings of the same format:
+
+    {"type": "string", "format": "date", "formatMinimum": "2020-01-01"}
+"""
+
+import datetime
+import functools
+from typing import Any, Dict, List, Optional
+
+from .exceptions import InvalidSchema
+from .types import RandomSource
+
+FORMATS = ("date-time", "date", "time")
+
+DEFAULT_MINIMUM = datetime.datetime(1900, 1, 1)
+DEFAULT_MAXIMUM = datetime.datetime(2049, 12, 31, 23, 59, 59)
+
+_DAY = 86400
+
+# ISO strings of all the seconds of a day, filled as they are drawn
+_times: List[Optional[str]] = [None] * _DAY
+
+
+def _time_text(second: int) -> str:
+    text = _times[second]
+    if text is None:
+        minutes, seconds = divmod(second, 60)
+        text = _times[second] = "%02d:%02d:%02d" % (*divmod(minutes, 60), seconds)
+    return text
+
+
+class Temporal:
+    """
+    Random `date-time`, `date` or `time` values between `minimum` and
+    `maximum`, both included. Offsets are counted in days for dates and in
+    seconds otherwise.
+    """
+
+    __slots__ = ("format", "minimum", "maximum", "span", "_start_second", "_dates")
+
+    def __init__(
+        self,
+        _format: str,
+        minimum: datetime.datetime = DEFAULT_MINIMUM,
+        maximum: datetime.datetime = DEFAULT_MAXIMUM,
+    ):
+        self.format = _format
+        self.minimum = minimum
+        self.maximum = maximum
+        if _format == "date":
+            self.span = (maximum.date() - minimum.date()).days + 1
+        else:
+            self.span = int((maximum - minimum).total_seconds()) + 1
+        # Second of the day of the start of the range
+        self._start_second = minimum.hour * 3600 + minimum.minute * 60 + minimum.second
+        # ISO strings of the dates of the range, filled as they are drawn
+        days = self.span if _format == "date" else self.span // _DAY + 2
+        self._dates: List[Optional[str]] = [None] * days
+
+    def _date_text(self, day: int) -> str:
+        text = self._dates[day]
+        if text is None:
+            date = self.minimum.date() + datetime.timedelta(days=day)
+            text = self._dates[day] = date.isoformat()
+        return text
+
+    def offset(self, rng: RandomSource) -> int:
+        """
+        Random offset from the start of the range
+        """
+        _random, span = rng.random, self.span
+        if span <= _DAY:
+            return int(_random() * span)
+        # Spans of many days are drawn as a day and a second in the day,
+        # which keeps both draws small enough to come from a float
+        days = -(-span // _DAY)
+        while True:
+            offset = int(_random() * days) * _DAY + int(_random() * _DAY)
+            if offset < span:
+                return offset
+
+    def format_offset(self, offset: int) -> str:
+        if self.format == "date":
+            return self._date_text(offset)
+        day, second = divmod(self._start_second + offset, _DAY)
+        if self.format == "time":
+            return _time_text(second)
+        return self._date_text(day) + "T" + _time_text(second)
+
+    def generate(self, rng: RandomSource) -> str:
+        return self.format_offset(self.offset(rng))
+
+    def generate_many(self, rng: RandomSource, n: int) -> List[str]:
+        offset, format_offset = self.offset, self.format_offset
+        return [format_offset(offset(rng)) for _ in range(n)]
+
+    def value(self, rng: RandomSource) -> Any:
+        """
+        Random datetime, date or time object
+        """
+        offset = self.offset(rng)
+        if self.format == "date":
+            return self.minimum.date() + datetime.timedelta(days=offset)
+        result = self.minimum + datetime.timedelta(seconds=offset)
+        return result.time() if self.format == "time" else result
+
+
+def _parse(
+    schema: Dict[str, Any], key: str, _format: str
+) -> Optional[datetime.datetime]:
+    text = schema.get(key)
+    if text is None:
+        return None
+    try:
+        if _format == "date":
+            date = datetime.date.fromisoformat(text)
+            return datetime.datetime(date.year, date.month, date.day)
+        if _format == "time":
+            time = datetime.time.fromisoformat(text).replace(microsecond=0)
+            return datetime.datetime.combine(DEFAULT_MINIMUM.date(), time)
+        result = datetime.datetime.fromisoformat(text)
+        return result.replace(microsecond=0, tzinfo=None)
+    except (TypeError, ValueError):
+        raise InvalidSchema(schema, reason=f"{key} is not a valid {_format}")
+
+
+@functools.lru_cache(maxsize=256)
+def _get_temporal(
+    _format: str, minimum: datetime.datetime, maximum: datetime.datetime
+) -> Temporal:
+    return Temporal(_format, minimum, maximum)
+
+
+def schema_temporal(schema: Dict[str, Any]) -> Temporal:
+    """
+    Generator of the values of a `date-time`, `date` or `time` schema
+    """
+    _format = schema["format"]
+    minimum = _parse(schema, "formatMinimum", _format)
+    maximum = _parse(schema, "formatMaximum", _format)
+    if _format == "time":
+        # Times of a single day
+        day = DEFAULT_MINIMUM.date()
+        minimum = minimum or datetime.datetime.combine(day, datetime.time.min)
+        maximum = maximum or datetime.datetime.combine(day, datetime.time(23, 59, 59))
+    else:
+        minimum = minimum or DEFAULT_MINIMUM
+        maximum = maximum or DEFAULT_MAXIMUM
+    if minimum > maximum:
+        raise InvalidSchema(
+            schema, reason="formatMinimum is greater than formatMaximum"
+        )
+    return _get_temporal(_format, minimum, maximum)
@@ -1,3 +1,7 @@
 from typing import Any, Dict, Optional
 
 Definitions = Optional[Dict[str, Any]]
+
+# A random.Random instance, or the random module itself to use its
+# global state
+RandomSource = Any
@@ -0,0 +1,96 @@
+"""
+Weighted choices between enum values and oneOf/anyOf branches.
+
+Weights are set with the `x-freddy-weight` extension key: a number on
+each oneOf/anyOf branch (1 if missing), or a list with a number per value
+on enum schemas:
+
+    {"enum": ["free", "pro"], "x-freddy-weight": [9, 1]}
+    {"oneOf": [{"type": "string", "x-freddy-weight": 3}, {"type": "null"}]}
+
+Weighted choices are drawn in constant time with the alias method.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from .exceptions import InvalidSchema
+from .types import RandomSource
+
+WEIGHT_KEY = "x-freddy-weight"
+
+
+def _check_weights(schema: Any, weights: Sequence[Any]) -> List[float]:
+    for weight in weights:
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+            raise InvalidSchema(schema, reason=f"{WEIGHT_KEY} must be numbers")
+        if weight < 0:
+            raise InvalidSchema(schema, reason=f"{WEIGHT_KEY} can not be negative")
+    if not sum(weights):
+        raise InvalidSchema(schema, reason=f"{WEIGHT_KEY} can not all be zero")
+    return list(weights)
+
+
+def enum_weights(schema: Dict[str, Any]) -> Optional[List[float]]:
+    """
+    Weights of the values of an enum schema, or None if they are equally
+    likely
+    """
+    weights = schema.get(WEIGHT_KEY)
+    if weights is None:
+        return None
+    if not isinstance(weights, list) or len(weights) != len(schema["enum"]):
+        raise InvalidSchema(
+            schema, reason=f"{WEIGHT_KEY} of an enum must have a weight per value"
+        )
+    return _check_weights(schema, weights)
+
+
+def branch_weights(
+    schema: Dict[str, Any], branches: List[Dict[str, Any]]
+) -> Optional[List[float]]:
+    """
+    Weights of the oneOf/anyOf branches of a schema, or None if they are
+    equally likely
+    """
+    if not any(WEIGHT_KEY in branch for branch in branches):
+        return None
+    return _check_weights(schema, [branch.get(WEIGHT_KEY, 1) for branch in branches])
+
+
+class AliasTable:
+    """
+    Draws indexes with the given weights in constant time (Vose's alias
+    method): index `i` is drawn with probability `probabilities[i]`,
+    otherwise its alias is.
+    """
+
+    __slots__ = ("size", "probabilities", "aliases", "cum_weights", "_random")
+
+    def __init__(self, rng: RandomSource, weights: Sequence[float]):
+        size = self.size = len(weights)
+        total = sum(weights)
+        scaled = [weight * size / total for weight in weights]
+        self.probabilities = [1.0] * size
+        self.aliases = list(range(size))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] -= 1 - scaled[less]
+            (small if scaled[more] < 1 else large).append(more)
+        # Cumulative weights, to draw many indexes at once with choices()
+        self.cum_weights = []
+        cumulative = 0.0
+        for weight in weights:
+            cumulative += weight
+            self.cum_weights.append(cumulative)
+        self._random = rng.random
+
+    def draw(self) -> int:
+        value = self._random() * self.size
+        index = int(value)
+        if value - index < self.probabilities[index]:
+            return index
+        return self.aliases[index]
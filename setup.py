@@ -29,5 +29,10 @@ setup(
     include_package_data=True,
     packages=find_packages(exclude=["ez_setup"]),
     install_requires=["rstr"],
-    extras_require={"test": ["pytest", "jsonschema", "pydantic"]},
+    entry_points={"console_scripts": ["freddy = freddy.cli:main"]},
+    extras_require={
+        "numpy": ["numpy"],
+        "pydantic": ["pydantic<2"],
+        "test": ["pytest", "jsonschema", "pydantic", "numpy"],
+    },
 )
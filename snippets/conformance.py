@@ -0,0 +1,312 @@
+"""
+Conformance and performance runner over a local corpus of json schemas.
+
+Every `*.json` file under the corpus directory is one schema (see
+`schema-store.py` to download the SchemaStore catalog as one). Each schema
+is sampled and every sample validated with `jsonschema`, over a pool of
+processes, and reported as:
+
+- ok: all samples are valid
+- invalid: a sample does not validate
+- error: freddy raised, e.g. `UnsupportedSchema`
+- timeout: generating the samples took longer than `--timeout`
+- unreadable: the file is not json, or not a valid schema
+
+along with the mean generation time per sample, not counting the
+compilation of the schema. Results are cached by the hash of the schema
+content and of the freddy sources, and by the number of samples, seed
+and timeout, so schemas that did not change are not run again until
+freddy or the options do. Timeouts are not cached, as they may be due to
+a busy machine:
+
+    python snippets/conformance.py snippets/store --workers 8
+    python snippets/conformance.py snippets/store --failures --slowest 20
+
+Files are hashed through a memory map by the main process, and only
+parsed by the worker that runs them.
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import signal
+import sys
+import time
+import traceback
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import freddy  # noqa: E402
+
+CACHE_FILE = ".conformance-cache.json"
+STATUSES = ("ok", "invalid", "error", "timeout", "unreadable")
+
+
+class Timeout(BaseException):
+    """
+    Not an `Exception`, so that nothing on the way catches it
+    """
+
+
+def _on_alarm(signum, frame):
+    raise Timeout()
+
+
+def iter_corpus(directory: str) -> Iterator[str]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".json") and name != CACHE_FILE:
+                yield os.path.join(root, name)
+
+
+def content_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return hashlib.sha256(data).hexdigest()
+
+
+def sources_hash() -> str:
+    """
+    Hash of the freddy sources, which invalidates cached results when
+    freddy changes
+    """
+    digest = hashlib.sha256()
+    package = os.path.dirname(freddy.__file__)
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            with open(os.path.join(package, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _init_worker() -> None:
+    # The main process handles interruptions
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def check(task: Tuple[str, int, float, int]) -> Dict[str, Any]:
+    """
+    Sample the schema of a file `samples` times, in `timeout` seconds at
+    most, and validate the samples
+    """
+    import jsonschema
+
+    path, samples, timeout, seed = task
+    result: Dict[str, Any] = {"status": "ok", "error": None, "time": None}
+    try:
+        with open(path, "rb") as f:
+            schema = json.loads(f.read())
+        jsonschema.validators.validator_for(schema).check_schema(schema)
+    except Exception as ex:
+        result.update(status="unreadable", error=_describe(ex))
+        return result
+
+    sampler = freddy.Sampler(seed=seed)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        # Compiled once, so that the time per sample is that of sampling
+        compiled = sampler.compile(schema)
+        start = time.perf_counter()
+        values = [compiled.sample() for _ in range(samples)]
+        result["time"] = (time.perf_counter() - start) / samples
+    except Timeout:
+        result.update(status="timeout", error=f"more than {timeout}s")
+        return result
+    except Exception as ex:
+        result.update(status="error", error=_describe(ex))
+        return result
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+    for value in values:
+        try:
+            jsonschema.validate(value, schema)
+        except jsonschema.ValidationError as ex:
+            result.update(status="invalid", error=_describe(ex))
+            break
+        except Exception as ex:
+            result.update(status="unreadable", error=_describe(ex))
+            break
+    return result
+
+
+def _check_task(task: Tuple[str, int, float, int]) -> Tuple[str, Dict[str, Any]]:
+    return task[0], check(task)
+
+
+def _describe(ex: Exception) -> str:
+    if isinstance(ex, RecursionError):
+        # Keep the innermost frame rather than a useless message
+        frame = traceback.extract_tb(ex.__traceback__)[-1]
+        return f"RecursionError: in {frame.name}"
+    message = str(ex).splitlines()[0] if str(ex) else ""
+    return f"{ex.__class__.__name__}: {message[:200]}"
+
+
+def load_cache(path: str, sources: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if cache.get("sources") != sources:
+        return {}
+    return cache["results"]
+
+
+def save_cache(path: str, sources: str, results: Dict[str, Dict[str, Any]]) -> None:
+    with open(path + ".tmp", "w") as f:
+        json.dump({"sources": sources, "results": results}, f)
+    os.replace(path + ".tmp", path)
+
+
+def run(
+    paths: List[str],
+    cache: Dict[str, Dict[str, Any]],
+    workers: int,
+    samples: int,
+    timeout: float,
+    seed: int,
+) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """
+    Results of the files, by path, and number of them that were run rather
+    than cached. New results are added to `cache`
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, List[str]] = {}
+    options = f"{samples}:{seed}:{timeout}"
+    for path in paths:
+        key = f"{content_hash(path)}:{options}"
+        if key in cache:
+            results[path] = cache[key]
+        else:
+            # Duplicate schemas are run once
+            pending.setdefault(key, []).append(path)
+
+    tasks = [(same[0], samples, timeout, seed) for same in pending.values()]
+    keys = {same[0]: key for key, same in pending.items()}
+    done = 0
+    if tasks:
+        with multiprocessing.Pool(
+            workers, initializer=_init_worker, maxtasksperchild=100
+        ) as pool:
+            try:
+                for path, result in pool.imap_unordered(_check_task, tasks):
+                    key = keys[path]
+                    if result["status"] != "timeout":
+                        cache[key] = result
+                    for same in pending[key]:
+                        results[same] = result
+                    done += 1
+                    if done % 100 == 0:
+                        print(f"{done}/{len(tasks)}", file=sys.stderr)
+            except KeyboardInterrupt:
+                print(f"Halted after {done}/{len(tasks)}", file=sys.stderr)
+                pool.terminate()
+    return results, done
+
+
+def report(
+    results: Dict[str, Dict[str, Any]],
+    failures: bool,
+    slowest: int,
+    stream=sys.stdout,
+) -> None:
+    statuses = Counter(result["status"] for result in results.values())
+    errors = Counter(
+        result["error"].split(":")[0]
+        for result in results.values()
+        if result["status"] == "error"
+    )
+    write = stream.write
+    write("#" * 30 + "\n")
+    write(f"Total: {len(results)}\n")
+    for status in STATUSES:
+        write(f"{status.capitalize()}: {statuses[status]}\n")
+    for error, count in errors.most_common():
+        write(f"  {error}: {count}\n")
+    times = sorted(
+        (
+            (result["time"], path)
+            for path, result in results.items()
+            if result["time"] is not None
+        ),
+        reverse=True,
+    )
+    if times:
+        write(f"Median time per sample: {times[len(times) // 2][0] * 1e3:.3f} ms\n")
+    write("#" * 30 + "\n")
+
+    if slowest and times:
+        write("Slowest schemas:\n")
+        for seconds, path in times[:slowest]:
+            write(f"  {seconds * 1e3:10.3f} ms  {path}\n")
+    if failures:
+        write("Failures:\n")
+        for path, result in sorted(results.items()):
+            if result["status"] != "ok":
+                write(f"  {path}: {result['status']}: {result['error']}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", help="directory of json schema files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--samples", type=int, default=10, help="samples per schema")
+    parser.add_argument(
+        "--timeout", type=float, default=10.0, help="seconds per schema"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cache", help=f"cache file, {CACHE_FILE} in the corpus by default"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="run every schema")
+    parser.add_argument(
+        "--failures", action="store_true", help="list the failing schemas"
+    )
+    parser.add_argument(
+        "--slowest", type=int, default=10, help="list the N slowest schemas"
+    )
+    parser.add_argument(
+        "--json", metavar="FILE", help="write the results by path to FILE"
+    )
+    args = parser.parse_args(argv)
+
+    paths = list(iter_corpus(args.corpus))
+    if not paths:
+        parser.error(f"no json files in {args.corpus}")
+    cache_path = args.cache or os.path.join(args.corpus, CACHE_FILE)
+    sources = sources_hash()
+    cache = {} if args.no_cache else load_cache(cache_path, sources)
+
+    start = time.perf_counter()
+    results, done = run(
+        paths, cache, args.workers, args.samples, args.timeout, args.seed
+    )
+    elapsed = time.perf_counter() - start
+    if done:
+        save_cache(cache_path, sources, cache)
+    print(
+        f"Ran {done} schemas, reused {len(results) - done} results, in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+    report(results, args.failures, args.slowest)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return 0 if len(results) == len(paths) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
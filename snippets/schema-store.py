@@ -1,10 +1,20 @@
+"""
+Download the schemas of the SchemaStore catalog into a corpus directory,
+one file per schema, to be checked with `conformance.py`:
+
+    python snippets/schema-store.py snippets/store
+    python snippets/conformance.py snippets/store
+"""
+
 import asyncio
+import hashlib
 import json
+import os
+import re
+import sys
 import traceback
 
 import aiohttp
-import freddy
-import jsonschema
 
 
 async def get_schema(session, url):
@@ -49,7 +59,7 @@ async def iterate_store_schemas():
             try:
                 json_schema = await get_schema(session, url)
                 if json_schema is not None:
-                    yield json_schema
+                    yield url, json_schema
             except KeyboardInterrupt:
                 raise
             except Exception:
@@ -57,79 +67,40 @@ async def iterate_store_schemas():
                 continue
 
 
-def get_from_file():
-    try:
-        with open("snippets/store.json", "r") as f:
-            return json.loads(f.read())
-    except FileNotFoundError:
-        return None
-    except Exception:
-        print("Error getting from file")
-        return None
-
-
-def store_in_file(results):
-    with open("snippets/store.json", "w") as f:
-        f.write(json.dumps(results))
-
-
-async def load_schemas():
-    all_schemas = get_from_file()
-    if all_schemas is None:
-        all_schemas = [s async for s in iterate_store_schemas()]
-        store_in_file(all_schemas)
-    return all_schemas
-
-
-def check_schemas(all_schemas):
-    results = {"total": 0, "invalid": [], "success": 0}
-    try:
-        for schema in all_schemas:
-            results["total"] += 1
-            # Try to generate a sample
-            try:
-                sample = freddy.jsonschema(schema)
-            except KeyboardInterrupt:
-                raise
-            except Exception as ex:
-                kls = ex.__class__.__name__
-                results.setdefault(str(kls), [])
-                results[str(kls)].append(schema)
-                continue
-            # Try to validate sample against schema
-            try:
-                jsonschema.validate(sample, schema)
-            except KeyboardInterrupt:
-                raise
-            except Exception:
-                results["invalid"].append(schema)
-            else:
-                results["success"] += 1
-    except KeyboardInterrupt:
-        print("Halted")
-    finally:
-        return results
-
+def file_name(url):
+    """
+    Readable and unique file name for the schema at `url`
+    """
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "-", url.split("://")[-1]).strip("-")
+    digest = hashlib.sha256(url.encode()).hexdigest()[:8]
+    return f"{slug[:80]}-{digest}.json"
 
-async def run():
-    all_schemas = await load_schemas()
-    results = check_schemas(all_schemas)
 
-    print("#" * 30)
-    print(f"Total: {results.pop('total')}")
-    print(f"Success: {results.pop('success')}")
-    for err, v in results.items():
-        print(f"{err}: {len(v)}")
-    print("#" * 30)
+def split_store(store, directory):
+    """
+    Split a `store.json` list of schemas, as downloaded by previous
+    versions of this script, into a corpus directory
+    """
+    with open(store) as f:
+        schemas = json.load(f)
+    for index, schema in enumerate(schemas):
+        with open(os.path.join(directory, f"{index:05}.json"), "w") as f:
+            json.dump(schema, f)
 
-    for sch in results["invalid"]:
-        sample = freddy.jsonschema(sch)
-        import pdb
 
-        pdb.set_trace()
-        jsonschema.validate(instance=sample, schema=sch)
+async def download(directory):
+    count = 0
+    async for url, schema in iterate_store_schemas():
+        with open(os.path.join(directory, file_name(url)), "w") as f:
+            json.dump(schema, f)
+        count += 1
+    print(f"Downloaded {count} schemas into {directory}")
 
 
 if __name__ == "__main__":
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(run())
+    directory = sys.argv[1] if len(sys.argv) > 1 else "snippets/store"
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists("snippets/store.json"):
+        split_store("snippets/store.json", directory)
+    else:
+        asyncio.run(download(directory))
@@ -0,0 +1,104 @@
+import asyncio
+import time
+import unittest
+
+import jsonschema
+
+import freddy
+
+schema = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "minLength": 1},
+    },
+}
+
+
+async def collect(samples, limit=None):
+    values = []
+    async for value in samples:
+        values.append(value)
+        if limit is not None and len(values) == limit:
+            break
+    return values
+
+
+class TestAsample(unittest.TestCase):
+    def test_samples(self):
+        samples = asyncio.run(collect(freddy.asample(schema, 250)))
+        self.assertEqual(len(samples), 250)
+        for sample in samples:
+            jsonschema.validate(sample, schema)
+
+    def test_same_seed_same_samples(self):
+        one = asyncio.run(collect(freddy.asample(schema, 50, seed=1)))
+        other = asyncio.run(collect(freddy.asample(schema, 50, seed=1)))
+        self.assertEqual(one, other)
+        self.assertEqual(one, freddy.Sampler(seed=1).sample_many(schema, 50))
+
+    def test_rate(self):
+        start = time.perf_counter()
+        samples = asyncio.run(collect(freddy.asample(schema, 20, rate=200)))
+        self.assertEqual(len(samples), 20)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+    def test_prefetch_is_bounded(self):
+        generated = []
+
+        def factory(rng):
+            generated.append(None)
+            return 1
+
+        registry = freddy.Registry()
+        registry.register(factory, type="integer")
+        sampler = freddy.Sampler(seed=1, factories=registry)
+
+        async def consume():
+            samples = sampler.asample({"type": "integer"}, buffer=50, chunk_size=10)
+            values = await collect(samples, 5)
+            # Give the thread time to fill the buffer
+            await asyncio.sleep(0.3)
+            return values
+
+        self.assertEqual(asyncio.run(consume()), [1] * 5)
+        # The buffer, the chunk being put and the chunk being generated
+        self.assertLessEqual(len(generated), 80)
+
+    def test_other_tasks_run(self):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.ensure_future(tick())
+            values = await collect(freddy.asample(schema, 2000, buffer=100))
+            task.cancel()
+            return values
+
+        self.assertEqual(len(asyncio.run(main())), 2000)
+        self.assertGreater(len(ticks), 0)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(collect(freddy.asample(schema, 1, rate=0)))
+        with self.assertRaises(ValueError):
+            asyncio.run(collect(freddy.asample(schema, 1, buffer=0)))
+
+    def test_invalid_schema(self):
+        with self.assertRaises(freddy.InvalidSchema):
+            asyncio.run(
+                collect(
+                    freddy.asample({"type": "integer", "minimum": 2, "maximum": 1}, 1)
+                )
+            )
+
+    def test_workers(self):
+        samples = asyncio.run(collect(freddy.asample(schema, 100, workers=2, seed=1)))
+        self.assertEqual(len(samples), 100)
+        for sample in samples:
+            jsonschema.validate(sample, schema)
@@ -0,0 +1,135 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import pydantic
+import pytest
+
+from freddy.cli import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+schema = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 0, "maximum": 1000},
+        "name": {"type": "string", "minLength": 1},
+        "active": {"type": "boolean"},
+    },
+}
+
+
+class Item(pydantic.BaseModel):
+    id: int
+    label: str
+
+
+def run(args):
+    """
+    Exit code, standard output and standard error of the command line
+    """
+    stdout, stderr = io.TextIOWrapper(io.BytesIO()), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        code = main(args)
+    stdout.flush()
+    return code, stdout.buffer.getvalue(), stderr.getvalue()
+
+
+class TestCommandLine(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.tmp_path = directory.name
+        self.schema_file = self.path("schema.json")
+        with open(self.schema_file, "w") as f:
+            json.dump(schema, f)
+
+    def path(self, name):
+        return os.path.join(self.tmp_path, name)
+
+    def test_ndjson(self):
+        output = self.path("out.ndjson")
+        code, _, err = run([self.schema_file, "-n", "50", "-s", "1", "-o", output])
+        self.assertEqual(code, 0)
+        with open(output) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 50)
+        self.assertTrue(all(0 <= json.loads(line)["id"] <= 1000 for line in lines))
+        self.assertIn("50 samples", err)
+
+    def test_seed_is_reproducible(self):
+        for workers in ([], ["-w", "2"]):
+            outputs = []
+            for name in ("first.json", "second.json"):
+                output = self.path(name)
+                args = ["-n", "20", "-s", "7", "-f", "json", "-q", "-o", output]
+                main([self.schema_file] + args + workers)
+                with open(output) as f:
+                    outputs.append(f.read())
+            self.assertEqual(len(json.loads(outputs[0])), 20)
+            self.assertEqual(outputs[0], outputs[1])
+
+    def test_csv_stdout(self):
+        _, out, _ = run([self.schema_file, "-n", "10", "-f", "csv", "-q"])
+        rows = list(csv.reader(out.decode().splitlines()))
+        self.assertEqual(rows[0], ["id", "name", "active"])
+        self.assertEqual(len(rows), 11)
+        self.assertTrue(all(row[2] in ("", "true", "false") for row in rows[1:]))
+
+    def test_pydantic_model(self):
+        _, out, _ = run(["test_cli:Item", "-n", "3", "-q"])
+        for line in out.splitlines():
+            Item(**json.loads(line))
+
+    def test_models_of_working_directory(self):
+        # Run as the installed script, whose directory is on sys.path
+        # instead of the working directory
+        with open(self.path("freddy_models.py"), "w") as f:
+            f.write(textwrap.dedent("""
+                    import pydantic
+
+                    class Point(pydantic.BaseModel):
+                        x: int
+                        y: int
+                    """))
+        bin_path = self.path("bin")
+        os.mkdir(bin_path)
+        script = os.path.join(bin_path, "freddy")
+        with open(script, "w") as f:
+            f.write("import sys\nfrom freddy.cli import main\nsys.exit(main())\n")
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        output = subprocess.check_output(
+            [sys.executable, script, "freddy_models:Point", "-n", "2", "-q"],
+            cwd=self.tmp_path,
+            env=env,
+        )
+        for line in output.splitlines():
+            self.assertEqual(set(json.loads(line)), {"x", "y"})
+
+    def test_invalid_input(self):
+        with pytest.raises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            main(["missing.json"])
+        with pytest.raises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            main(["test_cli:Missing"])
+        path = self.path("array.json")
+        with open(path, "w") as f:
+            json.dump({"type": "array"}, f)
+        with pytest.raises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            main([path, "-f", "csv"])
+
+    def test_profile(self):
+        output, collapsed = self.path("out.ndjson"), self.path("out.folded")
+        args = [self.schema_file, "-n", "20", "-o", output, "-p"]
+        code, _, err = run(args + ["--collapsed", collapsed])
+        self.assertEqual(code, 0)
+        self.assertIn("#/properties/name", err)
+        with open(collapsed) as f:
+            self.assertIn("#;#/properties/id ", f.read())
@@ -0,0 +1,106 @@
+import unittest
+
+import jsonschema
+import pytest
+
+import freddy
+
+np = pytest.importorskip("numpy")
+columnar = pytest.importorskip("freddy.columnar")
+
+flat_schema = {
+    "type": "object",
+    "required": ["id", "score"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1, "exclusiveMaximum": 10},
+        "score": {"type": "number", "minimum": 0, "maximum": 1},
+        "active": {"type": "boolean"},
+        "color": {"enum": ["red", "green", "blue"]},
+        "mixed": {"enum": [1, "one", None]},
+        "kind": {"const": "user"},
+        "nothing": {"type": "null"},
+        "level": {"$ref": "#/definitions/level"},
+    },
+    "definitions": {"level": {"type": "integer", "minimum": 0, "maximum": 3}},
+}
+
+
+class TestColumns(unittest.TestCase):
+    def test_one_column_per_property(self):
+        columns = columnar.columns(flat_schema, 100)
+        self.assertEqual(len(columns), 100)
+        self.assertEqual(list(columns.data), list(flat_schema["properties"]))
+        for column in columns.data.values():
+            self.assertEqual(column.shape, (100,))
+
+    def test_masks_for_optional_properties(self):
+        columns = columnar.columns(flat_schema, 100)
+        self.assertEqual(
+            set(columns.masks), set(flat_schema["properties"]) - {"id", "score"}
+        )
+        for mask in columns.masks.values():
+            self.assertEqual(mask.dtype, bool)
+
+    def test_column_types(self):
+        data = columnar.columns(flat_schema, 100).data
+        self.assertTrue(np.issubdtype(data["id"].dtype, np.integer))
+        self.assertTrue(np.issubdtype(data["score"].dtype, np.floating))
+        self.assertEqual(data["active"].dtype, bool)
+        self.assertEqual(data["mixed"].dtype, object)
+        self.assertTrue(((data["id"] >= 1) & (data["id"] <= 9)).all())
+
+    def test_seed(self):
+        one = columnar.columns(flat_schema, 10, seed=42)
+        other = columnar.columns(flat_schema, 10, seed=42)
+        for key in one.data:
+            self.assertEqual(one.data[key].tolist(), other.data[key].tolist())
+
+    def test_to_dicts(self):
+        samples = columnar.columns(flat_schema, 200).to_dicts()
+        self.assertEqual(len(samples), 200)
+        for sample in samples:
+            jsonschema.validate(sample, flat_schema)
+            self.assertIsInstance(sample["id"], int)
+            self.assertIsInstance(sample["score"], float)
+
+    def test_sample_many(self):
+        for sample in columnar.sample_many(flat_schema, 20, seed=1):
+            jsonschema.validate(sample, flat_schema)
+
+    def test_multiples(self):
+        schema = {
+            "type": "object",
+            "required": ["price", "count"],
+            "properties": {
+                "price": {"type": "number", "multipleOf": 0.1, "maximum": 2},
+                "count": {"type": "integer", "multipleOf": 4, "exclusiveMinimum": 0},
+            },
+        }
+        data = columnar.columns(schema, 500, seed=1).data
+        self.assertTrue(np.issubdtype(data["count"].dtype, np.integer))
+        self.assertTrue((data["count"] % 4 == 0).all())
+        self.assertTrue((data["count"] > 0).all())
+        self.assertEqual(set(np.round(data["price"] * 10) / 10), set(data["price"]))
+        self.assertTrue((data["price"] <= 2).all())
+
+    def test_nested_objects_not_supported(self):
+        schema = {"type": "object", "properties": {"foo": {"type": "object"}}}
+        with pytest.raises(freddy.UnsupportedSchema):
+            columnar.columns(schema, 10)
+
+    def test_only_objects_supported(self):
+        with pytest.raises(freddy.UnsupportedSchema):
+            columnar.columns({"type": "integer"}, 10)
+
+    def test_bounds_out_of_range(self):
+        for bounds in (
+            {"type": "integer", "minimum": -(2**70)},
+            {"type": "integer", "maximum": 2**63},
+            {"type": "number", "minimum": -1e308, "maximum": 1e308},
+        ):
+            schema = {"type": "object", "properties": {"value": bounds}}
+            with pytest.raises(freddy.UnsupportedSchema):
+                columnar.columns(schema, 10)
+        schema = {"type": "integer", "minimum": -(2**63), "maximum": 2**63 - 1}
+        data = columnar.columns({"type": "object", "properties": {"v": schema}}, 10)
+        self.assertEqual(len(data.data["v"]), 10)
@@ -0,0 +1,363 @@
+import copy
+import random
+import unittest
+from typing import List, Optional
+
+import jsonschema
+import pydantic
+import pytest
+
+import freddy
+from freddy.compiler import (
+    DEFAULT_MAX_DEPTH,
+    DEFAULT_MAX_VALUES,
+    CompiledSchema,
+    DepthLimitedNode,
+    RefNode,
+)
+
+person_schema = {
+    "type": "object",
+    "required": ["name", "age"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "age": {"type": "integer", "minimum": 0, "maximum": 100},
+        "email": {"type": "string", "pattern": r"^[a-z]{3,8}@[a-z]{3,8}\.com$"},
+        "born": {"type": "string", "format": "date"},
+        "tags": {"type": "array", "items": {"enum": ["a", "b", "c"]}},
+    },
+}
+
+company_schema = {
+    "definitions": {"person": person_schema},
+    "type": "object",
+    "required": ["name", "ceo", "staff"],
+    "properties": {
+        "name": {"type": "string"},
+        "ceo": {"$ref": "#/definitions/person"},
+        "staff": {"type": "array", "items": {"$ref": "#/definitions/person"}},
+        "rating": {"oneOf": [{"type": "number"}, {"type": "null"}]},
+    },
+}
+
+tree_schema = {
+    "definitions": {
+        "node": {
+            "type": "object",
+            "required": ["value"],
+            "properties": {
+                "value": {"type": "integer"},
+                "children": {
+                    "type": "array",
+                    "maxItems": 2,
+                    "items": {"$ref": "#/definitions/node"},
+                },
+            },
+        }
+    },
+    "$ref": "#/definitions/node",
+}
+
+
+class TestCompile(unittest.TestCase):
+    def _makeOne(self, schema):
+        compiled = freddy.compile(schema)
+        sample = compiled.sample()
+        jsonschema.validate(sample, schema)
+        return sample
+
+    def test_returns_compiled_schema(self):
+        self.assertIsInstance(freddy.compile(person_schema), CompiledSchema)
+
+    def test_samples_are_valid(self):
+        for schema in (person_schema, company_schema):
+            compiled = freddy.compile(schema)
+            for _ in range(50):
+                jsonschema.validate(compiled.sample(), schema)
+
+    def test_required_keys(self):
+        company = self._makeOne(company_schema)
+        self.assertIn("ceo", company)
+        self.assertIn("name", company["ceo"])
+        self.assertIn("age", company["ceo"])
+
+    def test_definitions_are_compiled_once(self):
+        root = freddy.compile(company_schema).root
+        ceo = root.properties[1][1]
+        staff = root.properties[2][1]
+        self.assertIs(ceo, staff.items)
+
+    def test_recursive_definitions(self):
+        root = freddy.compile(tree_schema).root
+        children = root.properties[1][1]
+        self.assertIsInstance(children.items, RefNode)
+        self.assertIs(children.items.target, root)
+
+    def test_schema_is_validated_on_compile(self):
+        with pytest.raises(freddy.UnsupportedSchema):
+            freddy.compile({"type": "object", "properties": {"foo": {"not": {}}}})
+
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.compile({"definitions": {}, "$ref": "#/definitions/foo"})
+
+    def test_unsupported_type(self):
+        with pytest.raises(freddy.UnsupportedType):
+            freddy.compile({"type": "foobar"})
+
+
+class Pet(pydantic.BaseModel):
+    name: str
+    age: Optional[int]
+
+
+class Owner(pydantic.BaseModel):
+    name: str
+    pets: List[Pet]
+
+
+class TestSample(unittest.TestCase):
+    def test_sample_jsonschema(self):
+        jsonschema.validate(freddy.sample(company_schema), company_schema)
+
+    def test_sample_pydantic(self):
+        Owner.validate(freddy.sample(Owner))
+
+
+all_types_schema = {
+    "type": "object",
+    "required": ["integer", "number", "string", "nested"],
+    "properties": {
+        "integer": {"type": "integer", "minimum": -5, "maximum": 5},
+        "number": {"type": "number", "minimum": 1, "maximum": 2},
+        "string": {"type": "string", "minLength": 2, "maxLength": 4},
+        "boolean": {"type": "boolean"},
+        "null": {"type": "null"},
+        "const": {"const": "foo"},
+        "enum": {"enum": [1, "two", None]},
+        "of": {"anyOf": [{"type": "integer"}, {"type": "string"}]},
+        "array": {"type": "array", "maxItems": 3, "items": {"type": "integer"}},
+        "unique": {
+            "type": "array",
+            "uniqueItems": True,
+            "maxItems": 3,
+            "items": {"type": "integer"},
+        },
+        "nested": {
+            "type": "object",
+            "properties": {"foo": {"type": "string", "pattern": "^[a-f]{3}$"}},
+        },
+    },
+}
+
+
+class TestUniqueItems(unittest.TestCase):
+    def test_items_drawn_from_value_space(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 3,
+            "items": {"enum": ["a", "b", "c"]},
+        }
+        compiled = freddy.compile(schema)
+        self.assertEqual(compiled.root.max_items, 3)
+        for sample in compiled.sample_many(20):
+            self.assertEqual(sorted(sample), ["a", "b", "c"])
+
+    def test_impossible(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 6,
+            "items": {"anyOf": [{"type": "boolean"}, {"enum": [1, 2, 3]}]},
+        }
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.compile(schema)
+
+    def test_too_few_distinct_values_generated(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 5,
+            "items": {"type": "string", "pattern": "^[ab]$"},
+        }
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.sample(schema)
+
+
+class TestSampleMany(unittest.TestCase):
+    def test_all_samples_are_valid(self):
+        samples = freddy.sample_many(all_types_schema, 100)
+        self.assertEqual(len(samples), 100)
+        for sample in samples:
+            jsonschema.validate(sample, all_types_schema)
+
+    def test_optional_keys_vary(self):
+        samples = freddy.sample_many(all_types_schema, 100)
+        self.assertTrue(any("boolean" in s for s in samples))
+        self.assertTrue(any("boolean" not in s for s in samples))
+
+    def test_keys_keep_schema_order(self):
+        keys = list(all_types_schema["properties"])
+        for sample in freddy.sample_many(all_types_schema, 20):
+            self.assertEqual(list(sample), [k for k in keys if k in sample])
+
+    def test_references(self):
+        for sample in freddy.sample_many(company_schema, 50):
+            jsonschema.validate(sample, company_schema)
+        for sample in freddy.sample_many(tree_schema, 50):
+            jsonschema.validate(sample, tree_schema)
+
+    def test_pydantic(self):
+        for sample in freddy.sample_many(Owner, 20):
+            Owner.validate(sample)
+
+    def test_zero(self):
+        self.assertEqual(freddy.sample_many(all_types_schema, 0), [])
+
+
+class TestIterSamples(unittest.TestCase):
+    def test_yields_n_samples(self):
+        samples = list(freddy.iter_samples(person_schema, 25, chunk_size=10))
+        self.assertEqual(len(samples), 25)
+        for sample in samples:
+            jsonschema.validate(sample, person_schema)
+
+    def test_endless(self):
+        samples = freddy.iter_samples(person_schema, chunk_size=3)
+        for _ in range(10):
+            jsonschema.validate(next(samples), person_schema)
+
+    def test_schema_is_compiled_eagerly(self):
+        with pytest.raises(freddy.UnsupportedType):
+            freddy.iter_samples({"type": "foobar"})
+
+
+linked_list_schema = {
+    "definitions": {
+        "node": {
+            "type": "object",
+            "required": ["value", "next"],
+            "properties": {
+                "value": {"type": "integer"},
+                "next": {
+                    "oneOf": [
+                        {"$ref": "#/definitions/node", "x-freddy-weight": 1000000},
+                        {"type": "null"},
+                    ]
+                },
+            },
+        }
+    },
+    "$ref": "#/definitions/node",
+}
+
+
+def depth(value):
+    """
+    Number of nested objects and arrays of a value
+    """
+    deepest = 0
+    stack = [(value, 0)]
+    while stack:
+        value, level = stack.pop()
+        if isinstance(value, dict):
+            value = list(value.values())
+        if isinstance(value, list):
+            stack.extend((item, level + 1) for item in value)
+            level += 1
+        deepest = max(deepest, level)
+    return deepest
+
+
+def size(value):
+    if isinstance(value, dict):
+        return 1 + sum(map(size, value.values()))
+    if isinstance(value, list):
+        return 1 + sum(map(size, value))
+    return 1
+
+
+class TestDepthLimit(unittest.TestCase):
+    def test_max_depth(self):
+        compiled = freddy.compile(tree_schema, rng=random.Random(1), max_depth=4)
+        samples = compiled.sample_many(200)
+        # Deepest values end with required properties only
+        self.assertLessEqual(max(map(depth, samples)), 5)
+        for sample in samples:
+            jsonschema.validate(sample, tree_schema)
+
+    def test_deeper_than_recursion_limit(self):
+        compiled = freddy.compile(linked_list_schema, rng=random.Random(2))
+        self.assertLessEqual(depth(compiled.sample()), DEFAULT_MAX_DEPTH + 1)
+        deep = freddy.compile(linked_list_schema, rng=random.Random(3), max_depth=5000)
+        self.assertEqual(depth(deep.sample()), 5000)
+
+    def test_bounded_size_by_default(self):
+        # Arrays of up to 10 recursive items: depth alone does not bound these
+        forest_schema = {
+            "definitions": {
+                "node": {
+                    "type": "object",
+                    "required": ["children"],
+                    "properties": {
+                        "children": {
+                            "type": "array",
+                            "items": {"$ref": "#/definitions/node"},
+                        },
+                    },
+                }
+            },
+            "$ref": "#/definitions/node",
+        }
+        tree = copy.deepcopy(forest_schema)
+        tree["definitions"]["node"]["required"] = []
+        for schema in (forest_schema, tree):
+            for seed in range(20):
+                sample = freddy.sample(schema, seed=seed)
+                self.assertLessEqual(size(sample), 3 * DEFAULT_MAX_VALUES)
+                jsonschema.validate(sample, schema)
+
+    def test_max_values(self):
+        compiled = freddy.compile(tree_schema, rng=random.Random(6))
+        node = DepthLimitedNode(compiled.root, max_values=10)
+        for _ in range(50):
+            # Nodes left to build when the budget runs out end right away
+            self.assertLessEqual(size(node.sample()), 10 * 5)
+        with pytest.raises(ValueError):
+            DepthLimitedNode(compiled.root, max_values=0)
+
+    def test_decay(self):
+        def mean_size(decay):
+            compiled = freddy.compile(
+                tree_schema, rng=random.Random(4), max_depth=20, decay=decay
+            )
+            return sum(map(size, compiled.sample_many(300))) / 300
+
+        self.assertLess(mean_size(0.0), mean_size(0.5))
+        self.assertLess(mean_size(0.5), mean_size(1.0))
+
+    def test_only_recursive_schemas_are_limited(self):
+        compiled = freddy.compile(person_schema)
+        self.assertIs(compiled.node, compiled.root)
+        limited = freddy.compile(person_schema, max_depth=3)
+        self.assertIsInstance(limited.node, DepthLimitedNode)
+        self.assertIsInstance(freddy.compile(tree_schema).node, DepthLimitedNode)
+
+    def test_infinite_schema(self):
+        schema = {
+            "definitions": {
+                "node": {
+                    "type": "object",
+                    "required": ["next"],
+                    "properties": {"next": {"$ref": "#/definitions/node"}},
+                }
+            },
+            "$ref": "#/definitions/node",
+        }
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.compile(schema)
+
+    def test_reproducible(self):
+        first = freddy.Sampler(seed=5, decay=0.8).sample_many(tree_schema, 20)
+        second = freddy.Sampler(seed=5, decay=0.8).sample_many(tree_schema, 20)
+        self.assertEqual(first, second)
@@ -0,0 +1,129 @@
+import ipaddress
+import random
+import unittest
+import uuid
+
+import jsonschema
+import pytest
+
+import freddy
+from freddy.factories import Pool, Registry, registry
+
+schema = {
+    "type": "object",
+    "required": ["name", "email", "tags", "address"],
+    "properties": {
+        "name": {"type": "string"},
+        "email": {"type": "string", "format": "email"},
+        "tags": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+        "address": {"$ref": "#/definitions/Address"},
+    },
+    "definitions": {
+        "Address": {
+            "type": "object",
+            "required": ["street", "a/b"],
+            "properties": {"street": {"type": "string"}, "a/b": {"type": "integer"}},
+        }
+    },
+}
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry(registry)
+
+    def compile(self):
+        return freddy.compile(schema, rng=random.Random(1), factories=self.registry)
+
+    def test_by_type(self):
+        self.registry.register(lambda rng: "x", type="string")
+        sample = self.compile().sample()
+        self.assertEqual(sample["name"], "x")
+        self.assertEqual(set(sample["tags"]), {"x"})
+        # Formats come first
+        self.assertNotEqual(sample["email"], "x")
+
+    def test_by_format(self):
+        self.registry.register(Pool(["a@b.com", "c@d.org"]), format="email")
+        compiled = self.compile()
+        emails = {s["email"] for s in compiled.sample_many(50)}
+        emails |= {compiled.sample()["email"] for _ in range(50)}
+        self.assertEqual(emails, {"a@b.com", "c@d.org"})
+
+    def test_by_path(self):
+        self.registry.register(lambda rng: "main", path="/properties/tags/items")
+        self.registry.register(
+            lambda rng: 7, path="/definitions/Address/properties/a~1b"
+        )
+        self.registry.register(lambda rng: None, path="/properties/address/street")
+        sample = self.compile().sample()
+        self.assertEqual(set(sample["tags"]), {"main"})
+        self.assertEqual(sample["address"]["a/b"], 7)
+        self.assertIsInstance(sample["address"]["street"], str)
+
+    def test_unique_items(self):
+        array = {"type": "array", "items": {"type": "integer"}, "uniqueItems": True}
+        self.registry.register(lambda rng: 1000 + rng.randint(0, 99), path="/items")
+        compiled = freddy.compile(array, rng=random.Random(1), factories=self.registry)
+        for sample in compiled.sample_many(20):
+            self.assertEqual(len(set(sample)), len(sample))
+            for item in sample:
+                self.assertGreaterEqual(item, 1000)
+
+    def test_resolved_at_compile_time(self):
+        compiled = self.compile()
+        self.registry.register(lambda rng: "x", type="string")
+        self.assertNotEqual(compiled.sample()["name"], "x")
+
+    def test_sampler(self):
+        self.registry.register(lambda rng: 1, type="integer")
+        sampler = freddy.Sampler(seed=2, factories=self.registry)
+        self.assertEqual(sampler.sample(schema)["address"]["a/b"], 1)
+        self.assertEqual(sampler.spawn().sample(schema)["address"]["a/b"], 1)
+
+    def test_invalid_registration(self):
+        with pytest.raises(ValueError):
+            self.registry.register(lambda rng: 1)
+        with pytest.raises(ValueError):
+            self.registry.register(lambda rng: 1, type="string", format="email")
+        with pytest.raises(TypeError):
+            self.registry.register("x", type="string")
+
+
+class TestBuiltinFormats(unittest.TestCase):
+    def test_formats(self):
+        rng = random.Random(3)
+        checks = {
+            "email": lambda value: value.count("@") == 1,
+            "hostname": lambda value: "." in value,
+            "uri": lambda value: value.startswith("https://"),
+            "ipv4": ipaddress.IPv4Address,
+            "ipv6": ipaddress.IPv6Address,
+            "uuid": lambda value: uuid.UUID(value).version == 4,
+        }
+        for _format, check in checks.items():
+            format_schema = {"type": "string", "format": _format}
+            for value in freddy.compile(format_schema, rng=rng).sample_many(100) + [
+                freddy.jsonschema(format_schema, rng)
+            ]:
+                self.assertTrue(check(value))
+
+    def test_string_constraints_are_honoured(self):
+        for schema in (
+            {"type": "string", "format": "email", "pattern": r"^[a-z]+@example\.com$"},
+            {"type": "string", "format": "hostname", "maxLength": 4},
+            {"type": "string", "format": "uri", "minLength": 50, "maxLength": 60},
+        ):
+            values = freddy.compile(schema, rng=random.Random(1)).sample_many(50)
+            values += [freddy.jsonschema(schema, random.Random(i)) for i in range(50)]
+            for value in values:
+                jsonschema.validate(value, schema)
+
+    def test_default_registry(self):
+        try:
+            freddy.register_factory(lambda rng: "custom", format="custom")
+            format_schema = {"type": "string", "format": "custom"}
+            self.assertEqual(freddy.sample(format_schema), "custom")
+            self.assertEqual(freddy.jsonschema(format_schema), "custom")
+        finally:
+            registry.unregister(format="custom")
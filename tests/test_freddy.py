@@ -1,5 +1,6 @@
 import random
 import re
+import time
 import unittest
 from typing import List, Optional
 
@@ -45,6 +46,10 @@ class TestInteger(TestBasicType):
             self._makeOne({"type": "integer", "exclusiveMinimum": 9, "maximum": 10}), 10
         )
 
+    def test_multiple_of(self):
+        schema = {"type": "integer", "multipleOf": 5, "minimum": 12, "maximum": 18}
+        self.assertEqual(self._makeOne(schema), 15)
+
 
 class TestConst(TestBasicType):
     def test_returns_const(self):
@@ -118,6 +123,16 @@ class TestNumbers(TestBasicType):
         result = self._makeOne(schema)
         assert 9 < result <= 10
 
+    def test_exclusive_float_bounds_are_not_rounded(self):
+        schema = {"type": "number", "exclusiveMinimum": 0.5, "exclusiveMaximum": 0.6}
+        for _ in range(100):
+            assert 0.5 < self._makeOne(schema) < 0.6
+
+    def test_multiple_of_within_bounds(self):
+        schema = {"type": "number", "multipleOf": 0.5, "minimum": 3, "maximum": 4}
+        for _ in range(50):
+            self.assertIn(self._makeOne(schema), (3, 3.5, 4))
+
 
 class TestEnum(TestBasicType):
     def test_string_enum(self):
@@ -145,6 +160,81 @@ class TestObject(TestBasicType):
         self.assertIn("bar", sample)
 
 
+class TestUniqueItems(TestBasicType):
+    def test_json_equality(self):
+        # true and 1 are different json values
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 4,
+            "items": {"enum": [1, True, [1], {"a": 1}]},
+        }
+        self.assertEqual(len(self._makeOne(schema)), 4)
+
+    def test_whole_value_space(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 4,
+            "items": {
+                "type": "object",
+                "required": ["a"],
+                "properties": {"a": {"type": "boolean"}, "b": {"type": "null"}},
+            },
+        }
+        self.assertEqual(len(self._makeOne(schema)), 4)
+
+    def test_max_items_limited_by_value_space(self):
+        schema = {"type": "array", "uniqueItems": True, "items": {"enum": ["a", "b"]}}
+        for _ in range(20):
+            self.assertLessEqual(len(self._makeOne(schema)), 2)
+
+    def test_large_arrays(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 5000,
+            "items": {"type": "integer", "minimum": 0, "maximum": 5000},
+        }
+        self.assertGreaterEqual(len(self._makeOne(schema)), 5000)
+
+    def test_impossible(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 3,
+            "items": {"type": "boolean"},
+        }
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.jsonschema(schema)
+
+    def test_value_space(self):
+        space = freddy.freddy.value_space
+        self.assertEqual(len(space({"type": "integer", "maximum": 10**12})), 10**12 + 1)
+        self.assertEqual(
+            space({"type": "string", "maxLength": 2, "x-freddy-alphabet": "ab"}),
+            ["", "a", "b", "aa", "ab", "ba", "bb"],
+        )
+        self.assertIsNone(space({"type": "string"}))
+        self.assertIsNone(space({"type": "number"}))
+        self.assertEqual(space({"anyOf": [{"const": 1}, {"enum": [1, 2]}]}), [1, 2])
+
+    def test_long_strings(self):
+        # Strings are not counted past the limit of the value space
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "maxItems": 3,
+            "items": {"type": "string", "minLength": 1, "maxLength": 10**6},
+        }
+        start = time.perf_counter()
+        self.assertIsNone(freddy.freddy.value_space(schema["items"]))
+        freddy.compile(schema)
+        self.assertLess(time.perf_counter() - start, 1)
+        schema["items"]["x-freddy-alphabet"] = "a"
+        self.assertIsNone(freddy.freddy.value_space(schema["items"]))
+
+
 person_schema = {
     "type": "object",
     "required": ["name", "surname", "age", "has_children"],
@@ -203,6 +293,16 @@ class TestReferences(TestBasicType):
             self.assertIsInstance(person["age"], int)
             self.assertIsInstance(person["has_children"], bool)
 
+    def test_definitions_are_not_copied(self):
+        marker = object()
+        schema = {
+            "definitions": {"marker": {"const": marker}},
+            "type": "array",
+            "minItems": 1,
+            "items": {"$ref": "#/definitions/marker"},
+        }
+        self.assertIs(freddy.jsonschema(schema)[0], marker)
+
 
 class Person(pydantic.BaseModel):
     name: str
@@ -272,6 +372,9 @@ class Test_validate_schema(unittest.TestCase):
                 self.makeOne({jsonschema_key: "foobar"})
             self.assertEqual(ex.value.reason, f"{jsonschema_key} key is not supported")
 
+    def test_multiple_of_supported(self):
+        self.makeOne({"type": "integer", "multipleOf": 3})
+
     def test_multiple_types_not_supported(self):
         with pytest.raises(freddy.UnsupportedSchema) as ex:
             self.makeOne({"type": ["string", "number"]})
@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import freddy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_heavy_modules_are_not_imported(self):
+        modules = [
+            "asyncio",
+            "multiprocessing",
+            "rstr",
+            "numpy",
+            "pydantic",
+            "csv",
+            "uuid",
+            "fractions",
+            "json",
+            "datetime",
+            "freddy.compiler",
+            "freddy.sampler",
+        ]
+        script = f"import sys, freddy; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        self.assertEqual(output.decode().split(), [])
+
+    def test_lazy_modules(self):
+        self.assertIs(freddy.aio, sys.modules["freddy.aio"])
+        self.assertIs(freddy.parallel, sys.modules["freddy.parallel"])
+        self.assertIn("columnar", dir(freddy))
+        self.assertIs(freddy.Sampler, sys.modules["freddy.sampler"].Sampler)
+        self.assertIs(freddy.compile, sys.modules["freddy.compiler"].compile)
+        self.assertIs(freddy.CHUNK_SIZE, sys.modules["freddy.stream"].CHUNK_SIZE)
+        self.assertIn("Pools", dir(freddy))
+        with self.assertRaises(AttributeError):
+            freddy.nothing
+
+    def test_rstr_fallback(self):
+        # Patterns without a generation plan, like conditional groups, are
+        # left to rstr, which is only imported when they are generated
+        script = (
+            "import random, sys\n"
+            "from freddy.patterns import PatternGenerator, compile_pattern\n"
+            "plan = compile_pattern(r'^(a)?(?(1)b|c)$')\n"
+            "print(type(plan) is PatternGenerator, 'rstr' in sys.modules)\n"
+            "sample = PatternGenerator(r'^(ab){2}$').generate(random.Random(1))\n"
+            "print(sample, 'rstr' in sys.modules)\n"
+        )
+        env = dict(os.environ, PYTHONPATH=ROOT)
+        output = subprocess.check_output([sys.executable, "-c", script], env=env)
+        self.assertEqual(output.decode().split(), ["True", "False", "abab", "True"])
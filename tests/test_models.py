@@ -0,0 +1,203 @@
+import datetime
+import decimal
+import enum
+import random
+import unittest
+import uuid
+from typing import Any, Dict, FrozenSet, List, Literal, Optional, Set, Tuple, Union
+
+import pydantic
+import pytest
+from pydantic import (
+    AnyHttpUrl,
+    AnyUrl,
+    Field,
+    HttpUrl,
+    NegativeFloat,
+    PositiveInt,
+    StrictStr,
+    conbytes,
+    condecimal,
+    confloat,
+    conint,
+    conlist,
+    conset,
+    constr,
+)
+
+import freddy
+from freddy.models import compile_model
+
+
+class Color(enum.Enum):
+    red = "red"
+    blue = "blue"
+
+
+Code = constr(regex=r"^[A-Z]{3}\d{2}$")
+
+
+class Address(pydantic.BaseModel):
+    street: constr(min_length=3, max_length=12)
+    number: conint(ge=1, lt=500)
+
+
+class User(pydantic.BaseModel):
+    id: uuid.UUID
+    name: str
+    age: int = Field(..., ge=18, le=99)
+    score: float
+    balance: decimal.Decimal
+    active: bool
+    color: Color
+    kind: Literal["admin", "guest"]
+    born: datetime.date
+    created: datetime.datetime
+    wakes_up: datetime.time
+    code: Code
+    address: Address
+    previous: List[Address]
+    tags: Set[str]
+    frozen: FrozenSet[int]
+    scores: conlist(int, min_items=2, max_items=4)
+    point: Tuple[int, str]
+    history: Tuple[float, ...]
+    extra: Dict[str, int]
+    either: Union[int, str]
+    nickname: Optional[str] = None
+    anything: Any = None
+    manager: Optional["User"] = None
+
+
+User.update_forward_refs()
+
+
+class TestCompileModel(unittest.TestCase):
+    def test_instances_are_valid(self):
+        compiled = compile_model(User)
+        samples = compiled.sample_many(50) + [compiled.sample() for _ in range(50)]
+        for sample in samples:
+            self.assertIsInstance(sample, User)
+            User.validate(sample.dict())
+
+    def test_native_values(self):
+        for sample in compile_model(User, construct=False).sample_many(20):
+            self.assertIsInstance(sample, dict)
+            self.assertIsInstance(sample["id"], uuid.UUID)
+            self.assertIsInstance(sample["balance"], decimal.Decimal)
+            self.assertIsInstance(sample["color"], Color)
+            self.assertIsInstance(sample["born"], datetime.date)
+            self.assertIsInstance(sample["created"], datetime.datetime)
+            self.assertIsInstance(sample["wakes_up"], datetime.time)
+            self.assertIsInstance(sample["address"], dict)
+            self.assertIsInstance(sample["tags"], set)
+            self.assertIsInstance(sample["frozen"], frozenset)
+            self.assertIsInstance(sample["point"], tuple)
+            self.assertIsInstance(sample["history"], tuple)
+            self.assertTrue(18 <= sample["age"] <= 99)
+            self.assertTrue(2 <= len(sample["scores"]) <= 4)
+
+    def test_reproducible(self):
+        first = compile_model(User, rng=random.Random(1)).sample_many(5)
+        second = compile_model(User, rng=random.Random(1)).sample_many(5)
+        self.assertEqual(first, second)
+
+    def test_multiple_of(self):
+        class Order(pydantic.BaseModel):
+            quantity: conint(multiple_of=5, gt=0, le=50)
+            price: condecimal(multiple_of=decimal.Decimal("0.01"), ge=1, lt=2)
+
+        for sample in compile_model(Order, rng=random.Random(1)).sample_many(50):
+            Order.validate(sample.dict())
+
+    def test_sets_of_few_values(self):
+        class Flags(pydantic.BaseModel):
+            flags: Set[bool]
+            colors: FrozenSet[Color]
+            kinds: Set[Optional[Literal["a", "b"]]]
+
+        for sample in compile_model(Flags, rng=random.Random(1)).sample_many(50):
+            self.assertLessEqual(sample.flags, {True, False})
+            self.assertLessEqual(sample.colors, set(Color))
+            self.assertLessEqual(sample.kinds, {"a", "b", None})
+        self.assertIsInstance(freddy.sample_model(Flags), Flags)
+
+    def test_round_trip(self):
+        class Everything(pydantic.BaseModel):
+            user: User
+            strict: StrictStr
+            positive: PositiveInt
+            negative: NegativeFloat
+            ratio: confloat(ge=0, le=1)
+            raw: bytes
+            short: conbytes(min_length=1, max_length=3)
+            price: condecimal(max_digits=5, decimal_places=2)
+            whole: condecimal(max_digits=3)
+            delta: condecimal(decimal_places=1, gt=-3, lt=3)
+            codes: conset(Code, min_items=1, max_items=3)
+            homepage: HttpUrl
+            link: AnyUrl
+            api: Optional[AnyHttpUrl]
+
+        compiled = compile_model(Everything, rng=random.Random(1))
+        for sample in compiled.sample_many(100):
+            Everything(**sample.dict())
+            self.assertLessEqual(abs(sample.whole), 999)
+
+    def test_emails(self):
+        pytest.importorskip("email_validator")
+
+        class Contact(pydantic.BaseModel):
+            email: pydantic.EmailStr
+
+        for sample in compile_model(Contact, rng=random.Random(1)).sample_many(20):
+            Contact(**sample.dict())
+
+    def test_unsupported_strings(self):
+        for _type in (
+            pydantic.PostgresDsn,
+            pydantic.FileUrl,
+            pydantic.PaymentCardNumber,
+        ):
+            model = pydantic.create_model("Model", value=(_type, ...))
+            with pytest.raises(freddy.UnsupportedType):
+                compile_model(model)
+        # Without a factory for the format
+        with pytest.raises(freddy.UnsupportedType):
+            compile_model(
+                pydantic.create_model("Site", url=(HttpUrl, ...)),
+                factories=freddy.Registry(),
+            )
+
+    def test_unsupported_type(self):
+        class Custom:
+            pass
+
+        class Model(pydantic.BaseModel):
+            custom: Custom
+
+            class Config:
+                arbitrary_types_allowed = True
+
+        with pytest.raises(freddy.UnsupportedType):
+            compile_model(Model)
+
+
+class TestSampleModel(unittest.TestCase):
+    def test_sample_model(self):
+        self.assertIsInstance(freddy.sample_model(User), User)
+        self.assertIsInstance(freddy.sample_model(User, construct=False), dict)
+        self.assertEqual(len(freddy.sample_models(User, 10)), 10)
+
+    def test_seed(self):
+        self.assertEqual(
+            freddy.sample_models(User, 3, seed=2), freddy.sample_models(User, 3, seed=2)
+        )
+
+    def test_compiled_once(self):
+        sampler = freddy.Sampler(seed=3)
+        compiled = sampler.compile_model(User)
+        self.assertIs(sampler.compile_model(User), compiled)
+        self.assertIsNot(sampler.compile_model(User, construct=False), compiled)
+        sampler.clear_cache(User)
+        self.assertIsNot(sampler.compile_model(User), compiled)
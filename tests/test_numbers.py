@@ -0,0 +1,133 @@
+import random
+import unittest
+from fractions import Fraction
+
+import jsonschema
+import pytest
+
+import freddy
+from freddy.numbers import integer_range, multiples, number_range
+
+
+def is_multiple(value, multiple) -> bool:
+    # Exact decimal check, as float checks fail for multiples of 0.1
+    return Fraction(repr(value)) % Fraction(repr(multiple)) == 0
+
+
+def samples(schema, n=200):
+    compiled = freddy.compile(schema, rng=random.Random(1))
+    values = compiled.sample_many(n) + [compiled.sample() for _ in range(n)]
+    values += [freddy.jsonschema(schema, random.Random(i)) for i in range(n)]
+    return values
+
+
+class TestRanges(unittest.TestCase):
+    def test_integer_range(self):
+        self.assertEqual(integer_range({}), (0, 1000))
+        self.assertEqual(integer_range({"minimum": 1.5, "maximum": 4.5}), (2, 4))
+        schema = {"exclusiveMinimum": 1, "exclusiveMaximum": 4.5}
+        self.assertEqual(integer_range(schema), (2, 4))
+
+    def test_draft4_exclusive_flags(self):
+        schema = {"minimum": 1, "exclusiveMinimum": True, "maximum": 4}
+        self.assertEqual(integer_range(schema), (2, 4))
+        schema["exclusiveMinimum"] = False
+        self.assertEqual(integer_range(schema), (1, 4))
+
+    def test_number_range(self):
+        minimum, maximum = number_range({"exclusiveMinimum": 0.5, "maximum": 0.6})
+        self.assertGreater(minimum, 0.5)
+        self.assertLess(minimum, 0.5 + 1e-15)
+        self.assertEqual(maximum, 0.6)
+        minimum, maximum = number_range({"exclusiveMaximum": 0})
+        self.assertEqual(minimum, -1000)
+        self.assertLess(maximum, 0)
+
+    def test_one_bound(self):
+        self.assertEqual(integer_range({"maximum": -5}), (-1005, -5))
+        self.assertEqual(integer_range({"exclusiveMinimum": 5000}), (5001, 6001))
+        self.assertEqual(integer_range({"maximum": 10}), (0, 10))
+        self.assertEqual(integer_range({"minimum": -5}), (-5, 1000))
+        self.assertEqual(number_range({"minimum": -2.5}), (-2.5, 1000.0))
+        self.assertEqual(number_range({"maximum": -0.5}), (-1000.5, -0.5))
+        for schema in (
+            {"type": "integer", "maximum": -5},
+            {"type": "integer", "minimum": 5000},
+            {"type": "number", "exclusiveMaximum": -1e6},
+            {"type": "number", "minimum": 1e6},
+        ):
+            for value in samples(schema):
+                jsonschema.validate(value, schema)
+
+
+class TestMultiples(unittest.TestCase):
+    def test_integers(self):
+        schema = {"type": "integer", "multipleOf": 7, "minimum": 10, "maximum": 50}
+        values = samples(schema)
+        self.assertEqual(set(values), {14, 21, 28, 35, 42, 49})
+        for value in values:
+            self.assertIsInstance(value, int)
+
+    def test_integer_multiples_of_fractions(self):
+        schema = {"type": "integer", "multipleOf": 1.5, "exclusiveMaximum": 9}
+        self.assertEqual(max(samples(schema)), 6)
+        for value in samples(schema):
+            self.assertEqual(value % 3, 0)
+
+    def test_decimal_multiples(self):
+        schema = {
+            "type": "number",
+            "multipleOf": 0.1,
+            "exclusiveMinimum": 0.3,
+            "maximum": 0.6,
+        }
+        self.assertEqual(set(samples(schema)), {0.4, 0.5, 0.6})
+
+    def test_bounds(self):
+        for schema in (
+            {"type": "number", "multipleOf": 0.01},
+            {"type": "number", "multipleOf": 0.25, "maximum": -3},
+            {"type": "number", "multipleOf": 3, "minimum": 5000},
+            {"type": "integer", "multipleOf": 5, "exclusiveMinimum": -20},
+            {"type": "number", "multipleOf": 2.5, "minimum": 1, "exclusiveMaximum": 10},
+        ):
+            for value in samples(schema):
+                self.assertTrue(is_multiple(value, schema["multipleOf"]), value)
+                bounds = {k: v for k, v in schema.items() if k != "multipleOf"}
+                jsonschema.validate(value, bounds)
+
+    def test_missing_bounds_hold_multiples(self):
+        lattice = multiples({"type": "number", "multipleOf": 50, "minimum": 900}, False)
+        self.assertEqual(lattice.count, 100 + 1)
+        lattice = multiples({"type": "number", "multipleOf": 0.5}, False)
+        self.assertEqual((lattice.first, lattice.count), (0, 2001))
+
+    def test_sparse_range(self):
+        # One multiple in a range of a billion: drawn, not searched for
+        schema = {
+            "type": "integer",
+            "multipleOf": 999_999_937,
+            "minimum": 10**9,
+            "maximum": 2 * 10**9,
+        }
+        self.assertEqual(set(samples(schema, 10)), {1_999_999_874})
+
+    def test_wide_range(self):
+        schema = {"type": "integer", "multipleOf": 3, "maximum": 10**15}
+        for value in samples(schema, 20):
+            self.assertEqual(value % 3, 0)
+            self.assertLessEqual(value, 10**15)
+
+    def test_value_space(self):
+        schema = {"type": "integer", "multipleOf": 6, "minimum": 1, "maximum": 30}
+        self.assertEqual(freddy.freddy.value_space(schema), range(6, 31, 6))
+        schema = {"type": "array", "items": schema, "uniqueItems": True, "minItems": 5}
+        self.assertEqual(sorted(freddy.jsonschema(schema)), [6, 12, 18, 24, 30])
+
+    def test_no_multiples(self):
+        schema = {"type": "integer", "multipleOf": 7, "minimum": 1, "maximum": 6}
+        with pytest.raises(freddy.InvalidSchema) as ex:
+            freddy.compile(schema)
+        self.assertIn("no multiple", ex.value.reason)
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.compile({"type": "number", "multipleOf": 0})
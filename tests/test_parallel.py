@@ -0,0 +1,97 @@
+import unittest
+
+import jsonschema
+import pytest
+
+import freddy
+from freddy import parallel
+
+schema = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string", "minLength": 1},
+        "tags": {"type": "array", "items": {"enum": ["a", "b"]}},
+    },
+}
+
+
+def thousand(rng):
+    return 1000 + rng.randint(0, 9)
+
+
+class TestParallel(unittest.TestCase):
+    def test_samples_are_valid(self):
+        samples = freddy.sample_many(schema, 250, workers=2, seed=1)
+        self.assertEqual(len(samples), 250)
+        for sample in samples:
+            jsonschema.validate(sample, schema)
+
+    def test_reproducible(self):
+        one = freddy.sample_many(schema, 2500, workers=2, seed=1)
+        other = freddy.sample_many(schema, 2500, workers=2, seed=1)
+        self.assertEqual(one, other)
+
+    def test_same_samples_with_any_number_of_workers(self):
+        one = freddy.sample_many(schema, 2500, workers=1, seed=1)
+        other = freddy.sample_many(schema, 2500, workers=3, seed=1)
+        self.assertEqual(one, other)
+
+    def test_different_seeds(self):
+        one = freddy.sample_many(schema, 100, workers=2, seed=1)
+        other = freddy.sample_many(schema, 100, workers=2, seed=2)
+        self.assertNotEqual(one, other)
+
+    def test_iter_samples_streams(self):
+        samples = freddy.iter_samples(schema, workers=2, seed=1, chunk_size=10)
+        for _ in range(35):
+            jsonschema.validate(next(samples), schema)
+        samples.close()
+
+    def test_invalid_schema_fails_early(self):
+        with pytest.raises(freddy.UnsupportedType):
+            freddy.iter_samples({"type": "foobar"}, 10, workers=2)
+
+    def test_sampler_options(self):
+        string = {"type": "array", "items": {"type": "string", "minLength": 1}}
+        sampler = freddy.Sampler(1, alphabet="01", pools=freddy.Pools(10))
+        for sample in sampler.sample_many(string, 20, workers=2):
+            for item in sample:
+                self.assertLessEqual(set(item), {"0", "1"})
+
+        factories = freddy.Registry()
+        factories.register(thousand, path="/properties/id")
+        sampler = freddy.Sampler(1, factories=factories)
+        for sample in sampler.sample_many(schema, 20, workers=2):
+            self.assertGreaterEqual(sample["id"], 1000)
+
+        nested = {
+            "$ref": "#/definitions/Node",
+            "definitions": {
+                "Node": {
+                    "type": "object",
+                    "properties": {"a": {"$ref": "#/definitions/Node"}},
+                }
+            },
+        }
+        sampler = freddy.Sampler(1, max_depth=3)
+        for sample in sampler.sample_many(nested, 20, workers=2):
+            depth = 0
+            while "a" in sample:
+                sample, depth = sample["a"], depth + 1
+            self.assertLessEqual(depth, 3)
+
+    def test_unsupported_options(self):
+        factories = freddy.Registry()
+        factories.register(lambda rng: 1, path="/properties/id")
+        with pytest.raises(ValueError):
+            freddy.Sampler(factories=factories).sample_many(schema, 2, workers=2)
+        sampler = freddy.Sampler(profiler=freddy.Profiler())
+        with pytest.raises(ValueError):
+            sampler.sample_many(schema, 2, workers=2)
+
+    def test_chunk_seeds_differ(self):
+        seeds = {parallel.chunk_seed(1, index) for index in range(100)}
+        self.assertEqual(len(seeds), 100)
+        self.assertEqual(parallel.chunk_seed(1, 5), parallel.chunk_seed(1, 5))
@@ -0,0 +1,78 @@
+import random
+import re
+import unittest
+
+import pytest
+
+import freddy
+from freddy.patterns import (
+    PatternGenerator,
+    SimplePatternGenerator,
+    TreePatternGenerator,
+    compile_pattern,
+)
+
+PATTERNS = [
+    r"^[A-Z]{2}-\d{3,5}$",
+    r"^[a-f0-9]{8}-[a-f0-9]{4}$",
+    r"ab(cd)e\.f",
+    r"^[^a-c\d]{2,5}$",
+    r"\s\S\W\D\w",
+    r"^x*?y+z?$",
+    r"^(\w{1,5})-\1$",
+    r"^(foo|bar|baz)+$",
+    r"^a(?=b)",
+    r"^(?!x)y$",
+    r"^(\d{3}\.){2}\d{3}$",
+]
+
+
+class TestCompilePattern(unittest.TestCase):
+    def test_generated_strings_match(self):
+        rng = random.Random(1)
+        for pattern in PATTERNS:
+            generator = compile_pattern(pattern)
+            for _ in range(100):
+                self.assertIsNotNone(re.search(pattern, generator.generate(rng)))
+
+    def test_simple_patterns(self):
+        for pattern in PATTERNS[:6]:
+            self.assertIsInstance(compile_pattern(pattern), SimplePatternGenerator)
+
+    def test_tree_patterns(self):
+        for pattern in PATTERNS[6:]:
+            self.assertIsInstance(compile_pattern(pattern), TreePatternGenerator)
+
+    def test_literals_are_merged(self):
+        generator = compile_pattern(r"^ab(cd)e\.f$")
+        self.assertEqual(generator.pieces, (("abcde.f", None, 0, 0),))
+
+    def test_cached(self):
+        self.assertIs(compile_pattern(r"^[a-z]+$"), compile_pattern(r"^[a-z]+$"))
+
+    def test_unsupported_features_fall_back_to_rstr(self):
+        generator = compile_pattern(r"^(a)?(?(1)b|c)$")
+        self.assertIs(type(generator), PatternGenerator)
+
+    def test_reproducible(self):
+        for pattern in PATTERNS:
+            generator = compile_pattern(pattern)
+            self.assertEqual(
+                generator.generate(random.Random(3)),
+                generator.generate(random.Random(3)),
+            )
+
+    def test_invalid_pattern(self):
+        with pytest.raises(re.error):
+            compile_pattern(r"^[a-z$")
+
+
+class TestPatternSchemas(unittest.TestCase):
+    def test_compiled(self):
+        schema = {"type": "string", "pattern": PATTERNS[0]}
+        for sample in freddy.sample_many(schema, 20):
+            self.assertIsNotNone(re.search(PATTERNS[0], sample))
+
+    def test_invalid_pattern(self):
+        with pytest.raises(freddy.InvalidSchema):
+            freddy.compile({"type": "string", "pattern": r"^[a-z$"})
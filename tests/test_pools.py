@@ -0,0 +1,83 @@
+import io
+import json
+import random
+import time
+import unittest
+
+import pytest
+
+import freddy
+from freddy.pools import Pools
+
+schema = {
+    "type": "object",
+    "required": ["code", "born", "name"],
+    "properties": {
+        "code": {"type": "string", "pattern": r"^[A-Z]{3}-\d{4}$"},
+        "born": {"type": "string", "format": "date"},
+        "name": {"type": "string"},
+    },
+}
+
+
+class TestPools(unittest.TestCase):
+    def test_values_come_from_pools(self):
+        pools = Pools(size=5)
+        compiled = freddy.compile(schema, rng=random.Random(1), pools=pools)
+        samples = compiled.sample_many(200) + [compiled.sample() for _ in range(200)]
+        self.assertLessEqual(len({s["code"] for s in samples}), 5)
+        self.assertLessEqual(len({s["born"] for s in samples}), 5)
+        self.assertGreater(len({s["name"] for s in samples}), 5)
+        self.assertEqual(len(pools), 2)
+
+    def test_shared_by_compiled_schemas(self):
+        pools = Pools(size=3)
+        first = freddy.compile(schema, rng=random.Random(2), pools=pools)
+        second = freddy.compile(schema, rng=random.Random(3), pools=pools)
+        codes = {s["code"] for s in first.sample_many(50) + second.sample_many(50)}
+        self.assertLessEqual(len(codes), 3)
+
+    def test_fills(self):
+        for fill in ("lazy", "eager", "background"):
+            pools = Pools(size=10, fill=fill)
+            compiled = freddy.compile(schema, rng=random.Random(4), pools=pools)
+            if fill == "eager":
+                self.assertTrue(all(p.values for p in pools._pools.values()))
+            if fill == "background":
+                deadline = time.monotonic() + 5
+                while not all(p.values for p in pools._pools.values()):
+                    self.assertLess(time.monotonic(), deadline)
+                    time.sleep(0.01)
+            self.assertLessEqual(
+                len({s["code"] for s in compiled.sample_many(100)}), 10
+            )
+
+    def test_reproducible(self):
+        def samples():
+            sampler = freddy.Sampler(seed=5, pools=Pools(size=20))
+            return [sampler.sample(schema) for _ in range(20)]
+
+        self.assertEqual(samples(), samples())
+
+    def test_dump(self):
+        stream = io.BytesIO()
+        sampler = freddy.Sampler(seed=6, pools=Pools(size=4))
+        sampler.dump(schema, stream, 100)
+        samples = [json.loads(line) for line in stream.getvalue().split()]
+        self.assertEqual(len(samples), 100)
+        self.assertLessEqual(len({s["code"] for s in samples}), 4)
+
+    def test_set_pools(self):
+        try:
+            freddy.set_pools(Pools(size=2))
+            codes = {freddy.sample(schema)["code"] for _ in range(50)}
+            self.assertLessEqual(len(codes), 2)
+        finally:
+            freddy.set_pools(None)
+        self.assertGreater(len({freddy.sample(schema)["code"] for _ in range(50)}), 2)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            Pools(size=0)
+        with pytest.raises(ValueError):
+            Pools(fill="never")
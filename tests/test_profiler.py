@@ -0,0 +1,87 @@
+import io
+import json
+import random
+import unittest
+from typing import List
+
+import pydantic
+
+import freddy
+from freddy.compiler import ProfiledNode
+
+schema = {
+    "type": "object",
+    "required": ["name", "friends"],
+    "properties": {
+        "name": {"type": "string", "pattern": r"^[A-Z][a-z]{3,8}$"},
+        "friends": {"type": "array", "items": {"$ref": "#/definitions/Friend"}},
+    },
+    "definitions": {
+        "Friend": {
+            "type": "object",
+            "required": ["id"],
+            "properties": {"id": {"type": "integer"}},
+        }
+    },
+}
+
+
+class Pet(pydantic.BaseModel):
+    name: str
+
+
+class Owner(pydantic.BaseModel):
+    pets: List[Pet]
+
+
+class TestProfiler(unittest.TestCase):
+    def test_stats(self):
+        profiler = freddy.Profiler()
+        compiled = freddy.compile(schema, rng=random.Random(1), profiler=profiler)
+        samples = compiled.sample_many(50) + [compiled.sample() for _ in range(50)]
+        stats = profiler.stats
+        self.assertEqual(stats["#"].count, 100)
+        self.assertEqual(stats["#/properties/name"].count, 100)
+        friends = sum(len(sample["friends"]) for sample in samples)
+        self.assertEqual(stats["#/properties/friends/items"].count, friends)
+        self.assertEqual(stats["#/definitions/Friend"].count, friends)
+        root = stats["#"]
+        self.assertEqual(
+            root.bytes, sum(len(json.dumps(s, separators=(",", ":"))) for s in samples)
+        )
+        self.assertLessEqual(root.own, root.total)
+        self.assertAlmostEqual(
+            sum(s.own for s in stats.values()), root.total, delta=root.total * 0.01
+        )
+
+    def test_dump(self):
+        profiler = freddy.Profiler()
+        compiled = freddy.compile(schema, rng=random.Random(2), profiler=profiler)
+        stream = io.BytesIO()
+        compiled.dump(stream, 30)
+        self.assertEqual(profiler.stats["#"].count, 30)
+        self.assertEqual(profiler.stats["#"].bytes, len(stream.getvalue()) - 30)
+
+    def test_report_and_collapsed(self):
+        profiler = freddy.Profiler()
+        freddy.Sampler(seed=3, profiler=profiler).sample_many(schema, 20)
+        report = profiler.report(limit=3)
+        self.assertEqual(len(report.splitlines()), 4)
+        stream = io.StringIO()
+        profiler.write_collapsed(stream)
+        stacks = dict(line.rsplit(" ", 1) for line in stream.getvalue().splitlines())
+        self.assertIn(
+            "#;#/properties/friends;#/properties/friends/items;#/definitions/Friend;"
+            "#/definitions/Friend/properties/id",
+            stacks,
+        )
+
+    def test_models(self):
+        profiler = freddy.Profiler()
+        sampler = freddy.Sampler(seed=4, profiler=profiler)
+        sampler.sample_models(Owner, 10)
+        self.assertEqual(profiler.stats["#"].count, 10)
+        self.assertIn("#/definitions/Pet/properties/name", profiler.stats)
+
+    def test_off_by_default(self):
+        self.assertNotIsInstance(freddy.compile(schema).root, ProfiledNode)
@@ -0,0 +1,207 @@
+import gc
+import random
+import threading
+import unittest
+import weakref
+
+import jsonschema
+import pydantic
+import pytest
+
+import freddy
+from freddy.sampler import SCHEMA_CACHE_SIZE
+
+schema = {
+    "type": "object",
+    "required": ["id", "name", "tags", "kind"],
+    "properties": {
+        "id": {"type": "integer"},
+        "big": {"type": "integer", "minimum": -(2**40), "maximum": 2**40},
+        "name": {"type": "string", "minLength": 1},
+        "score": {"type": "number"},
+        "active": {"type": "boolean"},
+        "kind": {"oneOf": [{"enum": ["a", "b"]}, {"type": "null"}]},
+        "code": {"type": "string", "pattern": "^[A-Z]{2}-[0-9]{3}$"},
+        "created": {"type": "string", "format": "date-time"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
+
+class TestSampler(unittest.TestCase):
+    def test_samples_are_valid(self):
+        sampler = freddy.Sampler(seed=1)
+        for _ in range(20):
+            jsonschema.validate(sampler.sample(schema), schema)
+        for sample in sampler.sample_many(schema, 20):
+            jsonschema.validate(sample, schema)
+
+    def test_same_seed_same_samples(self):
+        one, other = freddy.Sampler(seed=1), freddy.Sampler(seed=1)
+        self.assertEqual(
+            [one.sample(schema) for _ in range(10)],
+            [other.sample(schema) for _ in range(10)],
+        )
+        self.assertEqual(one.sample_many(schema, 50), other.sample_many(schema, 50))
+        self.assertEqual(
+            list(one.iter_samples(schema, 50, chunk_size=7)),
+            list(other.iter_samples(schema, 50, chunk_size=7)),
+        )
+
+    def test_different_seeds(self):
+        self.assertNotEqual(
+            freddy.Sampler(seed=1).sample_many(schema, 10),
+            freddy.Sampler(seed=2).sample_many(schema, 10),
+        )
+
+    def test_global_random_state_is_untouched(self):
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        freddy.Sampler(seed=1).sample_many(schema, 10)
+        self.assertEqual(random.random(), expected)
+
+    def test_custom_rng(self):
+        rng = random.Random(3)
+        sample = freddy.Sampler(rng=rng).sample(schema)
+        self.assertEqual(sample, freddy.Sampler(rng=random.Random(3)).sample(schema))
+
+    def test_spawn(self):
+        parent = freddy.Sampler(seed=1)
+        child, other_child = parent.spawn(), parent.spawn()
+        self.assertNotEqual(
+            child.sample_many(schema, 10), other_child.sample_many(schema, 10)
+        )
+        self.assertEqual(
+            freddy.Sampler(seed=1).spawn().sample_many(schema, 10),
+            freddy.Sampler(seed=1).spawn().sample_many(schema, 10),
+        )
+
+    def test_threads_with_spawned_samplers(self):
+        def run(sampler, results, index):
+            results[index] = sampler.sample_many(schema, 200)
+
+        def run_all():
+            parent = freddy.Sampler(seed=1)
+            samplers = [parent.spawn() for _ in range(4)]
+            results = [None] * 4
+            threads = [
+                threading.Thread(target=run, args=(sampler, results, i))
+                for i, sampler in enumerate(samplers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return results
+
+        self.assertEqual(run_all(), run_all())
+
+    def test_workers(self):
+        self.assertEqual(
+            freddy.Sampler(seed=1).sample_many(schema, 30, workers=2),
+            freddy.Sampler(seed=1).sample_many(schema, 30, workers=2),
+        )
+
+    def test_module_functions_seed(self):
+        self.assertEqual(freddy.sample(schema, seed=1), freddy.sample(schema, seed=1))
+        self.assertEqual(
+            freddy.sample_many(schema, 10, seed=1),
+            freddy.sample_many(schema, 10, seed=1),
+        )
+
+    def test_legacy_generation(self):
+        self.assertEqual(
+            freddy.jsonschema(schema, rng=random.Random(1)),
+            freddy.jsonschema(schema, rng=random.Random(1)),
+        )
+
+
+class TestModelCache(unittest.TestCase):
+    def make_model(self):
+        return pydantic.create_model("Dynamic", id=(int, ...), name=(str, ...))
+
+    def test_model_compiled_once(self):
+        model = self.make_model()
+        sampler = freddy.Sampler(seed=1)
+        compiled = sampler.compile(model)
+        self.assertIs(sampler.compile(model), compiled)
+        self.assertIs(freddy.freddy._get_schema(model), compiled.schema)
+        self.assertEqual(set(sampler.sample(model)), {"id", "name"})
+
+    def test_schema_compiled_once(self):
+        sampler = freddy.Sampler(seed=1)
+        schema = {"type": "object", "properties": {"a": {"type": "integer"}}}
+        compiled = sampler.compile(schema)
+        self.assertIs(sampler.compile(dict(schema)), compiled)
+        schema["required"] = ["a"]
+        self.assertIsNot(sampler.compile(schema), compiled)
+        self.assertEqual(set(sampler.sample(schema)), {"a"})
+        for maximum in range(SCHEMA_CACHE_SIZE + 1):
+            sampler.compile({"type": "integer", "maximum": maximum})
+        self.assertLessEqual(len(sampler._schemas), SCHEMA_CACHE_SIZE)
+        sampler.clear_cache()
+        self.assertEqual(len(sampler._schemas), 0)
+
+    def test_clear_cache(self):
+        model = self.make_model()
+        sampler = freddy.Sampler(seed=2)
+        compiled = sampler.compile(model)
+        sampler.clear_cache(model)
+        self.assertNotIn(model, freddy.freddy._model_schemas)
+        self.assertIsNot(sampler.compile(model), compiled)
+        freddy.sample(model)
+        freddy.clear_cache()
+        self.assertEqual(len(freddy._sampler._compiled), 0)
+
+    def test_models_are_not_kept_alive(self):
+        sampler = freddy.Sampler(seed=3)
+        model = self.make_model()
+        sampler.sample(model)
+        sampler.sample_model(model)
+        sampler.sample_model(model, construct=False)
+        freddy.pydantic(model)
+        reference = weakref.ref(model)
+        del model
+        gc.collect()
+        self.assertIsNone(reference())
+        self.assertEqual(len(sampler._compiled), 0)
+        self.assertEqual(len(sampler._models), 0)
+
+
+class TestNumpyRandom(unittest.TestCase):
+    def setUp(self):
+        pytest.importorskip("numpy")
+
+    def _makeOne(self, seed):
+        from freddy.rng import NumpyRandom
+
+        return freddy.Sampler(rng=NumpyRandom(seed))
+
+    def test_samples_are_valid(self):
+        sampler = self._makeOne(1)
+        jsonschema.validate(sampler.sample(schema), schema)
+        for sample in sampler.sample_many(schema, 50):
+            jsonschema.validate(sample, schema)
+
+    def test_reproducible(self):
+        self.assertEqual(
+            self._makeOne(1).sample_many(schema, 50),
+            self._makeOne(1).sample_many(schema, 50),
+        )
+
+    def test_spawn_keeps_rng_type(self):
+        from freddy.rng import NumpyRandom
+
+        self.assertIsInstance(self._makeOne(1).spawn().rng, NumpyRandom)
+
+    def test_state(self):
+        from freddy.rng import NumpyRandom
+
+        rng = NumpyRandom(1)
+        state = rng.getstate()
+        values = [rng.random() for _ in range(10)] + [rng.getrandbits(8)]
+        rng.setstate(state)
+        self.assertEqual(
+            values, [rng.random() for _ in range(10)] + [rng.getrandbits(8)]
+        )
@@ -0,0 +1,184 @@
+import json
+import unittest
+from typing import List
+
+import jsonschema
+import pydantic
+
+import freddy
+
+
+def size(value):
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+schema = {
+    "type": "object",
+    "required": ["id"],
+    "properties": {
+        "id": {"type": "integer"},
+        "name": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "score": {"type": "number"},
+        "kind": {"enum": ["a", "bb"]},
+        "events": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["at"],
+                "properties": {
+                    "at": {"type": "string", "format": "date-time"},
+                    "count": {"type": "integer", "minimum": 0},
+                },
+            },
+        },
+    },
+}
+
+tree_schema = {
+    "$ref": "#/definitions/Tree",
+    "definitions": {
+        "Tree": {
+            "type": "object",
+            "required": ["value"],
+            "properties": {
+                "value": {"type": "integer"},
+                "children": {"type": "array", "items": {"$ref": "#/definitions/Tree"}},
+            },
+        }
+    },
+}
+
+
+class TestTargetBytes(unittest.TestCase):
+    def assertSize(self, value, target, tolerance=0.02):
+        self.assertLessEqual(abs(size(value) - target), target * tolerance + 10)
+
+    def test_sizes(self):
+        sampler = freddy.Sampler(seed=1)
+        for target in (100, 1000, 10000, 1000000):
+            sample = sampler.sample(schema, target_bytes=target)
+            jsonschema.validate(sample, schema)
+            self.assertSize(sample, target)
+
+    def test_arrays(self):
+        for items in ({"type": "integer"}, {"type": "string", "maxLength": 3}, schema):
+            array_schema = {"type": "array", "items": items}
+            sample = freddy.sample(array_schema, seed=1, target_bytes=50000)
+            jsonschema.validate(sample, array_schema)
+            self.assertSize(sample, 50000)
+
+    def test_bounds_are_kept(self):
+        bounded = {
+            "type": "array",
+            "maxItems": 3,
+            "items": {"type": "string", "maxLength": 10},
+        }
+        sample = freddy.sample(bounded, seed=1, target_bytes=10000)
+        jsonschema.validate(sample, bounded)
+        self.assertEqual(len(sample), 3)
+        self.assertTrue(all(len(item) == 10 for item in sample))
+
+        fixed = {"type": "object", "properties": {"a": {"type": "boolean"}}}
+        self.assertEqual(freddy.sample(fixed, seed=1, target_bytes=10000).keys(), {"a"})
+
+    def test_small_targets(self):
+        sample = freddy.sample(schema, seed=1, target_bytes=0)
+        jsonschema.validate(sample, schema)
+        self.assertEqual(sample.keys(), {"id"})
+
+    def test_optional_properties(self):
+        optional = {
+            "type": "object",
+            "properties": {
+                key: {"type": "integer", "maximum": 9} for key in "abcdefghij"
+            },
+        }
+        # Only about four properties fit
+        sample = freddy.sample(optional, seed=1, target_bytes=25)
+        self.assertIn(len(sample), (3, 4))
+        self.assertSize(sample, 25, tolerance=0.2)
+
+    def test_branches(self):
+        branches = {
+            "oneOf": [
+                {"type": "boolean"},
+                {"type": "array", "items": {"type": "integer"}},
+            ]
+        }
+        self.assertIsInstance(freddy.sample(branches, seed=1, target_bytes=4), bool)
+        self.assertIsInstance(freddy.sample(branches, seed=1, target_bytes=1000), list)
+
+    def test_weighted_branches(self):
+        # Branches of the same size, which all fit the target
+        branches = {
+            "oneOf": [
+                {"const": "a", "x-freddy-weight": 0},
+                {"const": "b", "x-freddy-weight": 3},
+                {"const": "c"},
+            ]
+        }
+        samples = freddy.sample_many(branches, 200, seed=1, target_bytes=3)
+        self.assertNotIn("a", samples)
+        self.assertGreater(samples.count("b"), 120)
+
+    def test_unique_items(self):
+        unique = {
+            "type": "array",
+            "uniqueItems": True,
+            "items": {"type": "integer", "minimum": 0, "maximum": 1000},
+        }
+        sample = freddy.sample(unique, seed=1, target_bytes=100000)
+        jsonschema.validate(sample, unique)
+        self.assertEqual(len(sample), 1001)
+        unique["maxItems"] = 20
+        sample = freddy.sample(unique, seed=1, target_bytes=100000)
+        self.assertEqual(len(sample), 20)
+
+    def test_models(self):
+        class Item(pydantic.BaseModel):
+            name: str
+            tags: List[str] = []
+
+        sample = freddy.Sampler(seed=1).compile_model(Item).sample_sized(1000)
+        self.assertIsInstance(sample, Item)
+        self.assertSize(sample.dict(), 1000)
+
+    def test_recursive(self):
+        for target in (100, 100000):
+            sample = freddy.sample(tree_schema, seed=1, target_bytes=target)
+            jsonschema.validate(sample, tree_schema)
+            self.assertSize(sample, target)
+
+    def test_depth_is_bounded(self):
+        linked_list = {
+            "$ref": "#/definitions/Node",
+            "definitions": {
+                "Node": {
+                    "type": "object",
+                    "required": ["value"],
+                    "properties": {
+                        "value": {"type": "boolean"},
+                        "next": {"$ref": "#/definitions/Node"},
+                    },
+                }
+            },
+        }
+        compiled = freddy.compile(linked_list, max_depth=5)
+        sample = compiled.sample_sized(100000)
+        depth = 0
+        while "next" in sample:
+            sample, depth = sample["next"], depth + 1
+        self.assertLessEqual(depth, 5)
+
+    def test_same_seed_same_samples(self):
+        one = freddy.sample_many(schema, 5, seed=1, target_bytes=1000)
+        other = freddy.sample_many(schema, 5, seed=1, target_bytes=1000)
+        self.assertEqual(one, other)
+        self.assertEqual(len(one), 5)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            freddy.sample(schema, target_bytes=-1)
+        with self.assertRaises(ValueError):
+            freddy.sample_many(schema, 5, workers=2, target_bytes=1000)
@@ -0,0 +1,126 @@
+import io
+import json
+import random
+import unittest
+
+import pytest
+
+import freddy
+from freddy.stream import StreamWriter
+
+company_schema = {
+    "definitions": {
+        "person": {
+            "type": "object",
+            "required": ["name"],
+            "properties": {
+                "name": {"type": "string", "pattern": "^[A-Z][a-z]{2,8}$"},
+                "age": {"type": "integer", "minimum": 18, "maximum": 70},
+                "born": {"type": "string", "format": "date"},
+            },
+        }
+    },
+    "type": "object",
+    "required": ["name", "staff"],
+    "properties": {
+        "name": {"type": "string"},
+        "staff": {"type": "array", "items": {"$ref": "#/definitions/person"}},
+        "rating": {"anyOf": [{"type": "number"}, {"type": "null"}]},
+        "public": {"type": "boolean"},
+    },
+}
+
+tree_schema = {
+    "definitions": {
+        "node": {
+            "type": "object",
+            "required": ["value"],
+            "properties": {
+                "value": {"enum": [1, "two", None]},
+                "children": {
+                    "type": "array",
+                    "maxItems": 2,
+                    "items": {"$ref": "#/definitions/node"},
+                },
+            },
+        }
+    },
+    "$ref": "#/definitions/node",
+}
+
+
+class RecordingStream(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(len(data))
+        return super().write(data)
+
+
+def compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class TestDump(unittest.TestCase):
+    def test_ndjson_matches_samples(self):
+        for schema in (company_schema, tree_schema):
+            stream = io.BytesIO()
+            freddy.compile(schema, rng=random.Random(1)).dump(stream, 20)
+            compiled = freddy.compile(schema, rng=random.Random(1))
+            expected = "".join(compact(compiled.sample()) + "\n" for _ in range(20))
+            self.assertEqual(stream.getvalue().decode(), expected)
+
+    def test_json(self):
+        stream = io.BytesIO()
+        freddy.dump(company_schema, stream, 5, format="json", seed=2)
+        samples = json.loads(stream.getvalue())
+        compiled = freddy.Sampler(2).compile(company_schema)
+        self.assertEqual(samples, [compiled.sample() for _ in range(5)])
+
+    def test_empty_json(self):
+        stream = io.BytesIO()
+        freddy.dump({"type": "integer"}, stream, 0, format="json")
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+    def test_unique_items(self):
+        schema = {"type": "array", "items": {"type": "integer"}, "uniqueItems": True}
+        stream = io.BytesIO()
+        freddy.dump(schema, stream, 10, seed=3)
+        for line in stream.getvalue().splitlines():
+            items = json.loads(line)
+            self.assertEqual(len(items), len(set(items)))
+
+    def test_bounded_chunks(self):
+        schema = {"type": "array", "items": {"type": "string"}, "minItems": 100000}
+        stream = RecordingStream()
+        freddy.dump(schema, stream, 1, chunk_size=4096)
+        self.assertGreater(len(stream.chunks), 10)
+        self.assertLess(max(stream.chunks), 4096 + 100)
+        self.assertGreaterEqual(len(json.loads(stream.getvalue())), 100000)
+
+    def test_unicode(self):
+        schema = {"type": "string", "minLength": 3, "x-freddy-alphabet": 'é"\\'}
+        stream = io.BytesIO()
+        freddy.dump(schema, stream, 10)
+        for line in stream.getvalue().decode("utf-8").splitlines():
+            self.assertTrue(set(json.loads(line)) <= set('é"\\'))
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            freddy.dump({"type": "integer"}, io.BytesIO(), 1, format="xml")
+        with pytest.raises(ValueError):
+            freddy.dump({"type": "integer"}, io.BytesIO(), format="json")
+
+
+class TestStreamWriter(unittest.TestCase):
+    def test_flush(self):
+        stream = RecordingStream()
+        writer = StreamWriter(stream, chunk_size=10)
+        writer.write("abc")
+        writer.write("defghijk")
+        writer.write("l")
+        self.assertEqual(stream.chunks, [11])
+        writer.flush()
+        self.assertEqual(stream.getvalue(), b"abcdefghijkl")
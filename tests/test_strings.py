@@ -0,0 +1,67 @@
+import random
+import unittest
+from collections import Counter
+
+import freddy
+from freddy.strings import DEFAULT_ALPHABET, Alphabet, schema_alphabet
+
+
+class TestAlphabet(unittest.TestCase):
+    def test_length(self):
+        alphabet = Alphabet("abc")
+        rng = random.Random(1)
+        for length in (0, 1, 7, 1000):
+            result = alphabet.generate(rng, length)
+            self.assertEqual(len(result), length)
+            self.assertTrue(set(result) <= set("abc"))
+
+    def test_uniform(self):
+        # 256 is not a multiple of 3, so a plain byte modulo would be biased
+        counts = Counter(Alphabet("abc").generate(random.Random(2), 30000))
+        for char in "abc":
+            self.assertAlmostEqual(counts[char] / 30000, 1 / 3, delta=0.02)
+
+    def test_wide_alphabet(self):
+        alphabet = Alphabet("αβγ€")
+        result = alphabet.generate(random.Random(3), 50)
+        self.assertEqual(len(result), 50)
+        self.assertTrue(set(result) <= set("αβγ€"))
+
+    def test_reproducible(self):
+        alphabet = Alphabet(DEFAULT_ALPHABET)
+        first = alphabet.generate(random.Random(4), 100)
+        self.assertEqual(alphabet.generate(random.Random(4), 100), first)
+
+    def test_empty(self):
+        with self.assertRaises(ValueError):
+            Alphabet("")
+
+    def test_schema_alphabet(self):
+        self.assertEqual(schema_alphabet({"type": "string"}).chars, DEFAULT_ALPHABET)
+        alphabet = schema_alphabet({"type": "string", "x-freddy-alphabet": "01"})
+        self.assertEqual(alphabet.chars, "01")
+
+
+class TestStringSchemas(unittest.TestCase):
+    schema = {
+        "type": "string",
+        "minLength": 5,
+        "maxLength": 5,
+        "x-freddy-alphabet": "xy",
+    }
+
+    def test_schema_alphabet(self):
+        self.assertTrue(set(freddy.jsonschema(self.schema)) <= set("xy"))
+        compiled = freddy.compile(self.schema)
+        for value in [compiled.sample()] + compiled.sample_many(10):
+            self.assertEqual(len(value), 5)
+            self.assertTrue(set(value) <= set("xy"))
+
+    def test_sampler_alphabet(self):
+        sampler = freddy.Sampler(seed=5, alphabet="0123456789")
+        schema = {"type": "string", "minLength": 3}
+        for value in sampler.sample_many(schema, 10) + sampler.spawn().sample_many(
+            schema, 10
+        ):
+            self.assertTrue(value.isdigit())
+        self.assertTrue(set(sampler.sample(self.schema)) <= set("xy"))
@@ -0,0 +1,95 @@
+import datetime
+import io
+import json
+import random
+import unittest
+
+import pytest
+
+import freddy
+from freddy.temporal import Temporal, schema_temporal
+
+parsers = {
+    "date-time": datetime.datetime.fromisoformat,
+    "date": datetime.date.fromisoformat,
+    "time": datetime.time.fromisoformat,
+}
+
+
+class TestTemporal(unittest.TestCase):
+    def test_formats(self):
+        for _format, parse in parsers.items():
+            schema = {"type": "string", "format": _format}
+            compiled = freddy.compile(schema, rng=random.Random(1))
+            samples = compiled.sample_many(500) + [
+                compiled.sample() for _ in range(500)
+            ]
+            samples += [freddy.jsonschema(schema, random.Random(i)) for i in range(200)]
+            for sample in samples:
+                self.assertEqual(parse(sample).isoformat(), sample)
+
+    def test_whole_day_of_times(self):
+        temporal = schema_temporal({"format": "time"})
+        rng = random.Random(2)
+        hours = {temporal.value(rng).hour for _ in range(5000)}
+        self.assertEqual(hours, set(range(24)))
+
+    def test_range(self):
+        schema = {
+            "type": "string",
+            "format": "date-time",
+            "formatMinimum": "2021-03-01T22:30:00",
+            "formatMaximum": "2021-03-03T01:15:10",
+        }
+        samples = freddy.compile(schema, rng=random.Random(3)).sample_many(5000)
+        for sample in samples:
+            self.assertTrue("2021-03-01T22:30:00" <= sample <= "2021-03-03T01:15:10")
+        self.assertEqual(
+            {sample[:10] for sample in samples},
+            {"2021-03-01", "2021-03-02", "2021-03-03"},
+        )
+
+    def test_date_and_time_ranges(self):
+        rng = random.Random(4)
+        dates = Temporal(
+            "date", datetime.datetime(2020, 2, 27), datetime.datetime(2020, 3, 1)
+        ).generate_many(rng, 500)
+        self.assertEqual(
+            sorted(set(dates)), ["2020-02-27", "2020-02-28", "2020-02-29", "2020-03-01"]
+        )
+        schema = {
+            "format": "time",
+            "formatMinimum": "12:00:00",
+            "formatMaximum": "12:00:02",
+        }
+        times = schema_temporal(schema).generate_many(rng, 500)
+        self.assertEqual(sorted(set(times)), ["12:00:00", "12:00:01", "12:00:02"])
+
+    def test_invalid_range(self):
+        for schema in (
+            {"type": "string", "format": "date", "formatMinimum": "yesterday"},
+            {"type": "string", "format": "date", "formatMaximum": 2020},
+            {
+                "type": "string",
+                "format": "date",
+                "formatMinimum": "2020-01-02",
+                "formatMaximum": "2020-01-01",
+            },
+        ):
+            with pytest.raises(freddy.InvalidSchema):
+                freddy.compile(schema)
+            with pytest.raises(freddy.InvalidSchema):
+                freddy.jsonschema(schema)
+
+    def test_reproducible(self):
+        schema = {"type": "string", "format": "date-time"}
+        self.assertEqual(
+            freddy.sample_many(schema, 10, seed=5),
+            freddy.sample_many(schema, 10, seed=5),
+        )
+
+    def test_dump(self):
+        stream = io.BytesIO()
+        freddy.dump({"type": "string", "format": "date"}, stream, 100, seed=6)
+        for line in stream.getvalue().split():
+            datetime.date.fromisoformat(json.loads(line))
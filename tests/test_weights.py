@@ -0,0 +1,101 @@
+import io
+import json
+import random
+import unittest
+from collections import Counter
+
+import pytest
+
+import freddy
+from freddy.weights import AliasTable
+
+enum_schema = {"enum": ["free", "pro", "team"], "x-freddy-weight": [6, 3, 1]}
+
+of_schema = {
+    "oneOf": [
+        {"type": "string", "x-freddy-weight": 3},
+        {"type": "null"},
+        {"type": "integer", "x-freddy-weight": 0},
+    ]
+}
+
+
+def frequencies(samples):
+    counts = Counter(samples)
+    return {key: count / len(samples) for key, count in counts.items()}
+
+
+class TestAliasTable(unittest.TestCase):
+    def test_distribution(self):
+        weights = [5, 0, 1, 2.5, 1.5]
+        table = AliasTable(random.Random(1), weights)
+        draws = frequencies([table.draw() for _ in range(50000)])
+        for index, weight in enumerate(weights):
+            self.assertAlmostEqual(draws.get(index, 0), weight / 10, delta=0.01)
+
+
+class TestWeightedEnum(unittest.TestCase):
+    expected = {"free": 0.6, "pro": 0.3, "team": 0.1}
+
+    def assertFrequencies(self, samples):
+        for value, frequency in frequencies(samples).items():
+            self.assertAlmostEqual(frequency, self.expected[value], delta=0.02)
+
+    def test_compiled(self):
+        compiled = freddy.compile(enum_schema, rng=random.Random(2))
+        self.assertFrequencies([compiled.sample() for _ in range(10000)])
+        self.assertFrequencies(compiled.sample_many(10000))
+
+    def test_legacy(self):
+        rng = random.Random(3)
+        self.assertFrequencies(
+            [freddy.jsonschema(enum_schema, rng) for _ in range(5000)]
+        )
+
+    def test_dump(self):
+        stream = io.BytesIO()
+        freddy.dump(enum_schema, stream, 10000, seed=4)
+        self.assertFrequencies([json.loads(line) for line in stream.getvalue().split()])
+
+    def test_columnar(self):
+        columnar = pytest.importorskip("freddy.columnar")
+        schema = {
+            "type": "object",
+            "required": ["plan"],
+            "properties": {"plan": enum_schema},
+        }
+        columns = columnar.columns(schema, 10000, seed=5)
+        self.assertFrequencies(columns.data["plan"].tolist())
+
+
+class TestWeightedOf(unittest.TestCase):
+    def test_branches(self):
+        for samples in (
+            freddy.compile(of_schema, rng=random.Random(6)).sample_many(10000),
+            [freddy.sample(of_schema, seed=i) for i in range(2000)],
+            [freddy.jsonschema(of_schema, random.Random(i)) for i in range(2000)],
+        ):
+            kinds = frequencies([type(sample) for sample in samples])
+            self.assertNotIn(int, kinds)
+            self.assertAlmostEqual(kinds[str], 0.75, delta=0.04)
+
+    def test_zero_weights_out_of_unique_items(self):
+        schema = {
+            "type": "array",
+            "uniqueItems": True,
+            "minItems": 2,
+            "items": {"enum": ["a", "b", "c"], "x-freddy-weight": [1, 0, 1]},
+        }
+        self.assertEqual(sorted(freddy.sample(schema)), ["a", "c"])
+
+    def test_invalid_weights(self):
+        for schema in (
+            {"enum": ["a", "b"], "x-freddy-weight": [1]},
+            {"enum": ["a", "b"], "x-freddy-weight": [1, -1]},
+            {"enum": ["a", "b"], "x-freddy-weight": [0, 0]},
+            {"anyOf": [{"type": "null", "x-freddy-weight": "heavy"}]},
+        ):
+            with pytest.raises(freddy.InvalidSchema):
+                freddy.compile(schema)
+            with pytest.raises(freddy.InvalidSchema):
+                freddy.jsonschema(schema)